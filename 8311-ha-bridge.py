@@ -9,29 +9,40 @@ Based on: Gemini session research + Claude architecture
 Monitors BFW Solutions WAS-110 fiber optic statistics and publishes to Home Assistant
 """
 
+import argparse
 import base64
+import bisect
+import contextlib
 import json
 import math
 import os
 import re
+import signal
+import socket
+import struct
 import subprocess
 import sys
 import threading
 import time
+import tracemalloc
+from collections import Counter, deque
 from datetime import UTC, datetime
 
-import paho.mqtt.client as mqtt
+# paho-mqtt is imported on first connect (see load_mqtt): --once doesn't need it
+mqtt = None
+PacketTypes = None
+Properties = None
 
 # ==============================================================================
 # --- Configuration ---
 # ==============================================================================
-print("--- Loading Configuration ---")
-
 # --- WAS-110 Device Settings ---
 WAS_110_HOST = os.getenv("WAS_110_HOST", "192.168.11.1")
 WAS_110_USER = os.getenv("WAS_110_USER", "root")
 WAS_110_PASS = os.getenv("WAS_110_PASS", "")
 WAS_110_PORT = int(os.getenv("WAS_110_PORT", "22"))
+# PON-side netdev for the traffic counters (the LAN side is eth0_0)
+PON_INTERFACE = os.getenv("PON_INTERFACE", "pon0")
 
 # --- Home Assistant MQTT Broker Configuration ---
 HA_MQTT_BROKER = os.getenv("HA_MQTT_BROKER", "homeassistant.local")
@@ -39,10 +50,41 @@ HA_MQTT_PORT = int(os.getenv("HA_MQTT_PORT", "1883"))
 HA_MQTT_USER = os.getenv("HA_MQTT_USER", "8311-ha-bridge")
 HA_MQTT_PASS = os.getenv("HA_MQTT_PASS")
 MQTT_CLIENT_ID = os.getenv("MQTT_CLIENT_ID", "8311-ha-bridge")
+# Persistent MQTT v5 session: the broker keeps our subscriptions, and paho our
+# unacknowledged QoS 1 publishes, across a broker restart or network blip for
+# this many seconds. 0 = MQTT 3.1.1 with a clean session on every connect.
+MQTT_SESSION_EXPIRY = int(os.getenv("MQTT_SESSION_EXPIRY", "3600"))
+# Exponential reconnect backoff: the first retry after MQTT_RECONNECT_MIN seconds,
+# doubling up to MQTT_RECONNECT_MAX
+MQTT_RECONNECT_MIN = float(os.getenv("MQTT_RECONNECT_MIN", "0.1"))
+MQTT_RECONNECT_MAX = float(os.getenv("MQTT_RECONNECT_MAX", "30"))
+MQTT_CONNECT_TIMEOUT = 10
+# MQTT v5 topic aliases for the topics published every tick (0 = off); capped
+# by the broker's Topic Alias Maximum (Mosquitto's max_topic_alias, default 10)
+MQTT_TOPIC_ALIASES = int(os.getenv("MQTT_TOPIC_ALIASES", "0"))
 
 # --- Script Operation Settings ---
 POLL_INTERVAL_SECONDS = int(os.getenv("POLL_INTERVAL_SECONDS", "60"))
 SSH_TIMEOUT_SECONDS = int(os.getenv("SSH_TIMEOUT_SECONDS", "10"))
+# SSH transport profile: "default" lets ssh negotiate; "low_cpu" prefers what the ONU's
+# small CPU handles cheaply on every connect (X25519 rather than post-quantum hybrid KEX,
+# an Ed25519/ECDSA host key rather than RSA, ChaCha20-Poly1305 or AES-128, no compression).
+# The tail of each list keeps older Dropbear builds negotiable.
+SSH_PROFILE = os.getenv("SSH_PROFILE", "default").lower()
+SSH_PROFILES = {
+    "default": [],
+    "low_cpu": [
+        "-o", "KexAlgorithms=curve25519-sha256,curve25519-sha256@libssh.org,ecdh-sha2-nistp256,diffie-hellman-group14-sha256",
+        "-o", "HostKeyAlgorithms=ssh-ed25519,ecdsa-sha2-nistp256,rsa-sha2-256,ssh-rsa",
+        "-o", "Ciphers=chacha20-poly1305@openssh.com,aes128-ctr,aes128-gcm@openssh.com,aes256-ctr",
+        "-o", "MACs=hmac-sha2-256,hmac-sha1",
+        "-o", "Compression=no",
+    ],
+}
+# Slower polling tiers: optics, PON state, temperatures and link speed use POLL_INTERVAL_SECONDS
+GTC_POLL_SECONDS = int(os.getenv("GTC_POLL_SECONDS", "30"))
+SYSTEM_POLL_SECONDS = int(os.getenv("SYSTEM_POLL_SECONDS", "300"))
+IDENTITY_POLL_SECONDS = int(os.getenv("IDENTITY_POLL_SECONDS", "86400"))
 RECONNECT_DELAYS = [
     int(os.getenv("RECONNECT_DELAY_1", "5")),
     int(os.getenv("RECONNECT_DELAY_2", "10")),
@@ -54,8 +96,50 @@ HA_ENTITY_BASE = os.getenv("HA_ENTITY_BASE", "8311")
 DEBUG_MODE = os.getenv("DEBUG_MODE", "False").lower() == "true"
 TEST_MODE = os.getenv("TEST_MODE", "False").lower() == "true"
 PING_ENABLED = os.getenv("PING_ENABLED", "False").lower() == "true"
+FAST_STARTUP = os.getenv("FAST_STARTUP", "False").lower() == "true"
 VERSION = os.getenv("VERSION", "2.0.0")
 
+# Bridge statistics (Bridge Uptime, latency sensors) are published at most this often;
+# liveness comes from the availability topics, not from per-tick republishing
+BRIDGE_STATS_SECONDS = int(os.getenv("BRIDGE_STATS_SECONDS", "300"))
+
+# Retained "online"/"offline"; the broker publishes "offline" (LWT) if the bridge dies
+BRIDGE_AVAILABILITY_TOPIC = f"{HA_ENTITY_BASE}/bridge/availability"
+HA_STATUS_TOPIC = f"{HA_DISCOVERY_PREFIX}/status"
+
+# "entity": one retained config per entity (default)
+# "device": one retained device-based discovery payload per ONU with abbreviated keys
+DISCOVERY_MODE = os.getenv("DISCOVERY_MODE", "entity").lower()
+
+# Throttle between retained discovery configs (not needed with FAST_STARTUP)
+DISCOVERY_PUBLISH_DELAY = 0.0 if FAST_STARTUP else 0.05
+
+# --- Consolidated Snapshot (one message per tick for non-HA consumers, off when empty) ---
+# "json", "msgpack" or "cbor"; msgpack and cbor fall back to JSON without their package
+SNAPSHOT_FORMAT = os.getenv("SNAPSHOT_FORMAT", "").lower()
+SNAPSHOT_CONTENT_TYPES = {
+    "json": "application/json",
+    "msgpack": "application/msgpack",
+    "cbor": "application/cbor",
+}
+
+# --- Outage Spool (disk-backed publish queue, disabled when SPOOL_DIR is empty) ---
+SPOOL_DIR = os.getenv("SPOOL_DIR", "")
+SPOOL_MAX_MB = float(os.getenv("SPOOL_MAX_MB", "20"))
+SPOOL_SEGMENT_KB = int(os.getenv("SPOOL_SEGMENT_KB", "512"))
+SPOOL_REPLAY_RATE = int(os.getenv("SPOOL_REPLAY_RATE", "50"))
+SPOOL_DOWNSAMPLE_THRESHOLD = int(os.getenv("SPOOL_DOWNSAMPLE_THRESHOLD", "5000"))
+
+# --- On-demand Profiling (SIGUSR1 or the profile command topic; idle otherwise) ---
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp")
+PROFILE_SECONDS = float(os.getenv("PROFILE_SECONDS", "30"))
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "25"))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "10"))
+PROFILE_COMMAND_TOPIC = f"{HA_ENTITY_BASE}/bridge/profile"
+
+# --- Laser Aging Trends (kept in memory only when TREND_STATE_FILE is empty) ---
+TREND_STATE_FILE = os.getenv("TREND_STATE_FILE", "")
+
 # ==============================================================================
 # --- Global Variables ---
 # ==============================================================================
@@ -74,7 +158,93 @@ stats = {
     'ssh_reconnections': 0,
     'last_error': None,
     'last_error_time': None,
-    'update_durations': []
+    'update_durations': [],
+    'mqtt_connected_at': None,
+    'mqtt_reconnections': 0,
+    'mqtt_session_present': None,
+    'last_response_bytes': None,
+    'stats_published_at': None
+}
+
+# Optical change detector state per ANOMALY_METRICS name (see detect_changes)
+change_detectors = {}
+
+# MQTT connection state: set while connected, the cached broker address (see
+# resolve_broker) and when an unexpected disconnect happened
+mqtt_state = {
+    'connected': threading.Event(),
+    'address': None,
+    'resolved_at': None,
+    'disconnected_at': None,
+}
+
+# Previous interface counter read, for the traffic rates (see compute_throughput)
+previous_counters = {}
+
+# Previous CPU jiffies and our processes' (pid, CPU ticks), see compute_cpu_load
+cpu_meter = {'jiffies': None, 'processes': {}}
+
+# Recent (delay, offset) exchanges mapping the ONU's uptime onto our
+# monotonic clock, see time_sample
+onu_clock = {'exchanges': deque(maxlen=8), 'uptime': None, 'offset': None}
+
+# Laser aging fits of the current module (see update_laser_trends)
+laser_trends = {'serial': None, 'bias': None, 'power': None}
+
+# SFF-8472 limits and external calibration of the current module, read with
+# the device info (see parse_eeprom51_thresholds)
+module_limits = {}
+module_calibration = None
+
+# Per-serial caches for the publish hot path (see get_device_id / get_sensor_topics)
+device_ids = {}
+sensor_topics = {}
+
+# Components collected for device-based discovery (see add_device_component)
+device_components = {}
+
+# Last published ONU availability (None = not yet published, see set_onu_available)
+onu_available = None
+
+# Multi-rate polling: last fetch time per metric source and the merged snapshot
+source_last_fetched = {}
+latest_metrics = {}
+
+# PON transition tracking (see track_pon_transition)
+pon_transitions = deque(maxlen=64)
+pon_tracker = {
+    'first_sample': None,
+    'last_sample': None,
+    'last_state': None,
+    'link_failures': 0,
+}
+
+# Per-stage latency histograms (see record_latency) and in-flight QoS 1 publishes
+latency = {}
+pending_acks = {}
+early_acks = {}
+ack_lock = threading.Lock()
+
+# Only one profile runs at a time (see run_profile)
+profile_lock = threading.Lock()
+
+# MQTT v5 topic aliases of the current connection (see publish_aliased): topic ->
+# alias, the broker's limit, and each aliased topic's last (payload, qos, properties)
+topic_aliases = {'aliases': {}, 'maximum': 0, 'last': {}}
+alias_lock = threading.Lock()
+
+# Snapshot encoder and content type, resolved on first use (see encode_snapshot)
+snapshot_encoder = {}
+
+# Outage spool state (see spool_message / replay_spool)
+spool = {
+    'segment': None,
+    'segment_index': 0,
+    'pending': 0,
+    'dropped': 0,
+    'replayed': 0,
+    # (factor, last segment index) fixed when a backlog starts draining
+    'downsample': None,
 }
 
 # PON State mapping
@@ -99,6 +269,9 @@ PON_STATES = {
     90: "O9 - Upstream tuning state",
 }
 
+# O5.x states are operational
+PON_OPERATIONAL_STATES = frozenset({50, 51, 52})
+
 # ISP detection from GPON serial prefix
 # Reference: https://pon.wiki and https://hack-gpon.org/vendor/
 ISP_PREFIXES = {
@@ -136,6 +309,13 @@ def sanitize_for_mqtt(text):
     sanitized = re.sub(r'[^a-zA-Z0-9_-]', '_', sanitized)
     return sanitized.lower()
 
+def get_device_id():
+    """Return the MQTT device id for the current serial (sanitized once per serial)"""
+    device_id = device_ids.get(device_serial)
+    if device_id is None:
+        device_id = device_ids[device_serial] = f"8311_onu_{sanitize_for_mqtt(device_serial)}"
+    return device_id
+
 def watts_to_dbm(mw):
     """Convert milliwatts to dBm"""
     if mw <= 0:
@@ -173,22 +353,31 @@ def parse_eeprom51(raw_bytes):
         return metrics
 
     try:
-        # Optic Temperature (Bytes 96-97)
-        metrics['optic_temp'] = round(raw_bytes[96] + (raw_bytes[97] / 256.0), 2)
+        words = dict(zip(
+            ('temperature', 'voltage', 'tx_bias', 'tx_power', 'rx_power'),
+            struct.unpack_from('>hHHHH', raw_bytes, 96),
+            strict=True,
+        ))
+        # Externally calibrated modules report raw A/D values
+        if module_calibration is not None:
+            words = {name: calibrate(module_calibration, name, word) for name, word in words.items()}
+
+        # Optic Temperature (Bytes 96-97, signed 1/256 °C)
+        metrics['optic_temp'] = round(words['temperature'] / 256.0, 2)
 
         # Voltage (Bytes 98-99)
-        metrics['voltage'] = round(((raw_bytes[98] << 8) + raw_bytes[99]) / 10000.0, 3)
+        metrics['voltage'] = round(words['voltage'] / 10000.0, 3)
 
         # TX Bias (Bytes 100-101)
-        metrics['tx_bias'] = round(((raw_bytes[100] << 8) + raw_bytes[101]) / 500.0, 2)
+        metrics['tx_bias'] = round(words['tx_bias'] / 500.0, 2)
 
         # TX Power (Bytes 102-103) -> mW
-        tx_mw = ((raw_bytes[102] << 8) + raw_bytes[103]) / 10000.0
+        tx_mw = words['tx_power'] / 10000.0
         metrics['tx_power_mw'] = round(tx_mw, 4)
         metrics['tx_power_dbm'] = watts_to_dbm(tx_mw)
 
         # RX Power (Bytes 104-105) -> mW
-        rx_mw = ((raw_bytes[104] << 8) + raw_bytes[105]) / 10000.0
+        rx_mw = words['rx_power'] / 10000.0
         metrics['rx_power_mw'] = round(rx_mw, 4)
         metrics['rx_power_dbm'] = watts_to_dbm(rx_mw)
 
@@ -220,6 +409,12 @@ def parse_eeprom50(raw_bytes):
         # Revision (Bytes 56-59)
         info['revision'] = raw_bytes[56:60].decode('ascii', errors='ignore').strip()
 
+        # Vendor Serial Number (Bytes 68-83), tells a swapped module apart
+        info['serial_number'] = raw_bytes[68:84].decode('ascii', errors='ignore').strip()
+
+        # Diagnostic Monitoring Type (Byte 92): bit 4 = externally calibrated
+        info['externally_calibrated'] = len(raw_bytes) > 92 and bool(raw_bytes[92] & 0x10)
+
         debug_log(f"EEPROM50 parsed: {info['vendor_name']} {info['part_number']} {info['revision']}")
 
     except Exception as e:
@@ -227,30 +422,864 @@ def parse_eeprom50(raw_bytes):
 
     return info
 
+# SFF-8472 diagnostics with module-defined limits, as (name, metrics key,
+# A2h threshold offset, engineering units per LSB, signed, calibration
+# slope/offset offset, high flag bit in the byte 112-113 word). Thresholds
+# are high alarm, low alarm, high warning, low warning; the low flag bit is
+# one below the high one.
+SFF8472_MEASUREMENTS = [
+    ("temperature", "optic_temp", 0, 1 / 256, True, 84, 15),
+    ("voltage", "voltage", 8, 1e-4, False, 88, 13),
+    ("tx_bias", "tx_bias", 16, 0.002, False, 76, 11),
+    ("tx_power", "tx_power_mw", 24, 1e-4, False, 80, 9),
+    ("rx_power", "rx_power_mw", 32, 1e-4, False, None, 7),
+]
+THRESHOLD_NAMES = ("high_alarm", "low_alarm", "high_warning", "low_warning")
+
+# EEPROM51 bytes 0-91: thresholds (0-39) through external calibration (56-91)
+EEPROM51_THRESHOLDS_LENGTH = 92
+
+def calibrate(calibration, name, raw):
+    """Apply SFF-8472 external calibration to a raw A/D value (result still in LSBs)"""
+    if name == 'rx_power':
+        return sum(coefficient * raw ** power for power, coefficient in enumerate(calibration['rx_power']))
+    slope, offset = calibration[name]
+    return slope * raw + offset
+
+def parse_eeprom51_thresholds(raw_bytes, externally_calibrated):
+    """
+    Parse the module's alarm/warning thresholds (and external calibration)
+    Returns ({name: {threshold: value}}, calibration or None)
+    """
+    if len(raw_bytes) < EEPROM51_THRESHOLDS_LENGTH:
+        debug_log(f"EEPROM51 thresholds too short: {len(raw_bytes)} bytes")
+        return {}, None
+
+    calibration = None
+    if externally_calibrated:
+        # Rx_PWR(4)..Rx_PWR(0) floats, then unsigned 8.8 slope / signed offset pairs
+        calibration = {'rx_power': tuple(reversed(struct.unpack_from('>5f', raw_bytes, 56)))}
+        for name, _, _, _, _, calibration_offset, _ in SFF8472_MEASUREMENTS:
+            if calibration_offset is not None:
+                slope, offset = struct.unpack_from('>Hh', raw_bytes, calibration_offset)
+                calibration[name] = (slope / 256, offset)
+
+    limits = {}
+    for name, _, offset, scale, signed, _, _ in SFF8472_MEASUREMENTS:
+        words = struct.unpack_from('>4h' if signed else '>4H', raw_bytes, offset)
+        if calibration is not None:
+            words = [calibrate(calibration, name, word) for word in words]
+        limits[name] = {label: round(word * scale, 4) for label, word in zip(THRESHOLD_NAMES, words, strict=True)}
+
+    debug_log(f"EEPROM51 thresholds parsed: {limits}")
+    return limits, calibration
+
+def evaluate_alarms(metrics):
+    """
+    Check fresh readings against the module's own limits
+
+    Returns <name>_problem (warning level and up) and <name>_level per
+    measurement, plus SFF-8472 style alarm_flags/warning_flags words.
+    """
+    result = {}
+    alarm_flags = warning_flags = 0
+
+    for name, key, _, _, _, _, flag_bit in SFF8472_MEASUREMENTS:
+        value = metrics.get(key)
+        limits = module_limits.get(name)
+        if value is None or limits is None:
+            continue
+
+        high_bit = 1 << flag_bit
+        low_bit = high_bit >> 1
+        level = 'ok'
+        if value > limits['high_warning']:
+            warning_flags |= high_bit
+            level = 'warning'
+        elif value < limits['low_warning']:
+            warning_flags |= low_bit
+            level = 'warning'
+        if value > limits['high_alarm']:
+            alarm_flags |= high_bit
+            level = 'alarm'
+        elif value < limits['low_alarm']:
+            alarm_flags |= low_bit
+            level = 'alarm'
+
+        result[f"{name}_problem"] = level != 'ok'
+        result[f"{name}_level"] = level
+
+    if result:
+        result['alarm_flags'] = alarm_flags
+        result['warning_flags'] = warning_flags
+    return result
+
 def parse_pon_status(output):
     """Parse PON state from 'pon psg' command output"""
     state_match = re.search(r'current=(\d+)', output)
+    previous_match = re.search(r'previous=(\d+)', output)
     time_match = re.search(r'time_curr=(\d+)', output)
 
     if state_match:
         state_code = int(state_match.group(1))
-        time_in_state = int(time_match.group(1)) if time_match else 0
+        # Unknown without time_curr (older firmware) - not "just entered"
+        time_in_state = int(time_match.group(1)) if time_match else None
+        time_formatted = None
 
         # Format duration as human-readable
-        hours = time_in_state // 3600
-        minutes = (time_in_state % 3600) // 60
-        seconds = time_in_state % 60
-        time_formatted = f"{hours}h {minutes}m {seconds}s" if hours > 0 else f"{minutes}m {seconds}s"
+        if time_in_state is not None:
+            hours = time_in_state // 3600
+            minutes = (time_in_state % 3600) // 60
+            seconds = time_in_state % 60
+            time_formatted = f"{hours}h {minutes}m {seconds}s" if hours > 0 else f"{minutes}m {seconds}s"
 
         return {
             'state_code': state_code,
             'state_name': get_pon_state_name(state_code),
-            'link_up': state_code in [50, 51, 52],  # O5 states = operational
+            'link_up': state_code in PON_OPERATIONAL_STATES,
+            'previous_code': int(previous_match.group(1)) if previous_match else None,
             'time_in_state_seconds': time_in_state,
             'time_in_state_formatted': time_formatted
         }
     return None
 
+# ==============================================================================
+# --- PON Transition Tracking ---
+# ==============================================================================
+
+# Allowed slack between wall time and time_curr (pon psg reports whole seconds)
+PON_TRANSITION_TOLERANCE_SECONDS = 2.0
+
+def track_pon_transition(pon_status, now):
+    """
+    Record a PON status sample and infer transitions between polls.
+
+    time_curr only grows while the ONU stays in one state, so a value smaller
+    than the wall time elapsed since the previous poll means the state was
+    (re)entered in between - even if the current state matches the last one.
+    """
+    state_code = pon_status['state_code']
+    time_in_state = pon_status.get('time_in_state_seconds')
+
+    if pon_tracker['first_sample'] is None:
+        pon_tracker['first_sample'] = now
+
+    last_state = pon_tracker['last_state']
+    if pon_tracker['last_sample'] is not None and last_state is not None:
+        elapsed = now - pon_tracker['last_sample']
+        changed = state_code != last_state
+        reentered = (
+            time_in_state is not None
+            and time_in_state + PON_TRANSITION_TOLERANCE_SECONDS < elapsed
+        )
+
+        if changed or reentered:
+            was_up = last_state in PON_OPERATIONAL_STATES
+            is_up = state_code in PON_OPERATIONAL_STATES
+            # A hidden re-entry of an operational state means the link dropped and recovered
+            link_failure = was_up and (not is_up or not changed)
+
+            pon_transitions.append({
+                'timestamp': now - time_in_state if reentered else now,
+                'from_state': last_state if changed else pon_status.get('previous_code'),
+                'to_state': state_code,
+                'hidden': not changed,
+                'link_failure': link_failure,
+            })
+            if link_failure:
+                pon_tracker['link_failures'] += 1
+            debug_log(f"PON transition {last_state} -> {state_code} (hidden={not changed})")
+
+    pon_tracker['last_state'] = state_code
+    pon_tracker['last_sample'] = now
+
+def get_pon_flap_stats(now):
+    """Return flap count for the last hour, total link failures and MTBF"""
+    flaps = sum(
+        1 for t in pon_transitions
+        if t['link_failure'] and now - t['timestamp'] <= 3600
+    )
+    failures = pon_tracker['link_failures']
+    mtbf = None
+    if failures and pon_tracker['first_sample'] is not None:
+        mtbf = round((now - pon_tracker['first_sample']) / failures, 1)
+
+    recent = [
+        {
+            'seconds_ago': round(now - t['timestamp'], 1),
+            'from_state': t['from_state'],
+            'to_state': t['to_state'],
+            'hidden': t['hidden'],
+        }
+        for t in list(pon_transitions)[-5:]
+    ]
+
+    return {
+        'flaps_last_hour': flaps,
+        'link_failures': failures,
+        'mtbf_seconds': mtbf,
+        'recent_transitions': recent,
+    }
+
+# ==============================================================================
+# --- Optical Change Detection ---
+# ==============================================================================
+
+# Metrics watched for drifts and steps, as (name, metrics key)
+ANOMALY_METRICS = [("rx_power", "rx_power_dbm"), ("tx_power", "tx_power_dbm")]
+
+# EWMA baseline weight, CUSUM slack and threshold (in standard deviations),
+# baseline warm-up samples, and a standard deviation floor so a perfectly
+# flat (0.01 dB quantized) link doesn't score its first wiggle as a step
+EWMA_ALPHA = 0.05
+CUSUM_DRIFT = 0.5
+CUSUM_THRESHOLD = 8.0
+WARMUP_SAMPLES = 10
+MIN_STD_DB = 0.1
+
+def new_change_detector():
+    """Return the state of an empty change detector"""
+    return {'count': 0, 'mean': 0.0, 'variance': 0.0, 'upper': 0.0, 'lower': 0.0, 'last_change': None, 'step': None}
+
+def update_change_detector(detector, value):
+    """
+    Feed one sample to an EWMA baseline with a two-sided CUSUM
+
+    O(1) per sample with no history. Returns the step from the baseline when
+    a change is detected; the baseline then restarts at the new level so a
+    step is reported once.
+    """
+    detector['count'] += 1
+    if detector['count'] == 1:
+        detector['mean'] = value
+        return None
+
+    deviation = value - detector['mean']
+    if detector['count'] > WARMUP_SAMPLES:
+        z = deviation / max(math.sqrt(detector['variance']), MIN_STD_DB)
+        detector['upper'] = max(0.0, detector['upper'] + z - CUSUM_DRIFT)
+        detector['lower'] = max(0.0, detector['lower'] - z - CUSUM_DRIFT)
+        if detector['upper'] > CUSUM_THRESHOLD or detector['lower'] > CUSUM_THRESHOLD:
+            detector.update(count=1, mean=value, variance=0.0, upper=0.0, lower=0.0)
+            return deviation
+
+    detector['mean'] += EWMA_ALPHA * deviation
+    detector['variance'] = (1 - EWMA_ALPHA) * (detector['variance'] + EWMA_ALPHA * deviation * deviation)
+    return None
+
+def detect_changes(metrics):
+    """Run the change detectors on fresh readings; returns scores and last changes"""
+    result = {}
+    for name, key in ANOMALY_METRICS:
+        detector = change_detectors.setdefault(name, new_change_detector())
+        value = metrics.get(key)
+        if value is not None:
+            step = update_change_detector(detector, value)
+            if step is not None:
+                detector['last_change'] = get_sample_timestamp(metrics)
+                detector['step'] = round(step, 2)
+                print(f"⚠ {key} changed by {detector['step']:+.2f} dB to {value}")
+            result[f"{name}_anomaly_score"] = round(max(detector['upper'], detector['lower']) / CUSUM_THRESHOLD, 3)
+        if detector['last_change'] is not None:
+            result[f"{name}_last_change"] = detector['last_change']
+            result[f"{name}_change_step"] = detector['step']
+    return result
+
+# ==============================================================================
+# --- Laser Aging Trends ---
+# ==============================================================================
+
+# TX bias and TX power are fitted against optic temperature and time by
+# exponentially weighted least squares; the time term is the aging trend
+# with the daily and seasonal temperature swings taken out. Samples lose
+# half their weight after TREND_HALF_LIFE_DAYS, no trend is reported before
+# TREND_MIN_SPAN_DAYS, and the temperature term is dropped when the optic
+# temperature barely moves (variance in degC^2).
+TREND_HALF_LIFE_DAYS = 30
+TREND_MIN_SPAN_DAYS = 3
+MIN_TEMPERATURE_VARIANCE = 0.25
+# Normalized bias is reported at this optic temperature; the bias limit is
+# the module's high warning, or the KPI reference for modules without limits
+REFERENCE_TEMPERATURE = 40.0
+DEFAULT_BIAS_LIMIT_MA = 20.0
+MAX_PROJECTION_DAYS = 3650
+
+def new_trend():
+    """Return the state of an empty trend fit: nine running sums over
+    weight, T, t, y, T*T, t*t, T*t, T*y, t*y (T temperature, t days, y reading)"""
+    return {'origin': None, 'first': None, 'last': None, 'sums': [0.0] * 9}
+
+def add_trend_sample(trend, timestamp, temperature, value):
+    """Add a sample to a trend fit in O(1), however long the module is watched"""
+    if trend['origin'] is None:
+        trend.update(origin=timestamp, first=timestamp, last=timestamp)
+    elif timestamp > trend['last']:
+        # Decay by elapsed time, not sample count, so the poll rate doesn't shorten the window
+        decay = 0.5 ** ((timestamp - trend['last']) / (TREND_HALF_LIFE_DAYS * 86400))
+        trend['sums'] = [total * decay for total in trend['sums']]
+        trend['last'] = timestamp
+
+    day = (timestamp - trend['origin']) / 86400
+    terms = (1.0, temperature, day, value, temperature * temperature, day * day,
+             temperature * day, temperature * value, day * value)
+    trend['sums'] = [total + term for total, term in zip(trend['sums'], terms, strict=True)]
+
+def fit_trend(trend):
+    """Solve the weighted normal equations; returns (intercept, per degC, per day) or None"""
+    weight = trend['sums'][0]
+    if weight <= 0 or trend['first'] is None or trend['last'] - trend['first'] < TREND_MIN_SPAN_DAYS * 86400:
+        return None
+
+    m_t, m_x, m_y, m_tt, m_xx, m_tx, m_ty, m_xy = (total / weight for total in trend['sums'][1:])
+    var_t = m_tt - m_t * m_t
+    var_x = m_xx - m_x * m_x
+    cov_tx = m_tx - m_t * m_x
+    cov_ty = m_ty - m_t * m_y
+    cov_xy = m_xy - m_x * m_y
+    if var_x <= 0:
+        return None
+
+    determinant = var_t * var_x - cov_tx * cov_tx
+    if var_t >= MIN_TEMPERATURE_VARIANCE and determinant > 1e-6 * var_t * var_x:
+        temperature_slope = (cov_ty * var_x - cov_xy * cov_tx) / determinant
+        time_slope = (cov_xy * var_t - cov_ty * cov_tx) / determinant
+    else:
+        # Temperature barely moved (or moved in lockstep with time)
+        temperature_slope = 0.0
+        time_slope = cov_xy / var_x
+    return m_y - temperature_slope * m_t - time_slope * m_x, temperature_slope, time_slope
+
+def update_laser_trends(metrics):
+    """Feed the laser aging fits; returns the normalized bias, trends and projection"""
+    serial = device_info.get('serial_number')
+    if laser_trends['bias'] is None or (serial and laser_trends['serial'] and serial != laser_trends['serial']):
+        if laser_trends['bias'] is not None:
+            print(f"ℹ Module changed to {serial}, restarting laser trends")
+        laser_trends.update(bias=new_trend(), power=new_trend())
+    if serial:
+        laser_trends['serial'] = serial
+
+    now = metrics.get('sample_time', time.time())
+    temperature = metrics.get('optic_temp')
+    bias = metrics.get('tx_bias')
+    power = metrics.get('tx_power_dbm')
+    # A laser that is off (bias 0) says nothing about aging
+    if temperature is not None and bias and power is not None:
+        add_trend_sample(laser_trends['bias'], now, temperature, bias)
+        add_trend_sample(laser_trends['power'], now, temperature, power)
+
+    result = {}
+    bias_fit = fit_trend(laser_trends['bias'])
+    if bias_fit is not None:
+        intercept, temperature_slope, time_slope = bias_fit
+        day = (now - laser_trends['bias']['origin']) / 86400
+        normalized = intercept + temperature_slope * REFERENCE_TEMPERATURE + time_slope * day
+        limit = module_limits.get('tx_bias', {}).get('high_warning') or DEFAULT_BIAS_LIMIT_MA
+        days = None
+        if normalized >= limit:
+            days = 0
+        elif time_slope > 0:
+            days = (limit - normalized) / time_slope
+        result.update({
+            'tx_bias_normalized': round(normalized, 2),
+            'tx_bias_trend': round(time_slope * 365.25, 3),
+            'laser_bias_limit': limit,
+            # A flat or falling bias projects no end of life
+            'laser_days_to_threshold': round(days) if days is not None and days <= MAX_PROJECTION_DAYS else None,
+        })
+
+    power_fit = fit_trend(laser_trends['power'])
+    if power_fit is not None:
+        result['tx_power_trend'] = round(power_fit[2] * 365.25, 3)
+    return result
+
+def load_laser_trends():
+    """Restore the laser aging fits from TREND_STATE_FILE, if set"""
+    if not TREND_STATE_FILE or not os.path.exists(TREND_STATE_FILE):
+        return
+    try:
+        with open(TREND_STATE_FILE, encoding="utf-8") as f:
+            stored = json.load(f)
+        laser_trends.update(serial=stored['serial'], bias=stored['bias'], power=stored['power'])
+        print(f"✓ Restored laser trends for module {stored['serial']}")
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"⚠ Could not restore laser trends from {TREND_STATE_FILE}: {e}")
+
+def save_laser_trends():
+    """Write the laser aging fits to TREND_STATE_FILE (atomically), if set"""
+    if not TREND_STATE_FILE or laser_trends['bias'] is None:
+        return
+    try:
+        temporary = f"{TREND_STATE_FILE}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(laser_trends, f, separators=(",", ":"))
+        os.replace(temporary, TREND_STATE_FILE)
+    except OSError as e:
+        print(f"⚠ Could not save laser trends to {TREND_STATE_FILE}: {e}")
+
+# ==============================================================================
+# --- Interface Throughput ---
+# ==============================================================================
+
+# Netdevs whose counters are read, as (name, interface)
+TRAFFIC_INTERFACES = [("lan", "eth0_0"), ("pon", PON_INTERFACE)]
+
+# /proc/net/dev columns (after the interface name) that are kept
+COUNTER_FIELDS = {
+    'rx_bytes': 0, 'rx_packets': 1, 'rx_errors': 2, 'rx_dropped': 3,
+    'tx_bytes': 8, 'tx_packets': 9, 'tx_errors': 10, 'tx_dropped': 11,
+}
+
+# Drivers with 32-bit counters wrap here even though the kernel prints 64 bits;
+# a rate this far above the line rate (PON, or a LAN of unknown speed: 10G)
+# is a counter reset misread as a wrap, not traffic
+COUNTER_WRAP = 2**32
+MAX_LINE_RATE_MBPS = 10000
+LINE_RATE_MARGIN = 1.05
+
+# The ONU's uptime comes first, so rates use the ONU's own clock and SSH
+# latency or poll jitter can't skew them
+NET_DEV_COMMAND = (
+    "cut -d' ' -f1 /proc/uptime; "
+    f"grep -E '^ *({'|'.join(interface for _, interface in TRAFFIC_INTERFACES)}):' /proc/net/dev 2>/dev/null"
+)
+
+def parse_net_dev(raw):
+    """Parse the ONU uptime and the counters of the traffic interfaces"""
+    names = {interface: name for name, interface in TRAFFIC_INTERFACES}
+    lines = raw.strip().split('\n')
+    try:
+        counters = {'counters_uptime': float(lines[0])}
+    except ValueError:
+        return {}
+
+    for line in lines[1:]:
+        # Large counters can follow the colon without a space
+        interface, _, fields = line.partition(':')
+        values = fields.split()
+        name = names.get(interface.strip())
+        if name is None or len(values) < 16:
+            continue
+        try:
+            for field, column in COUNTER_FIELDS.items():
+                counters[f"{name}_{field}"] = int(values[column])
+        except ValueError:
+            continue
+        counters[f"{name}_errors"] = counters[f"{name}_rx_errors"] + counters[f"{name}_tx_errors"]
+        counters[f"{name}_drops"] = counters[f"{name}_rx_dropped"] + counters[f"{name}_tx_dropped"]
+    return counters
+
+def counter_delta(previous, current):
+    """Return the increase of a counter, or None if it was reset"""
+    if current >= previous:
+        return current - previous
+    if previous < COUNTER_WRAP:
+        return current + COUNTER_WRAP - previous
+    return None
+
+def compute_throughput(metrics):
+    """
+    Traffic rates since the previous counter read
+
+    A reboot (the ONU's uptime going backwards) or a counter reset skips one
+    interval instead of publishing a bogus rate. LAN utilization is relative
+    to the negotiated Ethernet speed.
+    """
+    global previous_counters
+
+    previous, previous_counters = previous_counters, metrics
+    uptime = metrics.get('counters_uptime')
+    previous_uptime = previous.get('counters_uptime')
+    if uptime is None or previous_uptime is None or uptime <= previous_uptime:
+        return {}
+
+    elapsed = uptime - previous_uptime
+    link_speed = metrics.get('eth_speed') or latest_metrics.get('eth_speed')
+    if not link_speed or link_speed <= 0:
+        link_speed = None
+
+    result = {}
+    for name, _ in TRAFFIC_INTERFACES:
+        line_rate = (link_speed if name == 'lan' else None) or MAX_LINE_RATE_MBPS
+        rates = {}
+        for direction in ('rx', 'tx'):
+            prefix = f"{name}_{direction}"
+            try:
+                octets = counter_delta(previous[f"{prefix}_bytes"], metrics[f"{prefix}_bytes"])
+                packets = counter_delta(previous[f"{prefix}_packets"], metrics[f"{prefix}_packets"])
+            except KeyError:
+                # Interface missing from one of the reads
+                break
+            if octets is None or packets is None:
+                break
+            mbps = octets * 8 / elapsed / 1e6
+            if mbps > line_rate * LINE_RATE_MARGIN:
+                break
+            rates[f"{prefix}_throughput"] = round(mbps, 3)
+            rates[f"{prefix}_packet_rate"] = round(packets / elapsed, 1)
+        else:
+            result.update(rates)
+
+    if link_speed and 'lan_rx_throughput' in result:
+        for direction in ('rx', 'tx'):
+            result[f"lan_{direction}_utilization"] = round(result[f"lan_{direction}_throughput"] / link_speed * 100, 2)
+    return result
+
+# ==============================================================================
+# --- ONU Clock ---
+# ==============================================================================
+
+# The ONU's monotonic (uptime) and wall clocks, read first on every poll.
+# Busybox builds without nanosecond support print "%N" or "N" literally.
+CLOCK_COMMAND = "cut -d' ' -f1 /proc/uptime; date +%s.%N"
+
+def parse_clock(raw):
+    """Parse the ONU's uptime and wall time, both in seconds"""
+    lines = raw.strip().split('\n')
+    try:
+        clock = {'clock_uptime': float(lines[0])}
+    except ValueError:
+        return {}
+    if len(lines) > 1:
+        seconds, _, fraction = lines[1].strip().partition('.')
+        with contextlib.suppress(ValueError):
+            clock['clock_time'] = float(f"{seconds}.{fraction}" if fraction.isdigit() else seconds)
+    return clock
+
+def time_sample(metrics, sent, received):
+    """
+    Return the monotonic and wall time the ONU read a sample at
+
+    Our SSH round trip brackets the ONU's clock read, as in NTP: an exchange's
+    offset is wrong by at most half its delay, so the exchange with the lowest
+    delay among the last few sets the offset. Samples are then timed by the
+    ONU's own uptime, which SSH latency and its jitter don't skew. Each poll's
+    session handshake counts as delay, which biases every exchange alike.
+    Without a clock read, the sample is timed by when the output arrived.
+    """
+    wall_base = time.time() - time.monotonic()
+    uptime = metrics.get('clock_uptime')
+    if uptime is None:
+        return received, received + wall_base
+
+    if onu_clock['uptime'] is not None and uptime < onu_clock['uptime']:
+        # The ONU rebooted: earlier exchanges describe another uptime
+        onu_clock['exchanges'].clear()
+    onu_clock['uptime'] = uptime
+
+    # The CPU section is read at the end; remote execution isn't network delay
+    remote = 0.0
+    if metrics.get('cpu_stat_uptime', -1) >= uptime:
+        remote = metrics['cpu_stat_uptime'] - uptime
+    delay = max(0.0, received - sent - remote)
+    onu_clock['exchanges'].append((delay, (sent + received - remote) / 2 - uptime))
+    onu_clock['offset'] = min(onu_clock['exchanges'])[1]
+
+    now = uptime + onu_clock['offset']
+    metrics['clock_rtt'] = round(delay * 1000, 1)
+    if 'clock_time' in metrics:
+        metrics['clock_offset'] = round((metrics['clock_time'] - now - wall_base) * 1000)
+    return now, now + wall_base
+
+def get_sample_timestamp(metrics):
+    """Get a sample's ISO 8601 timestamp, from the ONU's clock when it was read"""
+    if 'sample_time' not in metrics:
+        return get_iso_timestamp()
+    return datetime.fromtimestamp(metrics['sample_time'], UTC).isoformat()
+
+# ==============================================================================
+# --- ONU CPU Load and Monitor Overhead ---
+# ==============================================================================
+
+# The CPU section is read last so the shell's children (every other source)
+# are accounted; the poll's start is the clock read. $$ is the shell running
+# our commands, $PPID the Dropbear session behind it.
+CPU_STAT_COMMAND = (
+    "cut -d' ' -f1 /proc/uptime; cat /proc/loadavg; head -n1 /proc/stat; "
+    "cat /proc/$$/stat /proc/$PPID/stat 2>/dev/null"
+)
+
+# USER_HZ, fixed at 100 in the kernel ABI whatever the kernel's HZ
+CLOCK_TICKS = 100
+
+def parse_process_stat(line):
+    """Return (pid, CPU ticks incl. finished children, start tick) from a /proc/<pid>/stat line"""
+    # The command name is in parentheses and may contain spaces
+    pid, _, rest = line.partition(' (')
+    fields = rest.rpartition(') ')[2].split()
+    if len(fields) < 20:
+        return None
+    try:
+        return int(pid), sum(int(field) for field in fields[11:15]), int(fields[19])
+    except ValueError:
+        return None
+
+def parse_cpu_stat(raw, poll_start):
+    """Parse the ONU uptime, load averages, CPU jiffies and our shell and session processes"""
+    lines = raw.strip().split('\n')
+    try:
+        load = lines[1].split()
+        # cpu user nice system idle iowait irq softirq steal ...
+        jiffies = [int(value) for value in lines[2].split()[1:9]]
+        cpu = {
+            'cpu_stat_uptime': float(lines[0]),
+            'load_1m': float(load[0]), 'load_5m': float(load[1]), 'load_15m': float(load[2]),
+            'cpu_jiffies': (sum(jiffies), jiffies[3] + jiffies[4], jiffies[4]),
+        }
+    except (ValueError, IndexError):
+        return {}
+
+    for role, line in zip(('shell', 'session'), lines[3:5], strict=False):
+        process = parse_process_stat(line)
+        if process is not None:
+            cpu[f"{role}_process"] = process
+    if poll_start is not None:
+        cpu['poll_start_uptime'] = poll_start
+    return cpu
+
+def compute_cpu_load(metrics):
+    """
+    ONU CPU usage and the monitor's own overhead since the previous poll
+
+    CPU time is cumulative per process, so the monitor's cost is the increase
+    for processes already seen. A process with a new pid (each poll's SSH
+    session and shell) started for this poll, and everything it used - key
+    exchange included - is this poll's cost.
+    """
+    result = {key: metrics[key] for key in ('load_1m', 'load_5m', 'load_15m')}
+
+    jiffies = metrics['cpu_jiffies']
+    previous_jiffies = cpu_meter['jiffies']
+    elapsed = None
+    if previous_jiffies is not None and jiffies[0] > previous_jiffies[0]:
+        elapsed = jiffies[0] - previous_jiffies[0]
+        result['cpu_usage'] = round(100 * (1 - (jiffies[1] - previous_jiffies[1]) / elapsed), 1)
+        result['cpu_iowait'] = round(100 * (jiffies[2] - previous_jiffies[2]) / elapsed, 1)
+    cpu_meter['jiffies'] = jiffies
+
+    ticks = 0
+    started = metrics.get('poll_start_uptime')
+    for role in ('shell', 'session'):
+        process = metrics.get(f"{role}_process")
+        if process is None:
+            return result
+        pid, total, start_tick = process
+        previous = cpu_meter['processes'].get(role)
+        if previous is not None and previous[0] == pid and total >= previous[1]:
+            ticks += total - previous[1]
+        else:
+            ticks += total
+            # The whole life of a new session belongs to this poll
+            if role == 'session':
+                started = start_tick / CLOCK_TICKS
+        cpu_meter['processes'][role] = (pid, total)
+
+    result['monitor_cpu_time'] = ticks * 1000 // CLOCK_TICKS
+    if started is not None and metrics['cpu_stat_uptime'] >= started:
+        result['monitor_wall_time'] = round((metrics['cpu_stat_uptime'] - started) * 1000)
+    if elapsed:
+        result['monitor_cpu_share'] = round(100 * ticks / elapsed, 2)
+    return result
+
+# ==============================================================================
+# --- Latency Instrumentation ---
+# ==============================================================================
+
+# Upper bucket bounds in milliseconds; the last bucket catches everything above
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Stages published as diagnostic sensors (state = p95 in ms)
+LATENCY_SENSORS = [
+    ("ssh_session", "SSH Session Latency", "mdi:console"),
+    ("parse", "Parse Latency", "mdi:code-braces"),
+    ("publish", "Publish Latency", "mdi:upload-network-outline"),
+    ("mqtt_puback", "MQTT PUBACK Latency", "mdi:check-network-outline"),
+    ("mqtt_reconnect", "MQTT Reconnect Latency", "mdi:lan-connect"),
+]
+
+def record_latency(stage, ms):
+    """Record a duration in a stage's fixed-bucket histogram"""
+    hist = latency.get(stage)
+    if hist is None:
+        hist = latency[stage] = {
+            'counts': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+            'count': 0,
+            'sum': 0.0,
+            'max': 0.0,
+            'last': 0.0,
+        }
+    hist['counts'][bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+    hist['count'] += 1
+    hist['sum'] += ms
+    hist['last'] = ms
+    if ms > hist['max']:
+        hist['max'] = ms
+
+@contextlib.contextmanager
+def timed(stage):
+    """Time the enclosed block as a latency stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_latency(stage, (time.perf_counter() - start) * 1000)
+
+def latency_quantile(hist, q):
+    """Estimate a quantile as the upper bound of its bucket (capped at the max)"""
+    if not hist['count']:
+        return None
+    rank = q * hist['count']
+    seen = 0
+    for index, count in enumerate(hist['counts']):
+        seen += count
+        if seen >= rank and count:
+            if index < len(LATENCY_BUCKETS_MS):
+                return min(LATENCY_BUCKETS_MS[index], round(hist['max'], 3))
+            break
+    return round(hist['max'], 3)
+
+def get_latency_summary():
+    """Return count/last/mean/p50/p95/max per stage"""
+    return {
+        stage: {
+            'count': hist['count'],
+            'last_ms': round(hist['last'], 3),
+            'mean_ms': round(hist['sum'] / hist['count'], 3),
+            'p50_ms': latency_quantile(hist, 0.5),
+            'p95_ms': latency_quantile(hist, 0.95),
+            'max_ms': round(hist['max'], 3),
+        }
+        for stage, hist in sorted(latency.items())
+        if hist['count']
+    }
+
+def track_publish(mid):
+    """Start timing a QoS 1 publish until its PUBACK arrives"""
+    now = time.perf_counter()
+    with ack_lock:
+        # The network thread may have handled the PUBACK before publish() returned
+        acked_at = early_acks.pop(mid, None)
+        if acked_at is None:
+            pending_acks[mid] = now
+            # Bound the table if the broker stops acknowledging
+            if len(pending_acks) > 1000:
+                pending_acks.pop(next(iter(pending_acks)))
+    if acked_at is not None:
+        record_latency('mqtt_puback', 0.0)
+
+def on_publish_ha(client, userdata, mid, reason_code=None, properties=None):  # noqa: ARG001
+    """Callback when the broker acknowledged a publish (PUBACK for QoS 1)."""
+    now = time.perf_counter()
+    with ack_lock:
+        sent_at = pending_acks.pop(mid, None)
+        if sent_at is None:
+            early_acks[mid] = now
+            if len(early_acks) > 1000:
+                early_acks.pop(next(iter(early_acks)))
+            return
+    record_latency('mqtt_puback', (now - sent_at) * 1000)
+
+# ==============================================================================
+# --- On-demand Profiling ---
+# ==============================================================================
+
+def _frame_label(frame):
+    """Return a short function label for a stack frame"""
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_firstlineno}({code.co_name})"
+
+def run_profile(seconds, reason):
+    """
+    Sample every other thread's stack and trace allocations for `seconds`.
+
+    Nothing is hooked until a profile is requested: the sampler is a short-lived
+    thread reading sys._current_frames(), and tracemalloc is stopped again
+    afterwards. Folded stacks (flamegraph.pl / speedscope compatible), the
+    hottest functions and the top allocation sites are written to PROFILE_DIR.
+    """
+    if not profile_lock.acquire(blocking=False):
+        print("⚠ Profile already running, ignoring request")
+        return None
+
+    try:
+        print(f"🔬 Profiling for {seconds:g}s ({reason})...")
+        owns_tracemalloc = not tracemalloc.is_tracing()
+        if owns_tracemalloc:
+            tracemalloc.start(5)
+
+        stacks = Counter()
+        own_samples = Counter()
+        total_samples = 0
+        me = threading.get_ident()
+        interval = PROFILE_SAMPLE_INTERVAL_MS / 1000
+        deadline = time.monotonic() + seconds
+
+        try:
+            while time.monotonic() < deadline and not stop_event.is_set():
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == me:
+                        continue
+                    own_samples[_frame_label(frame)] += 1
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_label(frame))
+                        frame = frame.f_back
+                    stacks[";".join(reversed(stack))] += 1
+                    total_samples += 1
+                time.sleep(interval)
+
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            if owns_tracemalloc:
+                tracemalloc.stop()
+
+        allocations = snapshot.statistics('lineno')[:PROFILE_TOP_N]
+        path = os.path.join(PROFILE_DIR, f"8311-bridge-profile-{int(time.time())}.txt")
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as report:
+            report.write(f"# Sampling profile: {seconds:g}s, {total_samples} samples every {PROFILE_SAMPLE_INTERVAL_MS:g}ms ({reason})\n\n")
+            report.write(f"# Top {PROFILE_TOP_N} functions by own samples\n")
+            for label, count in own_samples.most_common(PROFILE_TOP_N):
+                report.write(f"{count / total_samples * 100:6.2f}%  {label}\n")
+            report.write(f"\n# Top {PROFILE_TOP_N} allocation sites (tracemalloc)\n")
+            report.writelines(f"{stat}\n" for stat in allocations)
+            report.write("\n# Folded stacks\n")
+            report.writelines(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+        print(f"✓ Profile written to {path}")
+        return path
+
+    except Exception as e:
+        print(f"✗ Profiling failed: {e}")
+        return None
+    finally:
+        profile_lock.release()
+
+def start_profile(seconds=None, reason="request"):
+    """Run a profile in the background so the caller (signal handler, MQTT thread) returns at once"""
+    threading.Thread(
+        target=run_profile,
+        args=(seconds or PROFILE_SECONDS, reason),
+        name="profiler",
+        daemon=True,
+    ).start()
+
+def on_message_ha(client, userdata, message):  # noqa: ARG001
+    """Callback for subscribed topics (profile requests, HA birth message)."""
+    global onu_available
+
+    if message.topic == HA_STATUS_TOPIC:
+        # HA restarted: republish SSH status and bridge statistics on the next tick
+        if message.payload == b"online":
+            onu_available = None
+            stats['stats_published_at'] = None
+    elif message.topic == PROFILE_COMMAND_TOPIC:
+        try:
+            seconds = float(message.payload.decode() or 0)
+        except ValueError:
+            seconds = 0
+        start_profile(min(seconds, 600) if seconds > 0 else None, "mqtt")
+
 # ==============================================================================
 # --- SSH Connection ---
 # ==============================================================================
@@ -283,7 +1312,7 @@ def check_host_reachable():
         debug_log(f"Error checking host reachability: {e}")
         return False
 
-def execute_ssh_command(command):
+def execute_ssh_command(command, stage='ssh_session'):
     """
     Executes a command on the remote device using the system's native 'ssh' command
     via a subprocess. This method was chosen over the `paramiko` library after
@@ -306,19 +1335,23 @@ def execute_ssh_command(command):
         "-o", "StrictHostKeyChecking=no",
         "-o", "UserKnownHostsFile=/dev/null",
         "-o", "ConnectTimeout=" + str(SSH_TIMEOUT_SECONDS),
+        *SSH_PROFILES[SSH_PROFILE],
         f"{WAS_110_USER}@{WAS_110_HOST}",
         command
     ]
 
     try:
         debug_log(f"Executing SSH command: {' '.join(ssh_command)}")
-        result = subprocess.run(
-            ssh_command,
-            capture_output=True,
-            timeout=SSH_TIMEOUT_SECONDS
-        )
+        # Each subprocess opens its own session, so this includes the handshake
+        with timed(stage):
+            result = subprocess.run(
+                ssh_command,
+                capture_output=True,
+                timeout=SSH_TIMEOUT_SECONDS
+            )
 
         if result.returncode == 0:
+            stats['last_response_bytes'] = len(result.stdout)
             return result.stdout
         else:
             error_message = result.stderr.decode('utf-8', errors='ignore').strip()
@@ -350,7 +1383,7 @@ def connect_ssh():
     """
     Tests the SSH connection by first checking host reachability via ping (if enabled),
     then executing a simple 'echo' command via SSH.
-    Returns True if successful, False otherwise.
+    Returns True if successful, False otherwise; callers publish availability.
     """
     print(f"Connecting to WAS-110 at {WAS_110_HOST}...")
 
@@ -358,70 +1391,143 @@ def connect_ssh():
     if PING_ENABLED:
         if not check_host_reachable():
             print(f"✗ Host {WAS_110_HOST} is not responding to ping")
-            if not TEST_MODE:
-                publish_binary_sensor_state("ssh_connection_status", False)
             return False
         print("✓ Host is reachable, attempting SSH connection...")
     else:
         debug_log("Ping check disabled, proceeding directly to SSH")
 
     # Now try SSH connection
-    if execute_ssh_command("echo 'SSH connection successful'") is not None:
+    if execute_ssh_command("echo 'SSH connection successful'", stage='ssh_connect') is not None:
         print("✓ SSH connection appears to be working.")
-        if not TEST_MODE:
-            publish_binary_sensor_state("ssh_connection_status", True)
         return True
     else:
         print("✗ SSH connection test failed (but host responds to ping).")
-        if not TEST_MODE:
-            publish_binary_sensor_state("ssh_connection_status", False)
         return False
 
 # ==============================================================================
 # --- MQTT Connection ---
 # ==============================================================================
 
+def resolve_broker():
+    """
+    Resolve the broker address once and cache it
+
+    mDNS names like homeassistant.local can take seconds to resolve, so
+    reconnects go straight to the cached address. Falls back to the cached
+    address (or the name itself) when resolution fails.
+    """
+    try:
+        address = socket.getaddrinfo(HA_MQTT_BROKER, HA_MQTT_PORT, type=socket.SOCK_STREAM)[0][4][0]
+    except OSError as e:
+        print(f"⚠ Could not resolve MQTT broker {HA_MQTT_BROKER}: {e}")
+        return mqtt_state['address'] or HA_MQTT_BROKER
+
+    if address != mqtt_state['address']:
+        debug_log(f"MQTT broker {HA_MQTT_BROKER} resolved to {address}")
+    mqtt_state['address'] = address
+    mqtt_state['resolved_at'] = time.monotonic()
+    return address
+
 def on_connect_ha(client, userdata, flags, rc, properties=None):  # noqa: ARG001
     """Callback when connected to Home Assistant MQTT broker."""
     if rc == 0:
-        print("✓ Connected to Home Assistant MQTT broker")
+        now = time.monotonic()
+        stats['mqtt_connected_at'] = now
+        stats['mqtt_session_present'] = flags.session_present
+        mqtt_state['connected'].set()
+
+        disconnected_at = mqtt_state['disconnected_at']
+        if disconnected_at is not None:
+            mqtt_state['disconnected_at'] = None
+            reconnect_ms = (now - disconnected_at) * 1000
+            record_latency('mqtt_reconnect', reconnect_ms)
+            stats['mqtt_reconnections'] += 1
+            print(f"✓ Reconnected to MQTT broker in {reconnect_ms:.0f}ms ({'session resumed' if flags.session_present else 'new session'})")
+        else:
+            print("✓ Connected to Home Assistant MQTT broker")
+
+        reset_topic_aliases(client, properties)
+
+        # Replaces the retained LWT "offline" from a previous session
+        client.publish(BRIDGE_AVAILABILITY_TOPIC, "online", qos=1, retain=True)
+        # A resumed session still has the request topics; discovery is retained
+        # either way, so nothing else is republished
+        if not flags.session_present:
+            client.subscribe([(PROFILE_COMMAND_TOPIC, 0), (HA_STATUS_TOPIC, 0)])
     else:
         print(f"✗ Failed to connect to MQTT broker, return code {rc}")
 
 
 def on_disconnect_ha(client, userdata, flags, rc, properties=None):  # noqa: ARG001
     """Callback when disconnected from HA MQTT broker."""
+    mqtt_state['connected'].clear()
     if rc != 0:
+        if mqtt_state['disconnected_at'] is None:
+            mqtt_state['disconnected_at'] = time.monotonic()
         print(f"⚠ Unexpected MQTT disconnect, return code {rc}")
 
+def on_connect_fail_ha(client, userdata):  # noqa: ARG001
+    """
+    Callback when a reconnect attempt fails
+
+    The cached address is resolved again only once the broker has been
+    unreachable for a full backoff period (it may have moved), so a broker
+    restart is retried without waiting for DNS.
+    """
+    now = time.monotonic()
+    since = max(mqtt_state['disconnected_at'] or now, mqtt_state['resolved_at'] or 0.0)
+    if now - since >= MQTT_RECONNECT_MAX:
+        with contextlib.suppress(RuntimeError, ValueError):
+            client.host = resolve_broker()
+
+def load_mqtt():
+    """Import paho-mqtt, deferred so one-shot runs don't pay for it"""
+    global mqtt, PacketTypes, Properties
+
+    if mqtt is None:
+        import paho.mqtt.client as mqtt
+        from paho.mqtt.packettypes import PacketTypes
+        from paho.mqtt.properties import Properties
+
 def connect_mqtt():
     """Connect to Home Assistant MQTT broker"""
     global ha_mqtt_client
 
+    load_mqtt()
+
     print(f"Connecting to MQTT broker at {HA_MQTT_BROKER}:{HA_MQTT_PORT}...")
 
+    persistent = MQTT_SESSION_EXPIRY > 0
     ha_mqtt_client = mqtt.Client(
         callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
-        client_id=MQTT_CLIENT_ID
+        client_id=MQTT_CLIENT_ID,
+        protocol=mqtt.MQTTv5 if persistent else mqtt.MQTTv311,
     )
 
     ha_mqtt_client.on_connect = on_connect_ha
     ha_mqtt_client.on_disconnect = on_disconnect_ha
+    ha_mqtt_client.on_connect_fail = on_connect_fail_ha
+    ha_mqtt_client.on_publish = on_publish_ha
+    ha_mqtt_client.on_message = on_message_ha
+    ha_mqtt_client.will_set(BRIDGE_AVAILABILITY_TOPIC, "offline", qos=1, retain=True)
+    # paho's network thread reconnects by itself, with this backoff
+    ha_mqtt_client.reconnect_delay_set(MQTT_RECONNECT_MIN, MQTT_RECONNECT_MAX)
 
     if HA_MQTT_USER and HA_MQTT_PASS:
         ha_mqtt_client.username_pw_set(HA_MQTT_USER, HA_MQTT_PASS)
 
+    session = {}
+    if persistent:
+        properties = Properties(PacketTypes.CONNECT)
+        properties.SessionExpiryInterval = MQTT_SESSION_EXPIRY
+        session = {'clean_start': False, 'properties': properties}
+
     try:
-        ha_mqtt_client.connect(HA_MQTT_BROKER, HA_MQTT_PORT, 60)
+        ha_mqtt_client.connect(resolve_broker(), HA_MQTT_PORT, 60, **session)
         ha_mqtt_client.loop_start()
 
-        # Wait for connection to be established
-        timeout = 10  # seconds
-        start_time = time.time()
-        while not ha_mqtt_client.is_connected() and (time.time() - start_time) < timeout:
-            time.sleep(0.1)
-
-        if not ha_mqtt_client.is_connected():
+        # Set by on_connect_ha as soon as the CONNACK arrives
+        if not mqtt_state['connected'].wait(MQTT_CONNECT_TIMEOUT):
             print("✗ MQTT connection timeout")
             return False
 
@@ -430,7 +1536,58 @@ def connect_mqtt():
         print(f"✗ MQTT connection failed: {e}")
         return False
 
-def publish_mqtt(topic, payload, retain=False, qos=0):
+def reset_topic_aliases(client, properties):
+    """
+    Start a new connection's topic alias table
+
+    Aliases only last for one connection, but paho retransmits unacknowledged
+    publishes right after on_connect with the alias they were sent with. Each
+    aliased topic's last message is republished with its topic and alias first,
+    so those retransmits stay valid; the duplicates carry the same values.
+    """
+    maximum = 0
+    if MQTT_TOPIC_ALIASES and properties is not None:
+        maximum = min(MQTT_TOPIC_ALIASES, getattr(properties, 'TopicAliasMaximum', 0))
+
+    with alias_lock:
+        previous = topic_aliases['aliases']
+        topic_aliases.update(aliases={}, maximum=maximum)
+        for topic, alias in sorted(previous.items(), key=lambda item: item[1]):
+            if alias > maximum:
+                break
+            payload, qos, publish_properties = topic_aliases['last'][topic]
+            client.publish(topic, payload, qos=qos, properties=publish_properties)
+            topic_aliases['aliases'][topic] = alias
+        topic_aliases['last'] = {topic: topic_aliases['last'][topic] for topic in topic_aliases['aliases']}
+
+    if maximum:
+        debug_log(f"MQTT topic aliases enabled, up to {maximum}")
+
+def publish_aliased(topic, payload, qos, properties=None):
+    """
+    Publish under an MQTT v5 topic alias
+
+    A topic's first publish on a connection carries the topic and its alias,
+    later ones only the alias. Aliases go to topics first come, first served up
+    to the limit, so the topics published every tick hold them.
+    """
+    with alias_lock:
+        aliases = topic_aliases['aliases']
+        alias = aliases.get(topic)
+        name = ""
+        if alias is None:
+            if len(aliases) >= topic_aliases['maximum']:
+                return ha_mqtt_client.publish(topic, payload, qos=qos, properties=properties)
+            alias = aliases[topic] = len(aliases) + 1
+            name = topic
+
+        if properties is None:
+            properties = Properties(PacketTypes.PUBLISH)
+        properties.TopicAlias = alias
+        topic_aliases['last'][topic] = (payload, qos, properties)
+        return ha_mqtt_client.publish(name, payload, qos=qos, properties=properties)
+
+def publish_mqtt(topic, payload, retain=False, qos=0, properties=None):
     """Publish message to MQTT broker"""
     global ha_mqtt_client
 
@@ -441,10 +1598,22 @@ def publish_mqtt(topic, payload, retain=False, qos=0):
         if isinstance(payload, dict):
             payload = json.dumps(payload)
 
-        result = ha_mqtt_client.publish(topic, payload, qos=qos, retain=retain)
+        # Spool state updates while offline, and while a backlog is draining so
+        # that replay stays in order (retained discovery is republished anyway)
+        if SPOOL_DIR and not retain and (spool['pending'] or not ha_mqtt_client.is_connected()):
+            spool_message(topic, payload, qos)
+            return False
+
+        if topic_aliases['maximum'] and not retain:
+            result = publish_aliased(topic, payload, qos, properties)
+        else:
+            result = ha_mqtt_client.publish(topic, payload, qos=qos, retain=retain, properties=properties)
 
         if result.rc == mqtt.MQTT_ERR_SUCCESS:
-            debug_log(f"Published to {topic}: {len(str(payload))} bytes")
+            if qos:
+                track_publish(result.mid)
+            if DEBUG_MODE:
+                debug_log(f"Published to {topic}: {len(payload)} bytes")
             return True
         else:
             print(f"✗ MQTT publish failed to {topic}, rc={result.rc}")
@@ -454,6 +1623,204 @@ def publish_mqtt(topic, payload, retain=False, qos=0):
         print(f"✗ MQTT publish exception: {e}")
         return False
 
+def get_onu_availability_topic():
+    """Return the retained availability topic for the monitored ONU"""
+    device_id = get_device_id()
+    return f"{HA_ENTITY_BASE}/{device_id}/availability"
+
+def get_availability_config(onu_scoped=True):
+    """
+    Return the discovery availability block.
+
+    Every entity follows the bridge LWT; ONU-scoped entities additionally go
+    unavailable while the ONU can't be reached over SSH.
+    """
+    topics = [{"topic": BRIDGE_AVAILABILITY_TOPIC}]
+    if onu_scoped:
+        topics.append({"topic": get_onu_availability_topic()})
+    return {"availability": topics, "availability_mode": "all"}
+
+def set_onu_available(available):
+    """Publish ONU availability and SSH status (retained, only when it changes)"""
+    global onu_available
+
+    if available == onu_available:
+        return
+    onu_available = available
+
+    publish_mqtt(get_onu_availability_topic(), "online" if available else "offline", retain=True, qos=1)
+    publish_binary_sensor_state("ssh_connection_status", available, {
+        "last_change": get_iso_timestamp(),
+        "consecutive_errors": stats['consecutive_errors'],
+    })
+
+# ==============================================================================
+# --- Outage Spool ---
+# ==============================================================================
+
+def _spool_segments():
+    """Return spool segment paths, oldest first"""
+    try:
+        names = sorted(n for n in os.listdir(SPOOL_DIR) if n.startswith("segment-") and n.endswith(".jsonl"))
+    except OSError:
+        return []
+    return [os.path.join(SPOOL_DIR, n) for n in names]
+
+def _close_spool_segment():
+    """Close the segment currently being appended to"""
+    if spool['segment'] is not None:
+        spool['segment'].close()
+        spool['segment'] = None
+
+def spool_init():
+    """
+    Prepare the spool directory and count messages left over from a previous run,
+    so a backlog survives bridge restarts and upgrades as well as broker outages.
+    """
+    if not SPOOL_DIR:
+        return
+
+    try:
+        os.makedirs(SPOOL_DIR, exist_ok=True)
+    except OSError as e:
+        print(f"⚠ Could not create spool directory {SPOOL_DIR}: {e}")
+        return
+
+    pending = 0
+    segments = _spool_segments()
+    for path in segments:
+        with open(path, encoding="utf-8") as f:
+            pending += sum(1 for line in f if line.strip())
+
+    spool['pending'] = pending
+    if segments:
+        spool['segment_index'] = int(os.path.basename(segments[-1])[8:-6])
+    if pending:
+        print(f"📦 Found {pending} spooled messages from a previous run")
+
+def spool_message(topic, payload, qos):
+    """Append a message to the active spool segment, rotating and bounding the spool"""
+    try:
+        if spool['segment'] is None or spool['segment'].tell() >= SPOOL_SEGMENT_KB * 1024:
+            _close_spool_segment()
+            spool['segment_index'] += 1
+            path = os.path.join(SPOOL_DIR, f"segment-{spool['segment_index']:06d}.jsonl")
+            spool['segment'] = open(path, "a", encoding="utf-8")  # noqa: SIM115
+
+            # Enforce the size bound by dropping the oldest segments
+            segments = _spool_segments()
+            total = sum(os.path.getsize(p) for p in segments)
+            while total > SPOOL_MAX_MB * 1024 * 1024 and len(segments) > 1:
+                oldest = segments.pop(0)
+                with open(oldest, encoding="utf-8") as f:
+                    dropped = sum(1 for line in f if line.strip())
+                total -= os.path.getsize(oldest)
+                os.remove(oldest)
+                spool['pending'] -= dropped
+                spool['dropped'] += dropped
+                print(f"⚠ Spool full, dropped {dropped} oldest messages")
+
+        record = {"t": topic, "q": qos, "ts": time.time()}
+        if isinstance(payload, (bytes, bytearray)):
+            # Binary payloads (msgpack/CBOR snapshots) don't fit a JSON string
+            record["b"] = base64.b64encode(payload).decode("ascii")
+        else:
+            record["p"] = str(payload)
+        spool['segment'].write(json.dumps(record, separators=(",", ":")) + "\n")
+        spool['segment'].flush()
+        spool['pending'] += 1
+        return True
+    except OSError as e:
+        debug_log(f"Could not spool message for {topic}: {e}")
+        return False
+
+def _downsample_records(records, factor):
+    """
+    Keep every Nth record per topic, always keeping each topic's newest value.
+
+    Kept records are marked, so a segment written back after a paused replay
+    (or found again after a restart) is not thinned a second time.
+    """
+    last_index = {}
+    for i, record in enumerate(records):
+        last_index[record['t']] = i
+
+    seen = {}
+    kept = []
+    for i, record in enumerate(records):
+        count = seen.get(record['t'], 0)
+        seen[record['t']] = count + 1
+        if count % factor == 0 or last_index[record['t']] == i:
+            kept.append({**record, "d": factor})
+    return kept
+
+def replay_spool(max_messages=None):
+    """
+    Replay up to max_messages spooled messages oldest first (None: all of them).
+
+    Publishes don't block: paho's network thread sends them, so the monitoring
+    loop calls this once per tick with a batch sized to SPOOL_REPLAY_RATE and
+    keeps sampling while a backlog drains. Stops at the batch size or on the
+    first failed publish; anything left is written back to its segment and
+    picked up on the next call.
+    """
+    if not spool['pending'] or ha_mqtt_client is None or not ha_mqtt_client.is_connected():
+        return
+
+    _close_spool_segment()
+
+    # Large backlogs are thinned so they drain in a reasonable time. The factor
+    # is fixed for the backlog as it was when draining started; segments spooled
+    # while it drains are recent data and are replayed in full
+    if spool['downsample'] is None:
+        factor = math.ceil(spool['pending'] / SPOOL_DOWNSAMPLE_THRESHOLD) if SPOOL_DOWNSAMPLE_THRESHOLD > 0 else 1
+        spool['downsample'] = (factor, spool['segment_index'])
+    factor, last_segment = spool['downsample']
+
+    for path in _spool_segments():
+        with open(path, encoding="utf-8") as f:
+            lines = [line for line in f if line.strip()]
+
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                spool['pending'] -= 1
+
+        thinned = any('d' in record for record in records)
+        if factor > 1 and not thinned and int(os.path.basename(path)[8:-6]) <= last_segment:
+            kept = _downsample_records(records, factor)
+            spool['pending'] -= len(records) - len(kept)
+            records = kept
+
+        sent = 0
+        for record in records:
+            if (max_messages is not None and max_messages <= 0) or not ha_mqtt_client.is_connected():
+                break
+            payload = base64.b64decode(record['b']) if 'b' in record else record['p']
+            result = ha_mqtt_client.publish(record['t'], payload, qos=record.get('q', 1))
+            if result.rc != mqtt.MQTT_ERR_SUCCESS:
+                break
+            sent += 1
+            if max_messages is not None:
+                max_messages -= 1
+
+        spool['pending'] -= sent
+        spool['replayed'] += sent
+
+        if sent < len(records):
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(r, separators=(",", ":")) + "\n" for r in records[sent:])
+            debug_log(f"Spool replay paused, {spool['pending']} messages pending")
+            return
+
+        os.remove(path)
+
+    spool['pending'] = 0
+    spool['downsample'] = None
+    print(f"✓ Spool drained ({spool['replayed']} messages replayed)")
+
 # ==============================================================================
 # --- Home Assistant Discovery ---
 # ==============================================================================
@@ -462,7 +1829,7 @@ def get_device_config():
     """Generate device configuration for MQTT discovery"""
     global device_serial, device_info
 
-    device_id = f"8311_onu_{sanitize_for_mqtt(device_serial)}"
+    device_id = get_device_id()
 
     sw_version = "8311 Community"
     if 'firmware_bank' in device_info:
@@ -478,414 +1845,984 @@ def get_device_config():
         "configuration_url": f"https://{WAS_110_HOST}"
     }
 
-def publish_sensor_discovery(sensor_id, sensor_name, unit=None, device_class=None, icon=None, state_class=None, entity_category=None, enabled_by_default=True):
-    """Publish MQTT discovery config for a sensor"""
-    device_id = f"8311_onu_{sanitize_for_mqtt(device_serial)}"
-    unique_id = f"{device_id}_{sensor_id}"
+# Home Assistant MQTT discovery abbreviations for the keys this bridge uses
+DISCOVERY_ABBREVIATIONS = {
+    "availability": "avty",
+    "availability_mode": "avty_mode",
+    "components": "cmps",
+    "configuration_url": "cu",
+    "device": "dev",
+    "device_class": "dev_cla",
+    "enabled_by_default": "en",
+    "entity_category": "ent_cat",
+    "icon": "ic",
+    "identifiers": "ids",
+    "json_attributes_topic": "json_attr_t",
+    "manufacturer": "mf",
+    "model": "mdl",
+    "origin": "o",
+    "payload_off": "pl_off",
+    "payload_on": "pl_on",
+    "platform": "p",
+    "state_class": "stat_cla",
+    "state_topic": "stat_t",
+    "sw_version": "sw",
+    "topic": "t",
+    "unique_id": "uniq_id",
+    "unit_of_measurement": "unit_of_meas",
+}
 
-    config = {
-        "name": sensor_name,
-        "unique_id": unique_id,
-        "state_topic": f"{HA_ENTITY_BASE}/sensor/{device_id}/{sensor_id}/state",
-        "json_attributes_topic": f"{HA_ENTITY_BASE}/sensor/{device_id}/{sensor_id}/attributes",
-        "device": get_device_config()
-    }
+def abbreviate_discovery(config):
+    """Recursively replace discovery keys with their abbreviations"""
+    if isinstance(config, dict):
+        return {DISCOVERY_ABBREVIATIONS.get(k, k): abbreviate_discovery(v) for k, v in config.items()}
+    if isinstance(config, list):
+        return [abbreviate_discovery(v) for v in config]
+    return config
 
-    if unit:
-        config["unit_of_measurement"] = unit
-    if device_class:
-        config["device_class"] = device_class
-    if icon:
-        config["icon"] = icon
-    if state_class:
-        config["state_class"] = state_class
-    if entity_category:
-        config["entity_category"] = entity_category
-    if not enabled_by_default:
-        config["enabled_by_default"] = False
+def add_device_component(platform, sensor_id, config, onu_scoped):
+    """
+    Collect an entity config as a component of the device discovery payload.
+
+    Device info and ONU availability are shared at the payload root; entities
+    that only follow the bridge override availability per component.
+    """
+    component = {k: v for k, v in config.items() if k not in ("device", "availability", "availability_mode")}
+    component["platform"] = platform
+    if not onu_scoped:
+        component.update(get_availability_config(onu_scoped=False))
+    device_components[sensor_id] = component
+
+def publish_device_discovery():
+    """Publish all collected components as one retained device discovery payload"""
+    device_id = get_device_id()
+
+    payload = abbreviate_discovery({
+        "device": get_device_config(),
+        "origin": {
+            "name": "8311-ha-bridge",
+            "sw_version": VERSION,
+            "url": "https://github.com/pentafive/8311-ha-bridge",
+        },
+        "components": device_components,
+        **get_availability_config(),
+    })
+
+    discovery_topic = f"{HA_DISCOVERY_PREFIX}/device/{device_id}/config"
+    publish_mqtt(discovery_topic, json.dumps(payload, separators=(',', ':')), retain=True, qos=1)
+    print(f"✓ Device discovery published ({len(device_components)} components)")
 
-    discovery_topic = f"{HA_DISCOVERY_PREFIX}/sensor/{device_id}/{sensor_id}/config"
-    publish_mqtt(discovery_topic, config, retain=True, qos=1)
-    time.sleep(0.05)
+def get_entity_discovery_topic(sensor):
+    """Return the per-entity discovery topic of a registry sensor"""
+    return f"{HA_DISCOVERY_PREFIX}/{sensor['platform']}/{get_device_id()}/{sensor['id']}/config"
 
-def publish_binary_sensor_discovery(sensor_id, sensor_name, device_class=None, icon=None):
-    """Publish MQTT discovery config for a binary sensor"""
-    device_id = f"8311_onu_{sanitize_for_mqtt(device_serial)}"
-    unique_id = f"{device_id}_{sensor_id}"
+def clear_entity_discovery():
+    """
+    Clear retained per-entity configs left by a run in entity mode.
+
+    HA would otherwise see every unique_id twice once the device payload is
+    published. Must run before publish_device_discovery: the device payload
+    then recreates the entities the cleared configs removed.
+    """
+    for entry in SENSOR_REGISTRY:
+        publish_mqtt(get_entity_discovery_topic(entry), "", retain=True, qos=1)
+
+def publish_entity_discovery(sensor):
+    """Publish MQTT discovery config for a registry sensor or binary sensor"""
+    device_id = get_device_id()
+    state_topic, attr_topic = get_sensor_topics(sensor['id'])
+    onu_scoped = sensor['onu_scoped']
 
     config = {
-        "name": sensor_name,
-        "unique_id": unique_id,
-        "state_topic": f"{HA_ENTITY_BASE}/binary_sensor/{device_id}/{sensor_id}/state",
-        "json_attributes_topic": f"{HA_ENTITY_BASE}/binary_sensor/{device_id}/{sensor_id}/attributes",
-        "payload_on": "ON",
-        "payload_off": "OFF",
-        "device": get_device_config()
+        "name": sensor['name'],
+        "unique_id": f"{device_id}_{sensor['id']}",
+        "state_topic": state_topic,
+        "json_attributes_topic": attr_topic,
+        "device": get_device_config(),
+        **get_availability_config(onu_scoped)
     }
 
-    if device_class:
-        config["device_class"] = device_class
-    if icon:
-        config["icon"] = icon
+    if sensor['platform'] == "binary_sensor":
+        config["payload_on"] = "ON"
+        config["payload_off"] = "OFF"
+    if sensor['unit']:
+        config["unit_of_measurement"] = sensor['unit']
+    if sensor['device_class']:
+        config["device_class"] = sensor['device_class']
+    if sensor['icon']:
+        config["icon"] = sensor['icon']
+    if sensor['state_class']:
+        config["state_class"] = sensor['state_class']
+    if sensor['entity_category']:
+        config["entity_category"] = sensor['entity_category']
+    if not sensor['enabled_by_default']:
+        config["enabled_by_default"] = False
+
+    if DISCOVERY_MODE == "device":
+        add_device_component(sensor['platform'], sensor['id'], config, onu_scoped)
+        return
 
-    discovery_topic = f"{HA_DISCOVERY_PREFIX}/binary_sensor/{device_id}/{sensor_id}/config"
-    publish_mqtt(discovery_topic, config, retain=True, qos=1)
-    time.sleep(0.05)
+    publish_mqtt(get_entity_discovery_topic(sensor), config, retain=True, qos=1)
+    if DISCOVERY_PUBLISH_DELAY:
+        time.sleep(DISCOVERY_PUBLISH_DELAY)
 
 # ==============================================================================
 # --- Sensor Publishing ---
 # ==============================================================================
 
-def publish_sensor_state(sensor_id, value, attributes=None):
-    """Publish sensor state and attributes"""
-    device_id = f"8311_onu_{sanitize_for_mqtt(device_serial)}"
+def encode_text_state(value):
+    """Encode a sensor state as MQTT payload bytes"""
+    return str(value).encode()
 
-    state_topic = f"{HA_ENTITY_BASE}/sensor/{device_id}/{sensor_id}/state"
-    publish_mqtt(state_topic, str(value), qos=1)
+def encode_binary_state(value):
+    """Encode a binary sensor state as MQTT payload bytes"""
+    return b"ON" if value else b"OFF"
 
-    if attributes:
-        attr_topic = f"{HA_ENTITY_BASE}/sensor/{device_id}/{sensor_id}/attributes"
-        publish_mqtt(attr_topic, attributes, qos=1)
+# Shared compact encoder for attribute payloads (avoids building one per json.dumps call)
+ATTRIBUTE_ENCODER = json.JSONEncoder(separators=(',', ':'))
 
-def publish_binary_sensor_state(sensor_id, value, attributes=None):
-    """Publish binary sensor state and attributes"""
-    device_id = f"8311_onu_{sanitize_for_mqtt(device_serial)}"
+def sensor(sensor_id, name, unit=None, device_class=None, icon=None, state_class=None,
+           entity_category=None, enabled_by_default=True, onu_scoped=True,
+           platform="sensor", group="metrics", value=None, attributes=None):
+    """
+    Declare a registry sensor.
 
-    state_topic = f"{HA_ENTITY_BASE}/binary_sensor/{device_id}/{sensor_id}/state"
-    publish_mqtt(state_topic, "ON" if value else "OFF", qos=1)
+    `group` selects the data source it is published from ("metrics",
+    "device_info", "bridge", or "availability" for set_onu_available);
+    `value(source)` returns the state (None = not published this round) and
+    `attributes(source, value)` any attributes beyond last_update.
+    """
+    return {
+        'id': sensor_id,
+        'name': name,
+        'unit': unit,
+        'device_class': device_class,
+        'icon': icon,
+        'state_class': state_class,
+        'entity_category': entity_category,
+        'enabled_by_default': enabled_by_default,
+        'onu_scoped': onu_scoped,
+        'platform': platform,
+        'group': group,
+        'value': value,
+        'attributes': attributes,
+        'encode': encode_binary_state if platform == "binary_sensor" else encode_text_state,
+    }
 
-    if attributes:
-        attr_topic = f"{HA_ENTITY_BASE}/binary_sensor/{device_id}/{sensor_id}/attributes"
-        publish_mqtt(attr_topic, attributes, qos=1)
+def _fahrenheit(source, value):  # noqa: ARG001
+    return {"fahrenheit": round(value * 1.8 + 32, 1)}
 
-# ==============================================================================
-# --- Data Collection ---
-# ==============================================================================
+def _eeprom51(source, value):  # noqa: ARG001
+    return {"source": "eeprom51"}
 
-def collect_device_info():
-    """
-    Collect static device information (run once at startup)
+def _optic_temperature(source, value):
+    return {**_fahrenheit(source, value), **_eeprom51(source, value)}
 
-    Uses a single SSH session with combined commands to avoid rate limiting.
-    """
-    global device_info, device_serial
+def _pon(metrics, key, default=None):
+    pon = metrics.get('pon_status')
+    return pon.get(key, default) if pon else None
 
-    print("\n📋 Collecting device information...")
+def _pon_link_attributes(metrics, value):  # noqa: ARG001
+    pon = metrics['pon_status']
+    return {
+        "state_code": pon['state_code'],
+        "state_name": pon['state_name'],
+        "time_in_state_seconds": pon.get('time_in_state_seconds'),
+        "time_in_state_formatted": pon.get('time_in_state_formatted'),
+    }
 
-    try:
-        # Execute all commands in a single SSH session
-        # Commands match HACS coordinator for compatibility
-        combined_command = (
-            "cat /sys/class/pon_mbox/pon_mbox0/device/eeprom50 2>/dev/null | base64 && "
-            "echo '===DELIMITER===' && "
-            "uci get gpon.ponip.pon_mode 2>/dev/null || echo unknown && "
-            "echo '===DELIMITER===' && "
-            ". /lib/8311.sh 2>/dev/null && active_fwbank 2>/dev/null || echo unknown && "
-            "echo '===DELIMITER===' && "
-            "uci get gpon.ploam.nSerial 2>/dev/null || echo unknown && "
-            "echo '===DELIMITER===' && "
-            ". /lib/8311.sh 2>/dev/null && get_8311_module_type 2>/dev/null || echo unknown && "
-            "echo '===DELIMITER===' && "
-            ". /lib/8311.sh 2>/dev/null && get_8311_vendor_id 2>/dev/null || echo unknown"
-        )
+def _speed_attributes(metrics, speed):  # noqa: ARG001
+    speed_gbps = speed / 1000 if speed >= 1000 else 0
+    return {
+        "link_detected": speed > 0,
+        "speed_formatted": f"{speed_gbps} Gbps" if speed_gbps > 0 else f"{speed} Mbps"
+    }
 
-        combined_output = execute_ssh_command(combined_command)
+def _uptime_attributes(metrics, uptime_secs):  # noqa: ARG001
+    hours = uptime_secs // 3600
+    minutes = (uptime_secs % 3600) // 60
+    days = hours // 24
+    return {"formatted": f"{days}d {hours % 24}h {minutes}m" if days > 0 else f"{hours}h {minutes}m"}
+
+def _flap(metrics, key):
+    flaps = metrics.get('pon_flaps')
+    return flaps[key] if flaps else None
+
+def _metric(key):
+    return lambda metrics: metrics.get(key)
+
+def _info(key):
+    return lambda info: info.get(key, 'Unknown')
+
+# Problem binary sensors per SFF8472_MEASUREMENTS name
+ALARM_SENSORS = [
+    ("temperature", "Optic Temperature Problem", "mdi:thermometer-alert"),
+    ("voltage", "Voltage Problem", "mdi:flash-alert"),
+    ("tx_bias", "TX Bias Problem", "mdi:current-dc"),
+    ("tx_power", "TX Power Problem", "mdi:arrow-up-bold-hexagon-outline"),
+    ("rx_power", "RX Power Problem", "mdi:arrow-down-bold-hexagon-outline"),
+]
 
-        if not combined_output:
-            print("⚠ Could not retrieve device info via SSH")
-            return False
+# Sensor registry: drives discovery and state publication, in discovery order
+SENSOR_REGISTRY = [
+    # Optical Performance Sensors
+    sensor("rx_power_dbm", "RX Power", "dBm", "signal_strength", "mdi:access-point", "measurement", value=_metric('rx_power_dbm'), attributes=_eeprom51),
+    sensor("rx_power_mw", "RX Power (mW)", "mW", "power", "mdi:access-point", "measurement", value=_metric('rx_power_mw'), attributes=_eeprom51),
+    sensor("tx_power_dbm", "TX Power", "dBm", "signal_strength", "mdi:access-point", "measurement", value=_metric('tx_power_dbm'), attributes=_eeprom51),
+    sensor("tx_power_mw", "TX Power (mW)", "mW", "power", "mdi:access-point", "measurement", value=_metric('tx_power_mw'), attributes=_eeprom51),
+    sensor("voltage", "Voltage", "V", "voltage", "mdi:flash", "measurement", value=_metric('voltage'), attributes=_eeprom51),
+    sensor("tx_bias", "TX Bias Current", "mA", "current", "mdi:current-ac", "measurement", value=_metric('tx_bias'), attributes=_eeprom51),
 
-        # Split output by delimiter
-        outputs = combined_output.decode('utf-8', errors='ignore').split('===DELIMITER===')
+    # Temperature Sensors
+    sensor("optic_temperature", "Optic Temperature", "°C", "temperature", "mdi:thermometer-laser", "measurement", value=_metric('optic_temp'), attributes=_optic_temperature),
+    sensor("cpu0_temperature", "CPU0 Temperature", "°C", "temperature", "mdi:chip", "measurement", value=_metric('cpu0_temp'), attributes=_fahrenheit),
+    sensor("cpu1_temperature", "CPU1 Temperature", "°C", "temperature", "mdi:chip", "measurement", value=_metric('cpu1_temp'), attributes=_fahrenheit),
 
-        if len(outputs) < 3:
-            print(f"⚠ Expected at least 3 output sections, got {len(outputs)}")
-            return False
+    # Link Status Binary Sensors
+    sensor("pon_link_status", "PON Link", None, "connectivity", "mdi:fiber-optic", platform="binary_sensor",
+           value=lambda m: _pon(m, 'link_up'), attributes=_pon_link_attributes),
+    # SSH status stays available (as OFF) while the ONU is unreachable
+    sensor("ssh_connection_status", "SSH Connection", None, "connectivity", "mdi:lan-connect", platform="binary_sensor",
+           onu_scoped=False, group="availability"),
+
+    # Readings outside the module's own SFF-8472 warning or alarm limits
+    *(
+        sensor(f"{name}_problem", label, None, "problem", icon, platform="binary_sensor",
+               value=_metric(f"{name}_problem"),
+               attributes=lambda m, _, name=name: {"level": m[f"{name}_level"], **module_limits.get(name, {})})
+        for name, label, icon in ALARM_SENSORS
+    ),
 
-        # Part 1: Get EEPROM50 data
-        eep50_b64_raw = outputs[0].strip()
-        if eep50_b64_raw:
-            try:
-                eep50_bytes = base64.b64decode(eep50_b64_raw)
-                eep50_data = parse_eeprom50(eep50_bytes)
-                device_info.update(eep50_data)
-            except Exception as e:
-                print(f"⚠ Could not parse EEPROM50: {e}")
-        else:
-            print("⚠ Could not retrieve EEPROM50 info.")
-
-        # Part 2: Get PON mode
-        pon_mode_raw = outputs[1].strip().upper()
-        if pon_mode_raw and pon_mode_raw != 'UNKNOWN':
-            if 'PON' in pon_mode_raw:
-                pon_mode_raw = pon_mode_raw.replace('PON', '-PON')
-            device_info['pon_mode'] = pon_mode_raw
-        else:
-            device_info['pon_mode'] = 'Unknown'
+    # Network Performance
+    sensor("ethernet_speed", "Ethernet Speed", "Mbps", None, "mdi:ethernet", "measurement", value=_metric('eth_speed'), attributes=_speed_attributes),
+
+    # Traffic from interface counter deltas (RX/TX as seen by the ONU: LAN RX
+    # is upstream traffic from the router), packet rates as attributes
+    *(
+        sensor(f"{name}_{direction}_throughput", f"{label} {direction.upper()} Throughput", "Mbit/s", "data_rate", icon, "measurement",
+               value=_metric(f"{name}_{direction}_throughput"),
+               attributes=lambda m, _, key=f"{name}_{direction}_packet_rate": {"packets_per_second": m[key]})
+        for name, label in (("lan", "LAN"), ("pon", "PON"))
+        for direction, icon in (("rx", "mdi:download-network"), ("tx", "mdi:upload-network"))
+    ),
+    sensor("lan_rx_utilization", "LAN RX Utilization", "%", None, "mdi:gauge", "measurement", value=_metric('lan_rx_utilization')),
+    sensor("lan_tx_utilization", "LAN TX Utilization", "%", None, "mdi:gauge", "measurement", value=_metric('lan_tx_utilization')),
+    *(
+        sensor(f"{name}_{kind}", f"{label} {kind.title()}", None, None, icon, "total_increasing", "diagnostic", value=_metric(f"{name}_{kind}"))
+        for name, label in (("lan", "LAN"), ("pon", "PON"))
+        for kind, icon in (("errors", "mdi:alert-circle-outline"), ("drops", "mdi:package-variant-remove"))
+    ),
 
-        # Part 3: Get active firmware bank
-        fw_bank_raw = outputs[2].strip()
-        if fw_bank_raw and fw_bank_raw.lower() != 'unknown':
-            device_info['firmware_bank'] = fw_bank_raw
-        else:
-            device_info['firmware_bank'] = 'Unknown'
-
-        # Part 4: Get GPON serial (spoofed ISP serial)
-        if len(outputs) > 3:
-            gpon_sn_raw = outputs[3].strip()
-            if gpon_sn_raw and gpon_sn_raw.lower() != 'unknown':
-                device_info['gpon_serial'] = gpon_sn_raw
-                device_info['isp'] = detect_isp_from_serial(gpon_sn_raw)
-            else:
-                device_info['gpon_serial'] = 'Unknown'
-                device_info['isp'] = 'Unknown'
-
-        # Part 5: Get module type
-        if len(outputs) > 4:
-            module_type_raw = outputs[4].strip()
-            if module_type_raw and module_type_raw.lower() != 'unknown':
-                device_info['module_type'] = module_type_raw
-            else:
-                device_info['module_type'] = 'Unknown'
+    # Device Information Sensors
+    sensor("vendor_name", "Vendor", icon="mdi:factory", group="device_info", value=_info('vendor_name')),
+    sensor("part_number", "Part Number", icon="mdi:barcode", group="device_info", value=_info('part_number')),
+    sensor("hardware_revision", "Hardware Revision", icon="mdi:chip", group="device_info", value=_info('revision')),
+    sensor("pon_mode", "PON Mode", icon="mdi:wan", group="device_info", value=_info('pon_mode')),
+    sensor("firmware_bank", "Active Firmware Bank", icon="mdi:alphabet-latin", group="device_info", value=_info('firmware_bank')),
 
-        # Part 6: Get PON vendor ID
-        if len(outputs) > 5:
-            vendor_id_raw = outputs[5].strip()
-            if vendor_id_raw and vendor_id_raw.lower() != 'unknown':
-                device_info['pon_vendor_id'] = vendor_id_raw
-            else:
-                device_info['pon_vendor_id'] = 'Unknown'
+    # New v2.0 sensors - ISP and system info (main sensors)
+    sensor("isp", "ISP", icon="mdi:web", group="device_info", value=_info('isp')),
 
-        # Set device serial (use part number + last 4 of vendor name as fallback)
-        device_serial = f"WAS110_{device_info.get('part_number', 'unknown')[:6]}"
+    # Diagnostic sensors (hidden in diagnostic section)
+    sensor("gpon_serial", "GPON Serial", icon="mdi:identifier", entity_category="diagnostic", enabled_by_default=False,  # Disabled by default - sensitive
+           group="device_info", value=_info('gpon_serial')),
+    sensor("module_type", "Module Type", icon="mdi:chip", entity_category="diagnostic", group="device_info", value=_info('module_type')),
+    sensor("pon_vendor_id", "PON Vendor ID", icon="mdi:identifier", entity_category="diagnostic", group="device_info", value=_info('pon_vendor_id')),
+    sensor("onu_uptime", "ONU Uptime", "s", "duration", "mdi:timer-outline", "total_increasing", "diagnostic",
+           value=_metric('onu_uptime'), attributes=_uptime_attributes),
+    sensor("memory_percent", "Memory Usage", "%", None, "mdi:memory", "measurement", "diagnostic", value=_metric('memory_percent')),
+    sensor("memory_used", "Memory Used", "kB", None, "mdi:memory", "measurement", "diagnostic", value=_metric('memory_used')),
+    sensor("cpu_usage", "CPU Usage", "%", None, "mdi:cpu-32-bit", "measurement",
+           value=_metric('cpu_usage'), attributes=lambda m, _: {"iowait_percent": m['cpu_iowait']}),
+    sensor("load_1m", "Load Average", None, None, "mdi:gauge", "measurement", "diagnostic",
+           value=_metric('load_1m'), attributes=lambda m, _: {"load_5m": m['load_5m'], "load_15m": m['load_15m']}),
+    # The monitor's own cost on the ONU: CPU time of our SSH session and shell
+    # (with every command it ran), its share of the ONU's total CPU capacity,
+    # and the session's wall time on the ONU
+    sensor("monitor_cpu_time", "Monitor CPU Time", "ms", "duration", "mdi:cpu-32-bit", "measurement", "diagnostic",
+           value=_metric('monitor_cpu_time')),
+    sensor("monitor_cpu_share", "Monitor CPU Share", "%", None, "mdi:chart-pie", "measurement", "diagnostic",
+           value=_metric('monitor_cpu_share')),
+    sensor("monitor_wall_time", "Monitor Wall Time", "ms", "duration", "mdi:timer-outline", "measurement", "diagnostic",
+           value=_metric('monitor_wall_time')),
+    # The ONU's wall clock against ours (positive when ahead), and the round
+    # trip of the last poll without remote execution
+    sensor("clock_offset", "Clock Offset", "ms", "duration", "mdi:clock-alert-outline", "measurement", "diagnostic",
+           value=_metric('clock_offset')),
+    sensor("clock_rtt", "Round-Trip Time", "ms", "duration", "mdi:timer-sync-outline", "measurement", "diagnostic",
+           value=_metric('clock_rtt')),
 
-        print(f"✓ Device: {device_info.get('vendor_name')} {device_info.get('part_number')} Rev {device_info.get('revision')}")
-        print(f"✓ PON Mode: {device_info.get('pon_mode')}, Firmware: Bank {device_info.get('firmware_bank')}")
-        print(f"✓ ISP: {device_info.get('isp')}, Module: {device_info.get('module_type')}")
+    # PON state details
+    sensor("pon_state_name", "PON State", icon="mdi:state-machine",
+           value=lambda m: _pon(m, 'state_name'), attributes=lambda m, _: {"state_code": m['pon_status']['state_code']}),
+    sensor("pon_time_in_state", "PON Time in State", "s", "duration", "mdi:timer", "measurement", "diagnostic",
+           value=lambda m: _pon(m, 'time_in_state_seconds'),
+           attributes=lambda m, _: {"formatted": m['pon_status'].get('time_in_state_formatted')}),
+    sensor("pon_flaps_last_hour", "PON Flaps (Last Hour)", None, None, "mdi:swap-vertical", "measurement",
+           value=lambda m: _flap(m, 'flaps_last_hour'), attributes=lambda m, _: {"recent_transitions": m['pon_flaps']['recent_transitions']}),
+    sensor("pon_link_failures", "PON Link Failures", None, None, "mdi:lan-disconnect", "total_increasing", "diagnostic",
+           value=lambda m: _flap(m, 'link_failures')),
+    sensor("pon_mtbf", "PON Mean Time Between Failures", "s", "duration", "mdi:timer-sand", "measurement", "diagnostic",
+           value=lambda m: _flap(m, 'mtbf_seconds')),
 
-        return True
+    # GTC error counters (diagnostic)
+    sensor("gtc_bip_errors", "GTC BIP Errors", None, None, "mdi:alert-circle-outline", "total_increasing", "diagnostic", value=_metric('gtc_bip_errors')),
+    sensor("gtc_fec_corrected", "GTC FEC Corrected", None, None, "mdi:check-circle-outline", "total_increasing", "diagnostic", value=_metric('gtc_fec_corrected')),
+    sensor("gtc_fec_uncorrected", "GTC FEC Uncorrected", None, None, "mdi:close-circle-outline", "total_increasing", "diagnostic", value=_metric('gtc_fec_uncorrected')),
+    sensor("gtc_lods_events", "GTC LODS Events", None, None, "mdi:signal-off", "total_increasing", "diagnostic", value=_metric('gtc_lods_events')),
+
+    # Change-point detection on optical power (score 1 = step or drift reported)
+    sensor("rx_power_anomaly_score", "RX Power Anomaly Score", None, None, "mdi:chart-bell-curve", "measurement",
+           value=_metric('rx_power_anomaly_score')),
+    sensor("rx_power_last_change", "RX Power Last Change", None, "timestamp", "mdi:chart-timeline-variant-shimmer",
+           value=_metric('rx_power_last_change'), attributes=lambda m, _: {"step_db": m['rx_power_change_step']}),
+    sensor("tx_power_anomaly_score", "TX Power Anomaly Score", None, None, "mdi:chart-bell-curve", "measurement",
+           value=_metric('tx_power_anomaly_score')),
+    sensor("tx_power_last_change", "TX Power Last Change", None, "timestamp", "mdi:chart-timeline-variant-shimmer",
+           value=_metric('tx_power_last_change'), attributes=lambda m, _: {"step_db": m['tx_power_change_step']}),
+
+    # Laser aging: TX bias at the reference temperature, yearly trends and
+    # the projected days until the bias reaches the module's warning level
+    sensor("tx_bias_normalized", "TX Bias Normalized", "mA", "current", "mdi:current-dc", "measurement",
+           value=_metric('tx_bias_normalized')),
+    sensor("tx_bias_trend", "TX Bias Trend", "mA/yr", None, "mdi:trending-up", "measurement",
+           value=_metric('tx_bias_trend')),
+    sensor("tx_power_trend", "TX Power Trend", "dB/yr", None, "mdi:trending-down", "measurement",
+           value=_metric('tx_power_trend')),
+    sensor("laser_days_to_threshold", "Laser Days to Threshold", "d", "duration", "mdi:calendar-clock", "measurement",
+           value=_metric('laser_days_to_threshold'), attributes=lambda m, _: {"bias_limit_ma": m['laser_bias_limit']}),
+
+    # SFF-8472 alarm and warning flags (bytes 112-113 and 116-117 layout)
+    sensor("alarm_flags", "Alarm Flags", icon="mdi:alert-octagon-outline", entity_category="diagnostic", value=_metric('alarm_flags')),
+    sensor("warning_flags", "Warning Flags", icon="mdi:alert-outline", entity_category="diagnostic", value=_metric('warning_flags')),
 
-    except Exception as e:
-        print(f"✗ Error parsing device info: {e}")
-        return False
+    # System Statistics
+    sensor("bridge_uptime", "Bridge Uptime", "s", "duration", "mdi:timer-outline", "total_increasing",
+           onu_scoped=False, group="bridge", value=lambda b: b['uptime'], attributes=lambda b, _: b['attributes']),
+    *(
+        # Per-stage latency (p95), so a slow stage stands out without a debugger
+        sensor(f"latency_{stage}", name, "ms", "duration", icon, "measurement", "diagnostic", False,
+               onu_scoped=False, group="bridge",
+               value=lambda b, stage=stage: b['latency'].get(stage, {}).get('p95_ms'),
+               attributes=lambda b, _, stage=stage: b['latency'][stage])
+        for stage, name, icon in LATENCY_SENSORS
+    ),
+]
 
-def collect_metrics():
+SENSORS_BY_ID = {s['id']: s for s in SENSOR_REGISTRY}
+SENSORS_BY_GROUP = {}
+for _entry in SENSOR_REGISTRY:
+    SENSORS_BY_GROUP.setdefault(_entry['group'], []).append(_entry)
+
+def get_sensor_topics(sensor_id):
+    """Return the (state, attributes) topics for a sensor, built once per device id"""
+    device_id = get_device_id()
+    topics = sensor_topics.get(device_id)
+    if topics is None:
+        topics = sensor_topics[device_id] = {
+            s['id']: (
+                f"{HA_ENTITY_BASE}/{s['platform']}/{device_id}/{s['id']}/state",
+                f"{HA_ENTITY_BASE}/{s['platform']}/{device_id}/{s['id']}/attributes",
+            )
+            for s in SENSOR_REGISTRY
+        }
+    return topics[sensor_id]
+
+def publish_entity_state(sensor, value, attributes=None):
+    """Publish a registry sensor's state and attributes as pre-encoded bytes"""
+    state_topic, attr_topic = get_sensor_topics(sensor['id'])
+    publish_mqtt(state_topic, sensor['encode'](value), qos=1)
+
+    if attributes:
+        publish_mqtt(attr_topic, ATTRIBUTE_ENCODER.encode(attributes).encode(), qos=1)
+
+def encode_snapshot(snapshot):
+    """Encode a snapshot in SNAPSHOT_FORMAT; returns (payload, content type)"""
+    if not snapshot_encoder:
+        encode, content_type = json_bytes, SNAPSHOT_CONTENT_TYPES["json"]
+        try:
+            if SNAPSHOT_FORMAT == "msgpack":
+                import msgpack
+                encode, content_type = msgpack.packb, SNAPSHOT_CONTENT_TYPES["msgpack"]
+            elif SNAPSHOT_FORMAT == "cbor":
+                import cbor2
+                encode, content_type = cbor2.dumps, SNAPSHOT_CONTENT_TYPES["cbor"]
+        except ImportError as e:
+            print(f"⚠ {e}, snapshots fall back to JSON")
+        snapshot_encoder.update(encode=encode, content_type=content_type)
+    return snapshot_encoder['encode'](snapshot), snapshot_encoder['content_type']
+
+def json_bytes(snapshot):
+    """Encode a snapshot as compact JSON"""
+    return json.dumps(snapshot, separators=(",", ":")).encode()
+
+def get_group_values(group, source):
+    """Return the current value of every registry sensor of a group, by sensor id"""
+    values = {}
+    for entry in SENSORS_BY_GROUP.get(group, ()):
+        value = entry['value'](source)
+        if value is not None:
+            values[entry['id']] = value
+    return values
+
+def publish_snapshot(metrics):
     """
-    Collect all real-time metrics from WAS-110
+    Publish every metric sensor's value as one message for non-HA consumers
 
-    Uses a single SSH session with multiple commands to avoid rate limiting.
-    Commands are separated by echo statements to create delimiters for parsing.
+    One topic and a single timestamp per tick instead of a state and an
+    attributes message per sensor. Not spooled: the next tick supersedes it.
     """
-    start_time = time.time()
-    metrics = {}
+    if ha_mqtt_client is None or spool['pending'] or not ha_mqtt_client.is_connected():
+        return
 
-    try:
-        # Execute all commands in a single SSH session to avoid rate limiting
-        # Commands match HACS coordinator for compatibility
-        combined_command = (
-            "cat /sys/class/pon_mbox/pon_mbox0/device/eeprom51 2>/dev/null | base64 && "
-            "echo '===DELIMITER===' && "
-            "cat /sys/class/thermal/thermal_zone0/temp 2>/dev/null && "
-            "echo '===DELIMITER===' && "
-            "cat /sys/class/thermal/thermal_zone1/temp 2>/dev/null && "
-            "echo '===DELIMITER===' && "
-            "cat /sys/class/net/eth0_0/speed 2>/dev/null && "
-            "echo '===DELIMITER===' && "
-            "pon psg 2>/dev/null && "
-            "echo '===DELIMITER===' && "
-            "cat /proc/uptime 2>/dev/null && "
-            "echo '===DELIMITER===' && "
-            "free 2>/dev/null | grep Mem && "
-            "echo '===DELIMITER===' && "
-            "pon gtc_counters_get 2>/dev/null"
-        )
+    snapshot = {"ts": round(metrics.get('sample_time', time.time()), 3), **get_group_values("metrics", metrics)}
+    payload, content_type = encode_snapshot(snapshot)
+    properties = None
+    if MQTT_SESSION_EXPIRY > 0:
+        properties = Properties(PacketTypes.PUBLISH)
+        properties.ContentType = content_type
+    publish_mqtt(f"{HA_ENTITY_BASE}/{get_device_id()}/snapshot", payload, qos=0, properties=properties)
+
+def publish_group(group, source, timestamp):
+    """Publish every registry sensor of a group from its data source"""
+    for entry in SENSORS_BY_GROUP.get(group, ()):
+        value = entry['value'](source)
+        if value is None:
+            continue
+        attributes = {"last_update": timestamp}
+        if entry['attributes']:
+            attributes.update(entry['attributes'](source, value))
+        publish_entity_state(entry, value, attributes)
 
-        combined_output = execute_ssh_command(combined_command)
+def publish_sensor_state(sensor_id, value, attributes=None):
+    """Publish sensor state and attributes"""
+    publish_entity_state(SENSORS_BY_ID[sensor_id], value, attributes)
 
-        if not combined_output:
-            debug_log("Combined SSH command failed")
-            return None
+def publish_binary_sensor_state(sensor_id, value, attributes=None):
+    """Publish binary sensor state and attributes"""
+    publish_entity_state(SENSORS_BY_ID[sensor_id], value, attributes)
 
-        # Split output by delimiter
-        outputs = combined_output.decode('utf-8', errors='ignore').split('===DELIMITER===')
+# ==============================================================================
+# --- Data Collection ---
+# ==============================================================================
 
-        if len(outputs) < 5:
-            debug_log(f"Expected at least 5 output sections, got {len(outputs)}")
-            return None
+# Only the EEPROM byte ranges that are parsed are read: EEPROM50 identity
+# fields live in bytes 20-59 (and the diagnostic monitoring type in 92),
+# EEPROM51 thresholds and calibration in bytes 0-91, diagnostics in 96-105
+EEPROM50_OFFSET = 20
+EEPROM51_OFFSET = 96
+
+# Commands match HACS coordinator for compatibility
+DEVICE_INFO_COMMAND = (
+    "dd if=/sys/class/pon_mbox/pon_mbox0/device/eeprom50 bs=4 skip=5 count=19 2>/dev/null | base64 && "
+    "echo '===DELIMITER===' && "
+    "uci get gpon.ponip.pon_mode 2>/dev/null || echo unknown && "
+    "echo '===DELIMITER===' && "
+    ". /lib/8311.sh 2>/dev/null && active_fwbank 2>/dev/null || echo unknown && "
+    "echo '===DELIMITER===' && "
+    "uci get gpon.ploam.nSerial 2>/dev/null || echo unknown && "
+    "echo '===DELIMITER===' && "
+    ". /lib/8311.sh 2>/dev/null && get_8311_module_type 2>/dev/null || echo unknown && "
+    "echo '===DELIMITER===' && "
+    ". /lib/8311.sh 2>/dev/null && get_8311_vendor_id 2>/dev/null || echo unknown && "
+    "echo '===DELIMITER===' && "
+    f"dd if=/sys/class/pon_mbox/pon_mbox0/device/eeprom51 bs=4 count={EEPROM51_THRESHOLDS_LENGTH // 4} 2>/dev/null | base64"
+)
+
+# Metric sources as (name, command, period in seconds); 0 = every poll.
+# Each tick's remote command only contains the sources that are due.
+METRIC_SOURCES = [
+    # First: samples are timed by the ONU's clocks, and the poll's wall time
+    # on the ONU starts here
+    ("CLOCK", CLOCK_COMMAND, 0),
+    ("EEPROM51", "dd if=/sys/class/pon_mbox/pon_mbox0/device/eeprom51 bs=2 skip=48 count=5 2>/dev/null | base64", 0),
+    ("CPU0_TEMP", "cat /sys/class/thermal/thermal_zone0/temp 2>/dev/null", 0),
+    ("CPU1_TEMP", "cat /sys/class/thermal/thermal_zone1/temp 2>/dev/null", 0),
+    ("ETH_SPEED", "cat /sys/class/net/eth0_0/speed 2>/dev/null", 0),
+    # Every poll, so rates cover a single interval
+    ("NET_DEV", NET_DEV_COMMAND, 0),
+    ("PON_STATUS", "pon psg 2>/dev/null", 0),
+    ("UPTIME", "cat /proc/uptime 2>/dev/null", SYSTEM_POLL_SECONDS),
+    ("MEMORY", "free 2>/dev/null | grep Mem", SYSTEM_POLL_SECONDS),
+    ("GTC_COUNTERS", "pon gtc_counters_get 2>/dev/null", GTC_POLL_SECONDS),
+    # Last, so the CPU time of every other source is accounted for
+    ("CPU_STAT", CPU_STAT_COMMAND, 0),
+]
+
+def build_metrics_command(source_names):
+    """Build the combined metrics command for the given sources, each under a ===NAME=== marker"""
+    parts = []
+    for name, command, _ in METRIC_SOURCES:
+        if name in source_names:
+            parts.append(f"echo '==={name}==='")
+            parts.append(command)
+    return "; ".join(parts)
+
+METRICS_COMMAND = build_metrics_command({name for name, _, _ in METRIC_SOURCES})
 
-        # 1. Parse EEPROM51 (optical metrics)
-        eep51_b64_raw = outputs[0].strip()
-        if eep51_b64_raw:
+# Separates the device info and metrics halves of the startup snapshot
+SNAPSHOT_DELIMITER = "===SNAPSHOT==="
+
+def parse_device_info_output(output):
+    """Parse DEVICE_INFO_COMMAND output into the global device info"""
+    global device_info, device_serial, module_limits, module_calibration
+
+    # Split output by delimiter
+    outputs = output.split('===DELIMITER===')
+
+    if len(outputs) < 3:
+        print(f"⚠ Expected at least 3 output sections, got {len(outputs)}")
+        return False
+
+    # Part 1: Get EEPROM50 data
+    eep50_b64_raw = outputs[0].strip()
+    if eep50_b64_raw:
+        try:
+            # Zero-pad back to absolute EEPROM addresses
+            eep50_bytes = bytes(EEPROM50_OFFSET) + base64.b64decode(eep50_b64_raw)
+            eep50_data = parse_eeprom50(eep50_bytes)
+            device_info.update(eep50_data)
+        except Exception as e:
+            print(f"⚠ Could not parse EEPROM50: {e}")
+    else:
+        print("⚠ Could not retrieve EEPROM50 info.")
+
+    # Part 2: Get PON mode
+    pon_mode_raw = outputs[1].strip().upper()
+    if pon_mode_raw and pon_mode_raw != 'UNKNOWN':
+        if 'PON' in pon_mode_raw:
+            pon_mode_raw = pon_mode_raw.replace('PON', '-PON')
+        device_info['pon_mode'] = pon_mode_raw
+    else:
+        device_info['pon_mode'] = 'Unknown'
+
+    # Part 3: Get active firmware bank
+    fw_bank_raw = outputs[2].strip()
+    if fw_bank_raw and fw_bank_raw.lower() != 'unknown':
+        device_info['firmware_bank'] = fw_bank_raw
+    else:
+        device_info['firmware_bank'] = 'Unknown'
+
+    # Part 4: Get GPON serial (spoofed ISP serial)
+    if len(outputs) > 3:
+        gpon_sn_raw = outputs[3].strip()
+        if gpon_sn_raw and gpon_sn_raw.lower() != 'unknown':
+            device_info['gpon_serial'] = gpon_sn_raw
+            device_info['isp'] = detect_isp_from_serial(gpon_sn_raw)
+        else:
+            device_info['gpon_serial'] = 'Unknown'
+            device_info['isp'] = 'Unknown'
+
+    # Part 5: Get module type
+    if len(outputs) > 4:
+        module_type_raw = outputs[4].strip()
+        if module_type_raw and module_type_raw.lower() != 'unknown':
+            device_info['module_type'] = module_type_raw
+        else:
+            device_info['module_type'] = 'Unknown'
+
+    # Part 6: Get PON vendor ID
+    if len(outputs) > 5:
+        vendor_id_raw = outputs[5].strip()
+        if vendor_id_raw and vendor_id_raw.lower() != 'unknown':
+            device_info['pon_vendor_id'] = vendor_id_raw
+        else:
+            device_info['pon_vendor_id'] = 'Unknown'
+
+    # Part 7: Get EEPROM51 thresholds and calibration (module limits)
+    if len(outputs) > 6:
+        eep51_b64_raw = outputs[6].strip()
+        try:
+            limits, calibration = parse_eeprom51_thresholds(
+                base64.b64decode(eep51_b64_raw), device_info.get('externally_calibrated', False)
+            )
+            if limits:
+                module_limits, module_calibration = limits, calibration
+        except Exception as e:
+            print(f"⚠ Could not parse EEPROM51 thresholds: {e}")
+
+    # Set device serial (use part number + last 4 of vendor name as fallback)
+    device_serial = f"WAS110_{device_info.get('part_number', 'unknown')[:6]}"
+
+    print(f"✓ Device: {device_info.get('vendor_name')} {device_info.get('part_number')} Rev {device_info.get('revision')}")
+    print(f"✓ PON Mode: {device_info.get('pon_mode')}, Firmware: Bank {device_info.get('firmware_bank')}")
+    print(f"✓ ISP: {device_info.get('isp')}, Module: {device_info.get('module_type')}")
+
+    return True
+
+def parse_metric_sections(output):
+    """Split combined metrics output into {name: content} by ===NAME=== markers"""
+    sections = {}
+    current = None
+    for line in output.split('\n'):
+        line = line.strip()
+        if line.startswith('===') and line.endswith('===') and len(line) > 6:
+            current = line.strip('=')
+            sections[current] = []
+        elif current is not None and line:
+            sections[current].append(line)
+    return {name: '\n'.join(lines) for name, lines in sections.items()}
+
+def parse_metrics_output(output):
+    """Parse metrics command output into a metrics dict (None if nothing was returned)"""
+    metrics = {}
+    sections = parse_metric_sections(output)
+
+    if not sections:
+        debug_log("No metric sections in SSH output")
+        return None
+
+    # 0. Parse the ONU's clocks
+    clock_raw = sections.get('CLOCK', '')
+    if clock_raw:
+        metrics.update(parse_clock(clock_raw))
+
+    # 1. Parse EEPROM51 (optical metrics)
+    eep51_b64_raw = sections.get('EEPROM51', '')
+    if eep51_b64_raw:
+        with timed('parse_eeprom51'):
             try:
-                eep51_bytes = base64.b64decode(eep51_b64_raw)
+                # Zero-pad back to absolute EEPROM addresses
+                eep51_bytes = bytes(EEPROM51_OFFSET) + base64.b64decode(eep51_b64_raw)
                 optical_metrics = parse_eeprom51(eep51_bytes)
                 metrics.update(optical_metrics)
             except Exception as e:
                 debug_log(f"Error parsing EEPROM51: {e}")
 
-        # 2. Parse CPU0 temp
-        cpu0_temp_raw = outputs[1].strip()
-        if cpu0_temp_raw:
+    # 2. Parse CPU0 temp
+    cpu0_temp_raw = sections.get('CPU0_TEMP', '')
+    if cpu0_temp_raw:
+        with timed('parse_cpu0_temp'):
             try:
                 metrics['cpu0_temp'] = round(int(cpu0_temp_raw) / 1000.0, 1)
             except (ValueError, TypeError):
                 debug_log("Could not parse CPU0 temp")
 
-        # 3. Parse CPU1 temp
-        cpu1_temp_raw = outputs[2].strip()
-        if cpu1_temp_raw:
+    # 3. Parse CPU1 temp
+    cpu1_temp_raw = sections.get('CPU1_TEMP', '')
+    if cpu1_temp_raw:
+        with timed('parse_cpu1_temp'):
             try:
                 metrics['cpu1_temp'] = round(int(cpu1_temp_raw) / 1000.0, 1)
             except (ValueError, TypeError):
                 debug_log("Could not parse CPU1 temp")
 
-        # 4. Parse ethernet speed
-        eth_speed_raw = outputs[3].strip()
-        if eth_speed_raw:
+    # 4. Parse ethernet speed
+    eth_speed_raw = sections.get('ETH_SPEED', '')
+    if eth_speed_raw:
+        with timed('parse_eth_speed'):
             try:
                 metrics['eth_speed'] = int(eth_speed_raw)
             except (ValueError, TypeError):
                 debug_log("Could not parse eth speed")
 
-        # 5. Parse PON status
-        pon_status_raw = outputs[4].strip()
-        if pon_status_raw:
+    # 5. Parse PON status
+    pon_status_raw = sections.get('PON_STATUS', '')
+    if pon_status_raw:
+        with timed('parse_pon_status'):
             pon_status = parse_pon_status(pon_status_raw)
             if pon_status:
                 metrics['pon_status'] = pon_status
 
-        # 6. Parse ONU uptime
-        if len(outputs) > 5:
-            uptime_raw = outputs[5].strip()
-            if uptime_raw:
-                try:
-                    uptime_seconds = int(float(uptime_raw.split()[0]))
-                    metrics['onu_uptime'] = uptime_seconds
-                except (ValueError, IndexError):
-                    debug_log("Could not parse ONU uptime")
-
-        # 7. Parse memory info (from 'free | grep Mem')
-        # Format: Mem:  total  used  free  shared  buff/cache  available
-        if len(outputs) > 6:
-            meminfo_raw = outputs[6].strip()
-            if meminfo_raw:
-                try:
-                    parts = meminfo_raw.split()
-                    # parts[0] = "Mem:", parts[1] = total, parts[2] = used, etc.
-                    if len(parts) >= 3 and parts[0].startswith('Mem'):
-                        mem_total = int(parts[1])
-                        mem_used = int(parts[2])
-                        if mem_total > 0:
-                            metrics['memory_used'] = mem_used
-                            metrics['memory_percent'] = round((mem_used / mem_total) * 100, 1)
-                except (ValueError, IndexError):
-                    debug_log("Could not parse memory info")
-
-        # 8. Parse GTC counters (from 'pon gtc_counters_get')
-        # Format: errorcode=0 bip_errors=0 disc_gem_frames=... fec_codewords_corr=0 ...
-        if len(outputs) > 7:
-            gtc_raw = outputs[7].strip()
-            if gtc_raw:
-                try:
-                    for part in gtc_raw.split():
-                        if '=' in part:
-                            key, value = part.split('=', 1)
-                            if key == 'bip_errors':
-                                metrics['gtc_bip_errors'] = int(value)
-                            elif key == 'fec_codewords_corr':
-                                metrics['gtc_fec_corrected'] = int(value)
-                            elif key == 'fec_codewords_uncorr':
-                                metrics['gtc_fec_uncorrected'] = int(value)
-                            elif key == 'lods_events':
-                                metrics['gtc_lods_events'] = int(value)
-                except (ValueError, IndexError):
-                    debug_log("Could not parse GTC counters")
-
-        duration = (time.time() - start_time) * 1000
-        stats['update_durations'].append(duration)
-        if len(stats['update_durations']) > 100:
-            stats['update_durations'].pop(0)
-
-        debug_log(f"Metrics collected in {duration:.0f}ms")
+    # 6. Parse ONU uptime
+    uptime_raw = sections.get('UPTIME', '')
+    if uptime_raw:
+        with timed('parse_uptime'):
+            try:
+                uptime_seconds = int(float(uptime_raw.split()[0]))
+                metrics['onu_uptime'] = uptime_seconds
+            except (ValueError, IndexError):
+                debug_log("Could not parse ONU uptime")
+
+    # 7. Parse memory info (from 'free | grep Mem')
+    # Format: Mem:  total  used  free  shared  buff/cache  available
+    meminfo_raw = sections.get('MEMORY', '')
+    if meminfo_raw:
+        with timed('parse_memory'):
+            try:
+                parts = meminfo_raw.split()
+                # parts[0] = "Mem:", parts[1] = total, parts[2] = used, etc.
+                if len(parts) >= 3 and parts[0].startswith('Mem'):
+                    mem_total = int(parts[1])
+                    mem_used = int(parts[2])
+                    if mem_total > 0:
+                        metrics['memory_used'] = mem_used
+                        metrics['memory_percent'] = round((mem_used / mem_total) * 100, 1)
+            except (ValueError, IndexError):
+                debug_log("Could not parse memory info")
+
+    # 8. Parse GTC counters (from 'pon gtc_counters_get')
+    # Format: errorcode=0 bip_errors=0 disc_gem_frames=... fec_codewords_corr=0 ...
+    gtc_raw = sections.get('GTC_COUNTERS', '')
+    if gtc_raw:
+        with timed('parse_gtc_counters'):
+            try:
+                for part in gtc_raw.split():
+                    if '=' in part:
+                        key, value = part.split('=', 1)
+                        if key == 'bip_errors':
+                            metrics['gtc_bip_errors'] = int(value)
+                        elif key == 'fec_codewords_corr':
+                            metrics['gtc_fec_corrected'] = int(value)
+                        elif key == 'fec_codewords_uncorr':
+                            metrics['gtc_fec_uncorrected'] = int(value)
+                        elif key == 'lods_events':
+                            metrics['gtc_lods_events'] = int(value)
+            except (ValueError, IndexError):
+                debug_log("Could not parse GTC counters")
+
+    # 9. Parse interface counters (with the ONU's uptime as timestamp)
+    net_dev_raw = sections.get('NET_DEV', '')
+    if net_dev_raw:
+        with timed('parse_net_dev'):
+            metrics.update(parse_net_dev(net_dev_raw))
+
+    # 10. Parse CPU load and our own session's CPU time
+    cpu_stat_raw = sections.get('CPU_STAT', '')
+    if cpu_stat_raw:
+        with timed('parse_cpu_stat'):
+            metrics.update(parse_cpu_stat(cpu_stat_raw, metrics.get('clock_uptime')))
+
+    return metrics
+
+def collect_device_info():
+    """
+    Collect static device information (run once at startup)
+
+    Uses a single SSH session with combined commands to avoid rate limiting.
+    """
+    print("\n📋 Collecting device information...")
+
+    try:
+        # Execute all commands in a single SSH session
+        combined_output = execute_ssh_command(DEVICE_INFO_COMMAND)
+
+        if not combined_output:
+            print("⚠ Could not retrieve device info via SSH")
+            return False
+
+        return parse_device_info_output(combined_output.decode('utf-8', errors='ignore'))
+
+    except Exception as e:
+        print(f"✗ Error parsing device info: {e}")
+        return False
+
+def record_update_duration(start_time):
+    """Track collection duration for the bridge statistics"""
+    duration = (time.time() - start_time) * 1000
+    stats['update_durations'].append(duration)
+    if len(stats['update_durations']) > 100:
+        stats['update_durations'].pop(0)
+
+    debug_log(f"Metrics collected in {duration:.0f}ms")
+
+def record_parse_error(e):
+    """Track a metric parsing failure in the bridge statistics"""
+    print(f"✗ Error parsing metrics: {e}")
+    stats['total_errors'] += 1
+    stats['consecutive_errors'] += 1
+    stats['last_error'] = f"Metric parsing error: {str(e)}"
+    stats['last_error_time'] = get_iso_timestamp()
+
+def get_due_sources(now):
+    """Return the metric sources whose polling period has elapsed"""
+    # Half a poll of slack so a tier isn't pushed back a whole tick by jitter
+    slack = POLL_INTERVAL_SECONDS / 2
+    return {
+        name for name, _, period in METRIC_SOURCES
+        if period <= 0 or name not in source_last_fetched
+        or now - source_last_fetched[name] + slack >= period
+    }
+
+def merge_metrics(metrics, source_names, now):
+    """Record fetched sources and merge fresh metrics into the latest snapshot"""
+    for name in source_names:
+        source_last_fetched[name] = now
+    latest_metrics.update(metrics)
+
+def collect_metrics():
+    """
+    Collect the real-time metrics that are due from WAS-110
+
+    Uses a single SSH session with multiple commands to avoid rate limiting.
+    Commands are separated by echo statements to create delimiters for parsing.
+    Only fresh values are returned; latest_metrics holds the merged snapshot.
+    """
+    start_time = time.time()
+    now = time.monotonic()
+    due_sources = get_due_sources(now)
+
+    try:
+        # Execute all commands in a single SSH session to avoid rate limiting
+        sent = time.monotonic()
+        combined_output = execute_ssh_command(build_metrics_command(due_sources))
+        received = time.monotonic()
+
+        if not combined_output:
+            debug_log("Combined SSH command failed")
+            return None
+
+        with timed('parse'):
+            metrics = parse_metrics_output(combined_output.decode('utf-8', errors='ignore'))
+        if metrics is None:
+            return None
+        metrics['sample_monotonic'], metrics['sample_time'] = time_sample(metrics, sent, received)
+
+        merge_metrics(metrics, due_sources, now)
+        debug_log(f"Fetched sources: {', '.join(sorted(due_sources))}")
+        record_update_duration(start_time)
         return metrics
 
     except Exception as e:
-        print(f"✗ Error parsing metrics: {e}")
-        stats['total_errors'] += 1
-        stats['consecutive_errors'] += 1
-        stats['last_error'] = f"Metric parsing error: {str(e)}"
-        stats['last_error_time'] = get_iso_timestamp()
+        record_parse_error(e)
         return None
 
-# ==============================================================================
-# --- Main Monitoring Loop ---
-# ==============================================================================
+def collect_startup_snapshot():
+    """
+    Collect device info and the first metrics in one SSH round-trip.
 
-def publish_all_discovery():
-    """Publish discovery configs for all sensors"""
-    print("\n📡 Publishing MQTT Auto Discovery configs...")
+    Used by the fast startup path: a successful round-trip also serves as the
+    SSH connectivity check, so no separate echo probe is needed.
+    Returns the metrics dict, or None if the round-trip failed.
+    """
+    start_time = time.time()
 
-    # Optical Performance Sensors
-    publish_sensor_discovery("rx_power_dbm", "RX Power", "dBm", "signal_strength", "mdi:access-point", "measurement")
-    publish_sensor_discovery("rx_power_mw", "RX Power (mW)", "mW", "power", "mdi:access-point", "measurement")
-    publish_sensor_discovery("tx_power_dbm", "TX Power", "dBm", "signal_strength", "mdi:access-point", "measurement")
-    publish_sensor_discovery("tx_power_mw", "TX Power (mW)", "mW", "power", "mdi:access-point", "measurement")
-    publish_sensor_discovery("voltage", "Voltage", "V", "voltage", "mdi:flash", "measurement")
-    publish_sensor_discovery("tx_bias", "TX Bias Current", "mA", "current", "mdi:current-ac", "measurement")
+    try:
+        sent = time.monotonic()
+        combined_output = execute_ssh_command(
+            f"{DEVICE_INFO_COMMAND} && echo '{SNAPSHOT_DELIMITER}' && {METRICS_COMMAND}"
+        )
+        received = time.monotonic()
 
-    # Temperature Sensors
-    publish_sensor_discovery("optic_temperature", "Optic Temperature", "°C", "temperature", "mdi:thermometer-laser", "measurement")
-    publish_sensor_discovery("cpu0_temperature", "CPU0 Temperature", "°C", "temperature", "mdi:chip", "measurement")
-    publish_sensor_discovery("cpu1_temperature", "CPU1 Temperature", "°C", "temperature", "mdi:chip", "measurement")
+        if not combined_output:
+            return None
 
-    # Link Status Binary Sensors
-    publish_binary_sensor_discovery("pon_link_status", "PON Link", "connectivity", "mdi:fiber-optic")
-    publish_binary_sensor_discovery("ssh_connection_status", "SSH Connection", "connectivity", "mdi:lan-connect")
+        info_output, _, metrics_output = combined_output.decode('utf-8', errors='ignore').partition(SNAPSHOT_DELIMITER)
+        if not parse_device_info_output(info_output):
+            print("⚠ Continuing with limited device info...")
 
-    # Network Performance
-    publish_sensor_discovery("ethernet_speed", "Ethernet Speed", "Mbps", None, "mdi:ethernet", "measurement")
+        metrics = parse_metrics_output(metrics_output)
+        if metrics is None:
+            return None
+        metrics['sample_monotonic'], metrics['sample_time'] = time_sample(metrics, sent, received)
 
-    # Device Information Sensors
-    publish_sensor_discovery("vendor_name", "Vendor", None, None, "mdi:factory")
-    publish_sensor_discovery("part_number", "Part Number", None, None, "mdi:barcode")
-    publish_sensor_discovery("hardware_revision", "Hardware Revision", None, None, "mdi:chip")
-    publish_sensor_discovery("pon_mode", "PON Mode", None, None, "mdi:wan")
-    publish_sensor_discovery("firmware_bank", "Active Firmware Bank", None, None, "mdi:alphabet-latin")
+        merge_metrics(metrics, {name for name, _, _ in METRIC_SOURCES}, time.monotonic())
+        record_update_duration(start_time)
+        return metrics
 
-    # New v2.0 sensors - ISP and system info (main sensors)
-    publish_sensor_discovery("isp", "ISP", None, None, "mdi:web")
+    except Exception as e:
+        record_parse_error(e)
+        return None
 
-    # Diagnostic sensors (hidden in diagnostic section)
-    publish_sensor_discovery("gpon_serial", "GPON Serial", None, None, "mdi:identifier", None, "diagnostic", False)  # Disabled by default - sensitive
-    publish_sensor_discovery("module_type", "Module Type", None, None, "mdi:chip", None, "diagnostic")
-    publish_sensor_discovery("pon_vendor_id", "PON Vendor ID", None, None, "mdi:identifier", None, "diagnostic")
-    publish_sensor_discovery("onu_uptime", "ONU Uptime", "s", "duration", "mdi:timer-outline", "total_increasing", "diagnostic")
-    publish_sensor_discovery("memory_percent", "Memory Usage", "%", None, "mdi:memory", "measurement", "diagnostic")
-    publish_sensor_discovery("memory_used", "Memory Used", "kB", None, "mdi:memory", "measurement", "diagnostic")
+# ==============================================================================
+# --- Main Monitoring Loop ---
+# ==============================================================================
 
-    # PON state details
-    publish_sensor_discovery("pon_state_name", "PON State", None, None, "mdi:state-machine")
-    publish_sensor_discovery("pon_time_in_state", "PON Time in State", "s", "duration", "mdi:timer", "measurement", "diagnostic")
+def publish_all_discovery():
+    """Publish discovery configs for all sensors"""
+    print("\n📡 Publishing MQTT Auto Discovery configs...")
+    device_components.clear()
 
-    # GTC error counters (diagnostic)
-    publish_sensor_discovery("gtc_bip_errors", "GTC BIP Errors", None, None, "mdi:alert-circle-outline", "total_increasing", "diagnostic")
-    publish_sensor_discovery("gtc_fec_corrected", "GTC FEC Corrected", None, None, "mdi:check-circle-outline", "total_increasing", "diagnostic")
-    publish_sensor_discovery("gtc_fec_uncorrected", "GTC FEC Uncorrected", None, None, "mdi:close-circle-outline", "total_increasing", "diagnostic")
-    publish_sensor_discovery("gtc_lods_events", "GTC LODS Events", None, None, "mdi:signal-off", "total_increasing", "diagnostic")
+    for entry in SENSOR_REGISTRY:
+        publish_entity_discovery(entry)
 
-    # System Statistics
-    publish_sensor_discovery("bridge_uptime", "Bridge Uptime", "s", "duration", "mdi:timer-outline", "total_increasing")
+    if DISCOVERY_MODE == "device":
+        clear_entity_discovery()
+        publish_device_discovery()
 
     print("✓ Discovery configs published\n")
 
-def monitor_was_110():
-    """Main monitoring loop"""
+def publish_device_info_states(timestamp):
+    """Publish the static device info sensors"""
+    publish_group("device_info", device_info, timestamp)
+
+def publish_bridge_stats(timestamp):
+    """Publish Bridge Uptime (with statistics attributes) and the latency sensors"""
+    avg_duration = sum(stats['update_durations']) / len(stats['update_durations']) if stats['update_durations'] else 0
+    error_rate = (stats['total_errors'] / stats['total_updates'] * 100) if stats['total_updates'] > 0 else 0
+    latency_summary = get_latency_summary()
+
+    publish_group("bridge", {
+        'uptime': int(time.time() - stats['start_time']),
+        'latency': latency_summary,
+        'attributes': {
+            "total_updates": stats['total_updates'],
+            "total_errors": stats['total_errors'],
+            "consecutive_errors": stats['consecutive_errors'],
+            "error_rate_percent": round(error_rate, 2),
+            "last_error": stats['last_error'],
+            "last_error_time": stats['last_error_time'],
+            "ssh_reconnections": stats['ssh_reconnections'],
+            "mqtt_reconnections": stats['mqtt_reconnections'],
+            "mqtt_session_present": stats['mqtt_session_present'],
+            "mqtt_topic_aliases": len(topic_aliases['aliases']),
+            "average_update_duration_ms": round(avg_duration, 0),
+            "spool_pending": spool['pending'],
+            "spool_dropped": spool['dropped'],
+            "last_response_bytes": stats['last_response_bytes'],
+            "stage_latency_ms": latency_summary,
+            "version": VERSION
+        },
+    }, timestamp)
+
+def publish_metrics(metrics, timestamp):
+    """Publish one round of collected metrics and bridge statistics"""
+    if 'pon_status' in metrics:
+        # Flap detection from time in state (no extra remote commands), on
+        # the ONU's clock so SSH latency doesn't pass for time in state
+        now = metrics.get('sample_monotonic', time.monotonic())
+        track_pon_transition(metrics['pon_status'], now)
+        metrics = {**metrics, 'pon_flaps': get_pon_flap_stats(now)}
+
+    if module_limits:
+        # Alarms follow every sample, no HA template needed
+        metrics = {**metrics, **evaluate_alarms(metrics)}
+
+    # Steps and drifts in optical power, no recorder queries needed
+    metrics = {**metrics, **detect_changes(metrics)}
+
+    # Traffic rates between this read of the counters and the last
+    if 'counters_uptime' in metrics:
+        metrics = {**metrics, **compute_throughput(metrics)}
+
+    # CPU usage and the monitor's overhead since the last poll
+    if 'cpu_jiffies' in metrics:
+        metrics = {**metrics, **compute_cpu_load(metrics)}
+
+    # Laser aging with the temperature taken out, in O(1) per sample
+    metrics = {**metrics, **update_laser_trends(metrics)}
+
+    if SNAPSHOT_FORMAT:
+        publish_snapshot(metrics)
+    publish_group("metrics", metrics, timestamp)
+
+    # Update statistics
+    stats['total_updates'] += 1
+    stats['consecutive_errors'] = 0
+
+    # Bridge statistics are slow-changing; availability covers liveness
+    now = time.monotonic()
+    if stats['stats_published_at'] is None or now - stats['stats_published_at'] >= BRIDGE_STATS_SECONDS:
+        stats['stats_published_at'] = now
+        publish_bridge_stats(timestamp)
+        # Trends change slowly; losing a few minutes of them on a crash is harmless
+        save_laser_trends()
+
+    print(f"✓ Update #{stats['total_updates']}: RX={metrics.get('rx_power_dbm', 'N/A')}dBm, TX={metrics.get('tx_power_dbm', 'N/A')}dBm, Temp={metrics.get('optic_temp', 'N/A')}°C, Link={'UP' if metrics.get('pon_status', {}).get('link_up') else 'DOWN'}")
+
+def monitor_was_110(initial_metrics=None):
+    """
+    Main monitoring loop
+
+    initial_metrics comes from the fast startup snapshot, which has already
+    collected device info; it is published right after discovery.
+    """
     global device_info, stats
 
     print("\n=== Starting WAS-110 Monitoring ===\n")
 
     # Collect device info once at startup
-    if not collect_device_info():
+    if initial_metrics is None and not collect_device_info():
         print("⚠ Continuing with limited device info...")
 
     # Publish all discovery configs
@@ -893,168 +2830,45 @@ def monitor_was_110():
 
     # Publish static device info sensors
     timestamp = get_iso_timestamp()
-    publish_sensor_state("vendor_name", device_info.get('vendor_name', 'Unknown'), {"last_update": timestamp})
-    publish_sensor_state("part_number", device_info.get('part_number', 'Unknown'), {"last_update": timestamp})
-    publish_sensor_state("hardware_revision", device_info.get('revision', 'Unknown'), {"last_update": timestamp})
-    publish_sensor_state("pon_mode", device_info.get('pon_mode', 'Unknown'), {"last_update": timestamp})
-    publish_sensor_state("firmware_bank", device_info.get('firmware_bank', 'Unknown'), {"last_update": timestamp})
-
-    # Publish new v2.0 device info sensors
-    publish_sensor_state("isp", device_info.get('isp', 'Unknown'), {"last_update": timestamp})
-    publish_sensor_state("gpon_serial", device_info.get('gpon_serial', 'Unknown'), {"last_update": timestamp})
-    publish_sensor_state("module_type", device_info.get('module_type', 'Unknown'), {"last_update": timestamp})
-    publish_sensor_state("pon_vendor_id", device_info.get('pon_vendor_id', 'Unknown'), {"last_update": timestamp})
-
-    # FIX: Re-publish SSH status after discovery configs are sent
-    # This ensures Home Assistant receives initial state AFTER entity exists
-    publish_binary_sensor_state("ssh_connection_status", True, {
-        "last_update": timestamp,
-        "source": "post_discovery_sync"
-    })
-    debug_log("Re-published SSH connection status after discovery configs")
+    publish_device_info_states(timestamp)
+    identity_fetched_at = time.monotonic()
+
+    # SSH was verified during startup; published after discovery so the
+    # availability topic matches the device id and HA knows the entity
+    set_onu_available(True)
+
+    if initial_metrics:
+        publish_metrics(initial_metrics, get_sample_timestamp(initial_metrics))
+        if stats['mqtt_connected_at'] is not None:
+            print(f"✓ First metrics published {(time.monotonic() - stats['mqtt_connected_at']) * 1000:.0f}ms after broker connect")
+        stop_event.wait(POLL_INTERVAL_SECONDS)
 
     print("📊 Entering monitoring loop (Ctrl+C to stop)...\n")
+    replayed_at = time.monotonic()
 
     # Main monitoring loop
     while not stop_event.is_set():
         try:
-            timestamp = get_iso_timestamp()
+            # Drain a batch of any outage backlog before publishing fresh samples,
+            # SPOOL_REPLAY_RATE messages per second since the last tick
+            now = time.monotonic()
+            if spool['pending']:
+                replay_spool(max(1, int(SPOOL_REPLAY_RATE * (now - replayed_at))) if SPOOL_REPLAY_RATE > 0 else None)
+            replayed_at = now
+
+            # Identity tier: EEPROM50/uci values rarely change, refresh them slowly
+            if time.monotonic() - identity_fetched_at >= IDENTITY_POLL_SECONDS:
+                identity_fetched_at = time.monotonic()
+                if collect_device_info():
+                    publish_device_info_states(get_iso_timestamp())
 
             # Collect metrics
             metrics = collect_metrics()
 
             if metrics:
-                # Publish optical metrics
-                if 'rx_power_dbm' in metrics:
-                    publish_sensor_state("rx_power_dbm", metrics['rx_power_dbm'], {"last_update": timestamp, "source": "eeprom51"})
-                if 'rx_power_mw' in metrics:
-                    publish_sensor_state("rx_power_mw", metrics['rx_power_mw'], {"last_update": timestamp, "source": "eeprom51"})
-                if 'tx_power_dbm' in metrics:
-                    publish_sensor_state("tx_power_dbm", metrics['tx_power_dbm'], {"last_update": timestamp, "source": "eeprom51"})
-                if 'tx_power_mw' in metrics:
-                    publish_sensor_state("tx_power_mw", metrics['tx_power_mw'], {"last_update": timestamp, "source": "eeprom51"})
-                if 'voltage' in metrics:
-                    publish_sensor_state("voltage", metrics['voltage'], {"last_update": timestamp, "source": "eeprom51"})
-                if 'tx_bias' in metrics:
-                    publish_sensor_state("tx_bias", metrics['tx_bias'], {"last_update": timestamp, "source": "eeprom51"})
-
-                # Publish temperature metrics
-                if 'optic_temp' in metrics:
-                    temp_f = round(metrics['optic_temp'] * 1.8 + 32, 1)
-                    publish_sensor_state("optic_temperature", metrics['optic_temp'], {
-                        "last_update": timestamp,
-                        "fahrenheit": temp_f,
-                        "source": "eeprom51"
-                    })
-                if 'cpu0_temp' in metrics:
-                    temp_f = round(metrics['cpu0_temp'] * 1.8 + 32, 1)
-                    publish_sensor_state("cpu0_temperature", metrics['cpu0_temp'], {
-                        "last_update": timestamp,
-                        "fahrenheit": temp_f
-                    })
-                if 'cpu1_temp' in metrics:
-                    temp_f = round(metrics['cpu1_temp'] * 1.8 + 32, 1)
-                    publish_sensor_state("cpu1_temperature", metrics['cpu1_temp'], {
-                        "last_update": timestamp,
-                        "fahrenheit": temp_f
-                    })
-
-                # Publish PON link status
-                if 'pon_status' in metrics:
-                    pon = metrics['pon_status']
-                    publish_binary_sensor_state("pon_link_status", pon['link_up'], {
-                        "state_code": pon['state_code'],
-                        "state_name": pon['state_name'],
-                        "time_in_state_seconds": pon.get('time_in_state_seconds', 0),
-                        "time_in_state_formatted": pon.get('time_in_state_formatted', '0s'),
-                        "last_update": timestamp
-                    })
-
-                # Publish ethernet speed
-                if 'eth_speed' in metrics:
-                    speed = metrics['eth_speed']
-                    speed_gbps = speed / 1000 if speed >= 1000 else 0
-                    publish_sensor_state("ethernet_speed", speed, {
-                        "last_update": timestamp,
-                        "link_detected": speed > 0,
-                        "speed_formatted": f"{speed_gbps} Gbps" if speed_gbps > 0 else f"{speed} Mbps"
-                    })
-
-                # Publish new v2.0 runtime metrics
-                # ONU uptime
-                if 'onu_uptime' in metrics:
-                    uptime_secs = metrics['onu_uptime']
-                    hours = uptime_secs // 3600
-                    minutes = (uptime_secs % 3600) // 60
-                    days = hours // 24
-                    formatted = f"{days}d {hours % 24}h {minutes}m" if days > 0 else f"{hours}h {minutes}m"
-                    publish_sensor_state("onu_uptime", uptime_secs, {
-                        "last_update": timestamp,
-                        "formatted": formatted
-                    })
-
-                # Memory usage
-                if 'memory_percent' in metrics:
-                    publish_sensor_state("memory_percent", metrics['memory_percent'], {
-                        "last_update": timestamp
-                    })
-                if 'memory_used' in metrics:
-                    publish_sensor_state("memory_used", metrics['memory_used'], {
-                        "last_update": timestamp
-                    })
-
-                # PON state details
-                if 'pon_status' in metrics:
-                    pon = metrics['pon_status']
-                    publish_sensor_state("pon_state_name", pon['state_name'], {
-                        "last_update": timestamp,
-                        "state_code": pon['state_code']
-                    })
-                    publish_sensor_state("pon_time_in_state", pon.get('time_in_state_seconds', 0), {
-                        "last_update": timestamp,
-                        "formatted": pon.get('time_in_state_formatted', '0s')
-                    })
-
-                # GTC counters
-                if 'gtc_bip_errors' in metrics:
-                    publish_sensor_state("gtc_bip_errors", metrics['gtc_bip_errors'], {"last_update": timestamp})
-                if 'gtc_fec_corrected' in metrics:
-                    publish_sensor_state("gtc_fec_corrected", metrics['gtc_fec_corrected'], {"last_update": timestamp})
-                if 'gtc_fec_uncorrected' in metrics:
-                    publish_sensor_state("gtc_fec_uncorrected", metrics['gtc_fec_uncorrected'], {"last_update": timestamp})
-                if 'gtc_lods_events' in metrics:
-                    publish_sensor_state("gtc_lods_events", metrics['gtc_lods_events'], {"last_update": timestamp})
-
-                # Update statistics
-                stats['total_updates'] += 1
-                stats['consecutive_errors'] = 0
-
-                # Publish bridge statistics
-                uptime = int(time.time() - stats['start_time'])
-                avg_duration = sum(stats['update_durations']) / len(stats['update_durations']) if stats['update_durations'] else 0
-                error_rate = (stats['total_errors'] / stats['total_updates'] * 100) if stats['total_updates'] > 0 else 0
-
-                publish_sensor_state("bridge_uptime", uptime, {
-                    "total_updates": stats['total_updates'],
-                    "total_errors": stats['total_errors'],
-                    "consecutive_errors": stats['consecutive_errors'],
-                    "error_rate_percent": round(error_rate, 2),
-                    "last_update": timestamp,
-                    "last_error": stats['last_error'],
-                    "last_error_time": stats['last_error_time'],
-                    "ssh_reconnections": stats['ssh_reconnections'],
-                    "average_update_duration_ms": round(avg_duration, 0),
-                    "version": VERSION
-                })
-
-                # Periodic SSH status - confirms connection still healthy
-                publish_binary_sensor_state("ssh_connection_status", True, {
-                    "last_update": timestamp,
-                    "consecutive_errors": stats['consecutive_errors'],
-                    "source": "monitoring_loop"
-                })
-
-                print(f"✓ Update #{stats['total_updates']}: RX={metrics.get('rx_power_dbm', 'N/A')}dBm, TX={metrics.get('tx_power_dbm', 'N/A')}dBm, Temp={metrics.get('optic_temp', 'N/A')}°C, Link={'UP' if metrics.get('pon_status', {}).get('link_up') else 'DOWN'}")
+                set_onu_available(True)
+                with timed('publish'):
+                    publish_metrics(metrics, get_sample_timestamp(metrics))
 
             else:
                 print("⚠ Failed to collect metrics")
@@ -1065,6 +2879,11 @@ def monitor_was_110():
                     if not connect_ssh():
                         print("⚠ SSH reconnection failed, will retry next cycle")
                         stats['ssh_reconnections'] += 1
+                        # ONU entities go unavailable instead of showing stale values
+                        set_onu_available(False)
+                    else:
+                        # Possibly a rebooted or swapped module: re-read identity and limits
+                        identity_fetched_at = float('-inf')
 
             # Wait for next poll interval
             stop_event.wait(POLL_INTERVAL_SECONDS)
@@ -1093,8 +2912,6 @@ def run_test_mode():
     print("--- 1. Testing MQTT Connection ---")
     if connect_mqtt():
         print("✓ MQTT Broker Connection: SUCCESS")
-        # Wait a moment for connection to establish before disconnecting
-        time.sleep(2)
         ha_mqtt_client.disconnect()
         ha_mqtt_client.loop_stop()
     else:
@@ -1134,12 +2951,166 @@ def run_test_mode():
     print("\nTest mode finished.")
 
 
+# ==============================================================================
+# --- One-shot Mode ---
+# ==============================================================================
+
+def _influx_escape(value):
+    """Escape an InfluxDB line protocol tag value"""
+    return re.sub(r'([,= \\])', r'\\\1', str(value))
+
+def _prometheus_label(value):
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _influx_field(value):
+    """Format an InfluxDB line protocol field value (None for unrepresentable values)"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return f"{value}i"
+    if isinstance(value, float):
+        return repr(value) if math.isfinite(value) else None
+    escaped = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{escaped}"'
+
+def format_json(metrics):
+    """The snapshot as one JSON object: sample time, device info and metric sensors"""
+    return json.dumps({
+        "ts": round(metrics.get('sample_time', time.time()), 3),
+        "host": WAS_110_HOST,
+        "device": get_group_values("device_info", device_info),
+        "metrics": get_group_values("metrics", metrics),
+    }, separators=(",", ":"), default=str)
+
+def format_influx(metrics):
+    """The snapshot as one InfluxDB line (telegraf exec, data_format = "influx"), None without fields"""
+    tags = f"host={_influx_escape(WAS_110_HOST)},serial={_influx_escape(device_serial)}"
+    fields = []
+    for sensor_id, value in get_group_values("metrics", metrics).items():
+        field = _influx_field(value)
+        if field is not None:
+            fields.append(f"{sensor_id}={field}")
+    if not fields:
+        # A line without fields is invalid and telegraf would reject the whole batch
+        return None
+    timestamp = int(metrics.get('sample_time', time.time()) * 1e9)
+    return f"was110,{tags} {','.join(fields)} {timestamp}"
+
+def format_prometheus(metrics):
+    """The snapshot's numeric sensors as Prometheus gauges (telegraf exec, node_exporter textfile), None without any"""
+    labels = f'{{host="{_prometheus_label(WAS_110_HOST)}",serial="{_prometheus_label(device_serial)}"}}'
+    lines = []
+    for sensor_id, value in get_group_values("metrics", metrics).items():
+        if isinstance(value, bool):
+            value = int(value)
+        if not isinstance(value, (int, float)) or not math.isfinite(value):
+            continue
+        lines.append(f"# TYPE was110_{sensor_id} gauge")
+        lines.append(f"was110_{sensor_id}{labels} {value}")
+    return "\n".join(lines) or None
+
+ONCE_FORMATTERS = {"json": format_json, "influx": format_influx, "prom": format_prometheus}
+
+def run_once(output_format):
+    """
+    One-shot mode (--once): a single SSH round trip, the snapshot on stdout
+
+    For cron jobs and telegraf's exec input: no MQTT connection (paho is never
+    imported) and no state files. Status lines go to stderr with DEBUG_MODE and
+    are dropped otherwise, so stdout is only the snapshot.
+    Returns the exit status.
+    """
+    with contextlib.ExitStack() as stack:
+        status = sys.stderr if DEBUG_MODE else stack.enter_context(open(os.devnull, "w"))  # noqa: SIM115
+        stack.enter_context(contextlib.redirect_stdout(status))
+        metrics = collect_startup_snapshot()
+
+    if metrics is None:
+        print(f"✗ Could not collect metrics from {WAS_110_HOST}: {stats['last_error'] or 'no output'}", file=sys.stderr)
+        return 1
+
+    if module_limits:
+        metrics = {**metrics, **evaluate_alarms(metrics)}
+    output = ONCE_FORMATTERS[output_format](metrics)
+    if output is None:
+        print(f"✗ No metric values to output as {output_format}", file=sys.stderr)
+        return 1
+    print(output)
+    return 0
+
 # ==============================================================================
 # --- Main ---
 # ==============================================================================
 
+def validate_config():
+    """
+    Fall back from invalid settings, warning on stderr
+
+    Run from main() rather than at import, so importing the script (tests,
+    one-shot runs) prints nothing.
+    """
+    global MQTT_TOPIC_ALIASES, SSH_PROFILE, SNAPSHOT_FORMAT
+
+    if MQTT_TOPIC_ALIASES and MQTT_SESSION_EXPIRY <= 0:
+        print("⚠ MQTT_TOPIC_ALIASES needs MQTT v5 (MQTT_SESSION_EXPIRY > 0), topic aliases disabled", file=sys.stderr)
+        MQTT_TOPIC_ALIASES = 0
+    if SSH_PROFILE not in SSH_PROFILES:
+        print(f"⚠ Unknown SSH_PROFILE '{SSH_PROFILE}', using 'default'", file=sys.stderr)
+        SSH_PROFILE = "default"
+    if SNAPSHOT_FORMAT and SNAPSHOT_FORMAT not in SNAPSHOT_CONTENT_TYPES:
+        print(f"⚠ Unknown SNAPSHOT_FORMAT '{SNAPSHOT_FORMAT}', using 'json'", file=sys.stderr)
+        SNAPSHOT_FORMAT = "json"
+
+def parse_args(argv=None):
+    """Parse the command line; without arguments the bridge runs as a daemon"""
+    parser = argparse.ArgumentParser(description="WAS-110 XGS-PON ONU to Home Assistant MQTT bridge")
+    parser.add_argument("--once", action="store_true",
+                        help="collect one snapshot over a single SSH round trip, print it and exit")
+    parser.add_argument("--format", choices=sorted(ONCE_FORMATTERS), default="json",
+                        help="output format for --once (default: json)")
+    return parser.parse_args(argv)
+
+def fast_startup():
+    """
+    Startup fast path (FAST_STARTUP=true).
+
+    Skips the fixed stabilization sleeps and the separate SSH echo probe: the
+    startup snapshot (device info + first metrics in one SSH round-trip) runs
+    while the MQTT connection is being established. Discovery is published
+    without throttling before the first states, since HA drops state updates
+    for entities it has not discovered yet.
+    Returns the first metrics; exits if either connection fails.
+    """
+    snapshot = {}
+    ssh_thread = threading.Thread(
+        target=lambda: snapshot.update(metrics=collect_startup_snapshot()),
+        daemon=True
+    )
+    ssh_thread.start()
+
+    mqtt_connected = connect_mqtt()
+    ssh_thread.join(SSH_TIMEOUT_SECONDS + 1)
+
+    if not mqtt_connected:
+        print("✗ Failed to connect to MQTT broker, exiting")
+        sys.exit(1)
+
+    metrics = snapshot.get('metrics')
+    if metrics is None:
+        print("✗ Failed to connect to WAS-110, exiting")
+        sys.exit(1)
+
+    print("✓ SSH connection appears to be working.")
+    return metrics
+
 def main():
     """Main entry point"""
+    args = parse_args()
+    validate_config()
+    if args.once:
+        sys.exit(run_once(args.format))
+
     print("\n" + "="*70)
     print("  8311 HA Bridge v{VERSION} - WAS-110 to Home Assistant".replace("{VERSION}", VERSION))
     print("  Based on Gemini research + Claude architecture")
@@ -1149,33 +3120,51 @@ def main():
         run_test_mode()
         sys.exit(0)
 
-    # Connect to MQTT broker
-    if not connect_mqtt():
-        print("✗ Failed to connect to MQTT broker, exiting")
-        sys.exit(1)
+    spool_init()
+    load_laser_trends()
 
-    # Wait for MQTT connection to stabilize
-    time.sleep(2)
+    # `docker kill -s USR1 <container>` captures a profile without a restart
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: start_profile(reason="SIGUSR1"))  # noqa: ARG005
 
-    # Connect to WAS-110 via SSH
-    if not connect_ssh():
-        print("✗ Failed to connect to WAS-110, exiting")
-        sys.exit(1)
+    initial_metrics = None
+    if FAST_STARTUP:
+        initial_metrics = fast_startup()
+    else:
+        # Connect to MQTT broker
+        if not connect_mqtt():
+            print("✗ Failed to connect to MQTT broker, exiting")
+            sys.exit(1)
+
+        # Wait for MQTT connection to stabilize
+        time.sleep(2)
 
-    # Wait for SSH connection to stabilize
-    time.sleep(1)
+        # Connect to WAS-110 via SSH
+        if not connect_ssh():
+            print("✗ Failed to connect to WAS-110, exiting")
+            sys.exit(1)
+
+        # Wait for SSH connection to stabilize
+        time.sleep(1)
 
     try:
         # Start monitoring
-        monitor_was_110()
+        monitor_was_110(initial_metrics)
     except KeyboardInterrupt:
         print("\n⚠ Keyboard interrupt received")
     finally:
         # Cleanup
         print("\n🛑 Shutting down...")
         stop_event.set()
+        _close_spool_segment()
+        save_laser_trends()
 
         if ha_mqtt_client:
+            # A clean disconnect doesn't trigger the LWT, so say goodbye explicitly
+            try:
+                ha_mqtt_client.publish(BRIDGE_AVAILABILITY_TOPIC, "offline", qos=1, retain=True).wait_for_publish(2)
+            except Exception as e:
+                debug_log(f"Could not publish offline availability: {e}")
             ha_mqtt_client.loop_stop()
             ha_mqtt_client.disconnect()
 
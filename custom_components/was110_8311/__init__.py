@@ -3,12 +3,29 @@ from __future__ import annotations
 
 import logging
 
-from homeassistant.config_entries import ConfigEntry
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-
-from .const import DOMAIN
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
+
+from .const import CONF_HOSTS, DOMAIN
 from .coordinator import WAS110Coordinator
+from .hub import WAS110Hub, entry_coordinators
+from .profiling import (
+    ATTR_DURATION,
+    ATTR_TOP_N,
+    DEFAULT_PROFILE_DURATION,
+    DEFAULT_PROFILE_TOP_N,
+    SERVICE_PROFILE,
+    async_capture_profile,
+)
 
 __all__ = ["DOMAIN"]
 
@@ -16,21 +33,73 @@ _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.BINARY_SENSOR]
 
-type WAS110ConfigEntry = ConfigEntry[WAS110Coordinator]
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_PROFILE_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=600)
+        ),
+        vol.Optional(ATTR_TOP_N, default=DEFAULT_PROFILE_TOP_N): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=200)
+        ),
+    }
+)
+
+type WAS110ConfigEntry = ConfigEntry[WAS110Coordinator | WAS110Hub]
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:  # noqa: ARG001
+    """Set up the 8311 ONU Monitor services."""
+
+    async def async_handle_profile(call: ServiceCall) -> ServiceResponse:
+        """Capture a time-boxed profile and allocation snapshot."""
+        result = await async_capture_profile(
+            hass, call.data[ATTR_DURATION], call.data[ATTR_TOP_N]
+        )
+        # Keep the latest summary for the diagnostics download
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            if entry.state is ConfigEntryState.LOADED:
+                entry.runtime_data.last_profile = result
+        return result
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_handle_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: WAS110ConfigEntry) -> bool:
     """Set up 8311 ONU Monitor from a config entry."""
-    coordinator = WAS110Coordinator(hass, entry)
+    runtime_data: WAS110Coordinator | WAS110Hub
+    if CONF_HOSTS in entry.data:
+        runtime_data = WAS110Hub(hass, entry)
+    else:
+        runtime_data = WAS110Coordinator(hass, entry)
 
-    await coordinator.async_config_entry_first_refresh()
+    await runtime_data.async_config_entry_first_refresh()
 
-    entry.runtime_data = coordinator
+    entry.runtime_data = runtime_data
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     entry.async_on_unload(entry.add_update_listener(async_update_options))
 
+    if isinstance(runtime_data, WAS110Hub):
+        runtime_data.async_start()
+
+    for coordinator in entry_coordinators(entry):
+        coordinator.async_start_fast_sampling()
+
+        # Loaded after setup so the persisted history never delays startup
+        entry.async_create_background_task(
+            hass, coordinator.async_restore_history(), f"{DOMAIN}_restore_history"
+        )
+
     return True
 
 
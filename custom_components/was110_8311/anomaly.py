@@ -0,0 +1,75 @@
+"""Online change-point detection on optical readings for 8311 ONU Monitor."""
+from __future__ import annotations
+
+import math
+from typing import Final
+
+# Metrics watched for drifts and steps, as name -> coordinator data key
+ANOMALY_METRICS: Final = {"rx_power": "rx_power_dbm", "tx_power": "tx_power_dbm"}
+
+# Weight of each sample in the running baseline (mean and variance)
+EWMA_ALPHA: Final = 0.05
+# CUSUM slack and decision threshold, in standard deviations
+CUSUM_DRIFT: Final = 0.5
+CUSUM_THRESHOLD: Final = 8.0
+# Samples used to learn the baseline before anything is reported
+WARMUP_SAMPLES: Final = 10
+# Readings are quantized to 0.01 dB and can be perfectly flat for hours; this
+# floor keeps the first 0.05 dB wiggle of a quiet link from scoring as a step
+MIN_STD_DB: Final = 0.1
+
+# Coordinator data keys derived from the detectors
+ANOMALY_KEYS: Final = frozenset(
+    f"{name}_{suffix}"
+    for name in ANOMALY_METRICS
+    for suffix in ("anomaly_score", "last_change")
+)
+
+
+class ChangeDetector:
+    """EWMA baseline with a two-sided CUSUM on the standardized residual.
+
+    Each update is a handful of float operations and no history is kept.
+    Sudden steps trip the CUSUM within a few samples; slow drifts (faster
+    than the baseline adapts) accumulate until they do. After a detection
+    the baseline restarts from the new level, so a step is reported once.
+    """
+
+    __slots__ = ("count", "mean", "variance", "upper", "lower")
+
+    def __init__(self) -> None:
+        """Initialize the detector."""
+        self.count = 0
+        self.mean = 0.0
+        self.variance = 0.0
+        self.upper = 0.0
+        self.lower = 0.0
+
+    @property
+    def score(self) -> float:
+        """Return the CUSUM statistic as a fraction of the threshold."""
+        return max(self.upper, self.lower) / CUSUM_THRESHOLD
+
+    def update(self, value: float) -> float | None:
+        """Add a sample; return the step from the baseline on a change."""
+        self.count += 1
+        if self.count == 1:
+            self.mean = value
+            return None
+
+        deviation = value - self.mean
+        if self.count > WARMUP_SAMPLES:
+            z = deviation / max(math.sqrt(self.variance), MIN_STD_DB)
+            self.upper = max(0.0, self.upper + z - CUSUM_DRIFT)
+            self.lower = max(0.0, self.lower - z - CUSUM_DRIFT)
+            if self.upper > CUSUM_THRESHOLD or self.lower > CUSUM_THRESHOLD:
+                self.count = 1
+                self.mean = value
+                self.variance = self.upper = self.lower = 0.0
+                return deviation
+
+        self.mean += EWMA_ALPHA * deviation
+        self.variance = (1 - EWMA_ALPHA) * (
+            self.variance + EWMA_ALPHA * deviation * deviation
+        )
+        return None
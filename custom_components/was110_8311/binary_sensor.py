@@ -14,6 +14,7 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     ATTR_CONSECUTIVE_ERRORS,
+    ATTR_LEVEL,
     ATTR_STATE_CODE,
     ATTR_STATE_NAME,
     ATTR_TIME_IN_STATE,
@@ -23,6 +24,7 @@ from .const import (
     MODEL,
 )
 from .coordinator import WAS110Coordinator
+from .hub import entry_coordinators
 
 BINARY_SENSOR_DESCRIPTIONS: tuple[BinarySensorEntityDescription, ...] = (
     BinarySensorEntityDescription(
@@ -37,6 +39,37 @@ BINARY_SENSOR_DESCRIPTIONS: tuple[BinarySensorEntityDescription, ...] = (
         device_class=BinarySensorDeviceClass.CONNECTIVITY,
         icon="mdi:ssh",
     ),
+    # Readings outside the module's own SFF-8472 warning or alarm limits
+    BinarySensorEntityDescription(
+        key="temperature_problem",
+        name="Optic Temperature Problem",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        icon="mdi:thermometer-alert",
+    ),
+    BinarySensorEntityDescription(
+        key="voltage_problem",
+        name="Voltage Problem",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        icon="mdi:flash-alert",
+    ),
+    BinarySensorEntityDescription(
+        key="tx_bias_problem",
+        name="TX Bias Problem",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        icon="mdi:current-dc",
+    ),
+    BinarySensorEntityDescription(
+        key="tx_power_problem",
+        name="TX Power Problem",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        icon="mdi:arrow-up-bold-hexagon-outline",
+    ),
+    BinarySensorEntityDescription(
+        key="rx_power_problem",
+        name="RX Power Problem",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        icon="mdi:arrow-down-bold-hexagon-outline",
+    ),
 )
 
 
@@ -46,10 +79,9 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up 8311 ONU binary sensors based on a config entry."""
-    coordinator: WAS110Coordinator = entry.runtime_data
-
     async_add_entities(
         WAS110BinarySensor(coordinator, description)
+        for coordinator in entry_coordinators(entry)
         for description in BINARY_SENSOR_DESCRIPTIONS
     )
 
@@ -65,7 +97,7 @@ class WAS110BinarySensor(CoordinatorEntity[WAS110Coordinator], BinarySensorEntit
         description: BinarySensorEntityDescription,
     ) -> None:
         """Initialize the binary sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=description.key)
         self.entity_description = description
         self._attr_unique_id = f"{coordinator.host}_{description.key}"
 
@@ -92,12 +124,12 @@ class WAS110BinarySensor(CoordinatorEntity[WAS110Coordinator], BinarySensorEntit
         return self.coordinator.data.get(self.entity_description.key)
 
     @property
-    def extra_state_attributes(self) -> dict[str, str | int | None]:
+    def extra_state_attributes(self) -> dict[str, str | int | float | None]:
         """Return additional state attributes."""
         if self.coordinator.data is None:
             return {}
 
-        attrs: dict[str, str | int | None] = {}
+        attrs: dict[str, str | int | float | None] = {}
 
         if self.entity_description.key == "pon_link":
             attrs[ATTR_STATE_CODE] = self.coordinator.data.get("pon_state_code")
@@ -114,6 +146,12 @@ class WAS110BinarySensor(CoordinatorEntity[WAS110Coordinator], BinarySensorEntit
                 "consecutive_errors", 0
             )
 
+        if self.entity_description.key.endswith("_problem"):
+            name = self.entity_description.key.removesuffix("_problem")
+            attrs[ATTR_LEVEL] = self.coordinator.data.get(f"{name}_level")
+            if (thresholds := self.coordinator.thresholds) is not None:
+                attrs.update(thresholds.as_dict().get(name, {}))
+
         return attrs
 
     @staticmethod
@@ -0,0 +1,103 @@
+"""ONU-side sample timestamps and clock offset estimation for 8311 ONU Monitor."""
+from __future__ import annotations
+
+import contextlib
+from collections import deque
+from typing import Any, Final
+
+# The ONU's monotonic (uptime) and wall clocks, read first on every poll.
+# Busybox builds without nanosecond support print "%N" or "N" literally.
+CLOCK_COMMAND: Final = "cut -d' ' -f1 /proc/uptime; date +%s.%N"
+
+# Round trips kept for the minimum-delay filter
+CLOCK_WINDOW: Final = 8
+
+# Coordinator data keys served by the clock section
+CLOCK_KEYS: Final = frozenset({"clock_offset", "clock_rtt"})
+
+
+def parse_clock(output: str) -> dict[str, Any]:
+    """Parse the ONU's uptime and wall time, both in seconds."""
+    data: dict[str, Any] = {}
+    lines = output.strip().splitlines()
+    if not lines:
+        return data
+
+    try:
+        data["clock_uptime"] = float(lines[0])
+    except ValueError:
+        return data
+
+    if len(lines) > 1:
+        seconds, _, fraction = lines[1].strip().partition(".")
+        with contextlib.suppress(ValueError):
+            data["clock_time"] = float(
+                f"{seconds}.{fraction}" if fraction.isdigit() else seconds
+            )
+    return data
+
+
+class ClockEstimator:
+    """Map the ONU's uptime onto the local monotonic clock.
+
+    Each poll brackets the ONU's clock read between sending the command
+    and receiving its output, as in NTP: an exchange's offset is wrong by
+    at most half its network delay, so the exchange with the lowest delay
+    among the last few sets the offset. Samples are then timed by the
+    ONU's own uptime, which SSH latency and scheduling jitter don't skew.
+    """
+
+    def __init__(self, window: int = CLOCK_WINDOW) -> None:
+        """Initialize the estimator."""
+        self._exchanges: deque[tuple[float, float]] = deque(maxlen=window)
+        self._uptime: float | None = None
+        # Local monotonic time minus ONU uptime
+        self.offset: float | None = None
+        self.delay: float | None = None
+        # ONU wall clock minus local wall clock
+        self.wall_offset: float | None = None
+
+    def update(
+        self,
+        sent: float,
+        received: float,
+        uptime: float,
+        *,
+        end_uptime: float | None = None,
+        wall_time: float | None = None,
+        wall_base: float = 0.0,
+    ) -> float:
+        """Add an exchange; return the local monotonic time of the ONU's read.
+
+        `sent` and `received` are local monotonic times around the command,
+        `uptime` the ONU's clock read and `end_uptime` a read at the end of
+        the command, if any, so the remote execution time doesn't count as
+        network delay. `wall_base` converts local monotonic to wall time.
+        """
+        if self._uptime is not None and uptime < self._uptime:
+            # The ONU rebooted: earlier exchanges describe another uptime
+            self._exchanges.clear()
+        self._uptime = uptime
+
+        remote = 0.0
+        if end_uptime is not None and end_uptime >= uptime:
+            remote = end_uptime - uptime
+        delay = max(0.0, received - sent - remote)
+        offset = (sent + received - remote) / 2 - uptime
+        self._exchanges.append((delay, offset))
+        self.delay = delay
+        self.offset = min(self._exchanges)[1]
+
+        local_time = uptime + self.offset
+        if wall_time is not None:
+            self.wall_offset = wall_time - (local_time + wall_base)
+        return local_time
+
+    def as_data(self) -> dict[str, Any]:
+        """Return the clock offset and round-trip delay in milliseconds."""
+        data: dict[str, Any] = {}
+        if self.delay is not None:
+            data["clock_rtt"] = round(self.delay * 1000, 1)
+        if self.wall_offset is not None:
+            data["clock_offset"] = round(self.wall_offset * 1000)
+        return data
@@ -0,0 +1,263 @@
+"""Remote command planning for 8311 ONU Monitor."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Final
+
+from .anomaly import ANOMALY_KEYS
+from .clock import CLOCK_COMMAND, CLOCK_KEYS
+from .cpu import CPU_KEYS, CPU_STAT_COMMAND
+from .thresholds import ALARM_KEYS, THRESHOLDS_LENGTH
+from .throughput import NET_DEV_COMMAND, THROUGHPUT_KEYS
+from .trend import TREND_KEYS
+
+EEPROM_PATH: Final = "/sys/class/pon_mbox/pon_mbox0/device"
+
+# Helper library providing active_fwbank, get_8311_module_type, ...
+HELPER_LIBRARY: Final = "/lib/8311.sh"
+SOURCE_HELPER_LIBRARY: Final = f". {HELPER_LIBRARY} 2>/dev/null"
+
+# Byte ranges actually parsed, so only those bytes cross the wire:
+# EEPROM50 identity fields live in bytes 20-83 (and the diagnostic monitoring
+# type in 92), EEPROM51 thresholds and calibration in 0-91, diagnostics in 96-105
+EEPROM50_OFFSET: Final = 20
+EEPROM51_OFFSET: Final = 96
+
+# Polling tiers in seconds (0 = every poll); a section is only included in a
+# tick's command once its period has elapsed
+PERIOD_EVERY_POLL: Final = 0
+PERIOD_COUNTERS: Final = 30
+PERIOD_SYSTEM: Final = 300
+PERIOD_IDENTITY: Final = 86400
+
+
+@dataclass(frozen=True, slots=True)
+class CommandSection:
+    """A delimited section of the combined remote command."""
+
+    name: str
+    command: str
+    keys: frozenset[str] = field(default_factory=frozenset)
+    # Needs /lib/8311.sh sourced first
+    needs_lib: bool = False
+    # Always fetched, regardless of which entities are enabled
+    always: bool = False
+    period: int = PERIOD_EVERY_POLL
+
+
+SECTIONS: Final[tuple[CommandSection, ...]] = (
+    # The ONU's own clocks: samples are timed by them, and the poll's
+    # remote wall time starts here
+    CommandSection(
+        "CLOCK",
+        CLOCK_COMMAND,
+        CLOCK_KEYS | {"monitor_wall_time"},
+        always=True,
+    ),
+    CommandSection(
+        "EEPROM50",
+        f"dd if={EEPROM_PATH}/eeprom50 bs=4 skip=5 count=19 2>/dev/null | base64",
+        # Identity is needed for the device registry even if no entity uses it
+        frozenset({"vendor", "part_number", "serial_number", "hardware_revision"}),
+        always=True,
+        period=PERIOD_IDENTITY,
+    ),
+    CommandSection(
+        "EEPROM51",
+        f"dd if={EEPROM_PATH}/eeprom51 bs=2 skip=48 count=5 2>/dev/null | base64",
+        frozenset(
+            {
+                "rx_power_dbm",
+                "rx_power_mw",
+                "tx_power_dbm",
+                "tx_power_mw",
+                "optic_temperature",
+                "voltage",
+                "tx_bias_current",
+                # Alarms, change points and trends derive from the live readings
+                *ALARM_KEYS,
+                *ANOMALY_KEYS,
+                *TREND_KEYS,
+            }
+        ),
+    ),
+    # Module limits only change with the module, so they share the identity tier
+    CommandSection(
+        "EEPROM51_THRESHOLDS",
+        f"dd if={EEPROM_PATH}/eeprom51 bs=4 count={THRESHOLDS_LENGTH // 4} "
+        "2>/dev/null | base64",
+        # The TX bias limit also bounds the laser aging projection
+        ALARM_KEYS | {"laser_days_to_threshold", "laser_bias_limit"},
+        period=PERIOD_IDENTITY,
+    ),
+    CommandSection(
+        "PON_STATUS",
+        "pon psg 2>/dev/null",
+        frozenset(
+            {
+                "pon_link",
+                "pon_state_name",
+                "pon_previous_state",
+                "pon_time_in_state",
+                "pon_flaps_last_hour",
+                "pon_link_failures",
+                "pon_mtbf",
+            }
+        ),
+    ),
+    CommandSection(
+        "CPU_TEMPS",
+        "cat /sys/class/thermal/thermal_zone*/temp 2>/dev/null",
+        frozenset({"cpu0_temperature", "cpu1_temperature"}),
+    ),
+    CommandSection(
+        "ETH_SPEED",
+        "cat /sys/class/net/eth0_0/speed 2>/dev/null",
+        # Also the reference for the LAN utilization
+        frozenset({"ethernet_speed", "lan_rx_utilization", "lan_tx_utilization"}),
+    ),
+    # Counters are read every poll, so rates cover a single interval
+    CommandSection(
+        "NET_DEV",
+        NET_DEV_COMMAND,
+        THROUGHPUT_KEYS,
+    ),
+    CommandSection(
+        "FW_BANK",
+        "active_fwbank 2>/dev/null || echo unknown",
+        frozenset({"firmware_bank"}),
+        needs_lib=True,
+        period=PERIOD_IDENTITY,
+    ),
+    # PON mode is at gpon.ponip.pon_mode (not gpon.onu.pon_mode)
+    CommandSection(
+        "PON_MODE",
+        "uci get gpon.ponip.pon_mode 2>/dev/null || echo unknown",
+        frozenset({"pon_mode"}),
+        period=PERIOD_IDENTITY,
+    ),
+    CommandSection(
+        "GPON_SERIAL",
+        "uci get gpon.ploam.nSerial 2>/dev/null || echo unknown",
+        frozenset({"gpon_serial", "isp"}),
+        period=PERIOD_IDENTITY,
+    ),
+    CommandSection(
+        "MODULE_TYPE",
+        "get_8311_module_type 2>/dev/null || echo unknown",
+        frozenset({"module_type"}),
+        needs_lib=True,
+        period=PERIOD_IDENTITY,
+    ),
+    CommandSection(
+        "VENDOR_ID",
+        "get_8311_vendor_id 2>/dev/null || echo unknown",
+        frozenset({"pon_vendor_id"}),
+        needs_lib=True,
+        period=PERIOD_IDENTITY,
+    ),
+    CommandSection(
+        "UPTIME",
+        "cat /proc/uptime 2>/dev/null",
+        frozenset({"onu_uptime"}),
+        period=PERIOD_SYSTEM,
+    ),
+    CommandSection(
+        "MEMORY",
+        "free 2>/dev/null | grep Mem",
+        frozenset({"memory_percent", "memory_used"}),
+        period=PERIOD_SYSTEM,
+    ),
+    CommandSection(
+        "GTC_COUNTERS",
+        "pon gtc_counters_get 2>/dev/null",
+        frozenset(
+            {
+                "gtc_bip_errors",
+                "gtc_fec_corrected",
+                "gtc_fec_uncorrected",
+                "gtc_lods_events",
+            }
+        ),
+        period=PERIOD_COUNTERS,
+    ),
+    # Last, so the CPU time of every other section is accounted for
+    CommandSection(
+        "CPU_STAT",
+        CPU_STAT_COMMAND,
+        CPU_KEYS,
+    ),
+)
+
+SECTIONS_BY_NAME: Final = {section.name: section for section in SECTIONS}
+
+# Sections describing the module itself, re-read on every new SSH connection
+MODULE_SECTIONS: Final = ("EEPROM50", "EEPROM51_THRESHOLDS")
+
+
+def plan_sections(enabled_keys: Iterable[str] | None) -> tuple[CommandSection, ...]:
+    """Return the sections needed to serve the enabled data keys.
+
+    With no enabled keys known yet (before entities have subscribed, e.g. on
+    the first refresh) every section is fetched.
+    """
+    keys = frozenset(enabled_keys or ())
+    if not keys:
+        return SECTIONS
+    return tuple(
+        section for section in SECTIONS if section.always or section.keys & keys
+    )
+
+
+def due_sections(
+    sections: Iterable[CommandSection],
+    last_fetched: dict[str, float],
+    now: float,
+    slack: float = 0,
+) -> tuple[CommandSection, ...]:
+    """Return the sections whose polling period has elapsed at `now`.
+
+    `slack` (typically half a scan interval) keeps a tier from slipping a
+    whole tick because of scheduling jitter.
+    """
+    return tuple(
+        section
+        for section in sections
+        if section.period <= 0
+        or section.name not in last_fetched
+        or now - last_fetched[section.name] + slack >= section.period
+    )
+
+
+def build_command(
+    sections: Iterable[CommandSection], source_lib: bool = True
+) -> str:
+    """Build the combined remote command for the given sections.
+
+    Sections are separated with `;` so one failing tool doesn't cut off the
+    rest of the output, and the helper library is sourced at most once
+    (never with `source_lib=False`, for shells that already sourced it).
+    """
+    sections = tuple(sections)
+    parts: list[str] = []
+
+    if source_lib and any(section.needs_lib for section in sections):
+        parts.append(SOURCE_HELPER_LIBRARY)
+
+    for section in sections:
+        parts.append(f"echo '---{section.name}---'")
+        parts.append(section.command)
+
+    parts.append("echo '---END---'")
+    return "; ".join(parts)
+
+
+# Lean command for high-rate sampling between regular polls
+FAST_SAMPLE_COMMAND: Final = build_command(
+    (
+        SECTIONS_BY_NAME["CLOCK"],
+        SECTIONS_BY_NAME["EEPROM51"],
+        SECTIONS_BY_NAME["GTC_COUNTERS"],
+    )
+)
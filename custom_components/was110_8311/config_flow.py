@@ -11,13 +11,22 @@ from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow
 from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_PORT, CONF_USERNAME
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.selector import TextSelector, TextSelectorConfig
 
 from .const import (
+    CONF_FAST_SCAN_INTERVAL,
+    CONF_HOSTS,
+    CONF_MAX_SESSIONS,
     CONF_SCAN_INTERVAL,
+    CONF_SSH_PROFILE,
+    DEFAULT_FAST_SCAN_INTERVAL,
+    DEFAULT_MAX_SESSIONS,
     DEFAULT_PORT,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SSH_PROFILE,
     DEFAULT_USERNAME,
     DOMAIN,
+    SSH_PROFILES,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -29,14 +38,38 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
         vol.Optional(CONF_PASSWORD, default=""): str,
         vol.Optional(CONF_PORT, default=DEFAULT_PORT): int,
         vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): vol.All(
-            int, vol.Range(min=10, max=300)
+            int, vol.Range(min=5, max=300)
+        ),
+    }
+)
+
+STEP_HUB_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_HOSTS): TextSelector(TextSelectorConfig(multiline=True)),
+        vol.Optional(CONF_USERNAME, default=DEFAULT_USERNAME): str,
+        vol.Optional(CONF_PASSWORD, default=""): str,
+        vol.Optional(CONF_PORT, default=DEFAULT_PORT): int,
+        vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): vol.All(
+            int, vol.Range(min=5, max=300)
+        ),
+        vol.Optional(CONF_MAX_SESSIONS, default=DEFAULT_MAX_SESSIONS): vol.All(
+            int, vol.Range(min=1, max=32)
         ),
     }
 )
 
 
+def parse_hosts(hosts: str) -> list[str]:
+    """Split a newline or comma separated host list, dropping duplicates."""
+    return list(dict.fromkeys(hosts.replace(",", " ").split()))
+
+
 async def validate_connection(
-    host: str, port: int, username: str, password: str
+    host: str,
+    port: int,
+    username: str,
+    password: str,
+    ssh_profile: str = DEFAULT_SSH_PROFILE,
 ) -> dict[str, str]:
     """Validate the user input allows us to connect."""
     errors: dict[str, str] = {}
@@ -50,6 +83,7 @@ async def validate_connection(
                 password=password,
                 known_hosts=None,
                 connect_timeout=10,
+                **SSH_PROFILES.get(ssh_profile, {}),
             )
             # Test a simple command
             result = await conn.run("echo test", check=True)
@@ -78,9 +112,15 @@ class WAS110ConfigFlow(ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
     async def async_step_user(
+        self, user_input: dict[str, Any] | None = None  # noqa: ARG002
+    ) -> FlowResult:
+        """Choose between a single ONU and a hub of ONUs."""
+        return self.async_show_menu(step_id="user", menu_options=["device", "hub"])
+
+    async def async_step_device(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Handle the initial step."""
+        """Handle a single ONU."""
         errors: dict[str, str] = {}
 
         if user_input is not None:
@@ -103,11 +143,69 @@ class WAS110ConfigFlow(ConfigFlow, domain=DOMAIN):
                 )
 
         return self.async_show_form(
-            step_id="user",
+            step_id="device",
             data_schema=STEP_USER_DATA_SCHEMA,
             errors=errors,
         )
 
+    async def async_step_hub(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle a hub polling many ONUs with shared credentials."""
+        errors: dict[str, str] = {}
+        placeholders: dict[str, str] = {"failed_hosts": ""}
+
+        if user_input is not None:
+            hosts = parse_hosts(user_input[CONF_HOSTS])
+            configured = {
+                host
+                for entry in self._async_current_entries(include_ignore=False)
+                for host in entry.data.get(CONF_HOSTS, [entry.data.get(CONF_HOST)])
+            }
+
+            if not hosts:
+                errors[CONF_HOSTS] = "no_hosts"
+            elif configured.intersection(hosts):
+                return self.async_abort(reason="already_configured")
+            else:
+                await self.async_set_unique_id(f"hub_{'_'.join(sorted(hosts))}")
+                self._abort_if_unique_id_configured()
+
+                results = await asyncio.gather(
+                    *(
+                        validate_connection(
+                            host,
+                            user_input[CONF_PORT],
+                            user_input[CONF_USERNAME],
+                            user_input[CONF_PASSWORD],
+                        )
+                        for host in hosts
+                    )
+                )
+                failed = {
+                    host: result
+                    for host, result in zip(hosts, results, strict=True)
+                    if result
+                }
+                if failed:
+                    errors["base"] = "hub_unreachable"
+                    placeholders["failed_hosts"] = ", ".join(failed)
+
+            if not errors:
+                return self.async_create_entry(
+                    title=f"8311 ONU Hub ({len(hosts)} ONUs)",
+                    data={**user_input, CONF_HOSTS: hosts},
+                )
+
+        return self.async_show_form(
+            step_id="hub",
+            data_schema=self.add_suggested_values_to_schema(
+                STEP_HUB_DATA_SCHEMA, user_input
+            ),
+            errors=errors,
+            description_placeholders=placeholders,
+        )
+
     async def async_step_reauth(
         self, entry_data: dict[str, Any]  # noqa: ARG002
     ) -> FlowResult:
@@ -121,13 +219,16 @@ class WAS110ConfigFlow(ConfigFlow, domain=DOMAIN):
         errors: dict[str, str] = {}
 
         reauth_entry = self._get_reauth_entry()
+        # Hubs share credentials, so the first ONU stands in for all of them
+        host = reauth_entry.data.get(CONF_HOST) or reauth_entry.data[CONF_HOSTS][0]
 
         if user_input is not None:
             errors = await validate_connection(
-                reauth_entry.data[CONF_HOST],
+                host,
                 reauth_entry.data[CONF_PORT],
                 user_input[CONF_USERNAME],
                 user_input[CONF_PASSWORD],
+                reauth_entry.options.get(CONF_SSH_PROFILE, DEFAULT_SSH_PROFILE),
             )
 
             if not errors:
@@ -152,7 +253,7 @@ class WAS110ConfigFlow(ConfigFlow, domain=DOMAIN):
             ),
             errors=errors,
             description_placeholders={
-                "host": reauth_entry.data[CONF_HOST],
+                "host": host,
             },
         )
 
@@ -189,7 +290,19 @@ class WAS110OptionsFlowHandler(OptionsFlow):
                                 CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
                             ),
                         ),
-                    ): vol.All(int, vol.Range(min=10, max=300)),
+                    ): vol.All(int, vol.Range(min=5, max=300)),
+                    vol.Optional(
+                        CONF_FAST_SCAN_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL
+                        ),
+                    ): vol.All(int, vol.Range(min=0, max=60)),
+                    vol.Optional(
+                        CONF_SSH_PROFILE,
+                        default=self.config_entry.options.get(
+                            CONF_SSH_PROFILE, DEFAULT_SSH_PROFILE
+                        ),
+                    ): vol.In(list(SSH_PROFILES)),
                 }
             ),
         )
@@ -9,11 +9,58 @@ MODEL: Final = "XGS-PON ONU"
 
 # Configuration
 CONF_SCAN_INTERVAL: Final = "scan_interval"
+CONF_FAST_SCAN_INTERVAL: Final = "fast_scan_interval"
+CONF_HOSTS: Final = "hosts"
+CONF_MAX_SESSIONS: Final = "max_sessions"
+CONF_SSH_PROFILE: Final = "ssh_profile"
 
 # Defaults
 DEFAULT_PORT: Final = 22
 DEFAULT_USERNAME: Final = "root"
 DEFAULT_SCAN_INTERVAL: Final = 60
+DEFAULT_FAST_SCAN_INTERVAL: Final = 0  # Disabled
+DEFAULT_MAX_SESSIONS: Final = 4
+
+# SSH transport profiles
+SSH_PROFILE_DEFAULT: Final = "default"
+SSH_PROFILE_LOW_CPU: Final = "low_cpu"
+DEFAULT_SSH_PROFILE: Final = SSH_PROFILE_DEFAULT
+
+# asyncssh.connect() algorithm lists per profile ("default" keeps asyncssh's
+# own negotiation). low_cpu favours what the ONU's small CPU does cheaply on
+# every connect: plain X25519 key exchange rather than post-quantum hybrids,
+# an Ed25519/ECDSA host key signature rather than RSA, ChaCha20-Poly1305 or
+# AES-128 and no compression. The tail of each list keeps older Dropbear
+# builds negotiable.
+SSH_PROFILES: Final[dict[str, dict[str, list[str]]]] = {
+    SSH_PROFILE_DEFAULT: {},
+    SSH_PROFILE_LOW_CPU: {
+        "kex_algs": [
+            "curve25519-sha256",
+            "curve25519-sha256@libssh.org",
+            "ecdh-sha2-nistp256",
+            "diffie-hellman-group14-sha256",
+        ],
+        "server_host_key_algs": [
+            "ssh-ed25519",
+            "ecdsa-sha2-nistp256",
+            "rsa-sha2-256",
+            "ssh-rsa",
+        ],
+        "encryption_algs": [
+            "chacha20-poly1305@openssh.com",
+            "aes128-ctr",
+            "aes128-gcm@openssh.com",
+            "aes256-ctr",
+        ],
+        "mac_algs": ["hmac-sha2-256", "hmac-sha1"],
+        "compression_algs": ["none"],
+    },
+}
+
+# SSH keepalives: a dead ONU is detected after interval * count_max seconds
+SSH_KEEPALIVE_INTERVAL: Final = 15
+SSH_KEEPALIVE_COUNT_MAX: Final = 3
 
 # Attributes
 ATTR_STATE_CODE: Final = "state_code"
@@ -21,6 +68,17 @@ ATTR_STATE_NAME: Final = "state_name"
 ATTR_TIME_IN_STATE: Final = "time_in_state_seconds"
 ATTR_TIME_IN_STATE_FORMATTED: Final = "time_in_state_formatted"
 ATTR_CONSECUTIVE_ERRORS: Final = "consecutive_errors"
+ATTR_LEVEL: Final = "level"
+ATTR_STEP: Final = "step_db"
+ATTR_BIAS_LIMIT: Final = "bias_limit_ma"
+ATTR_ONUS: Final = "onus"
+ATTR_PACKET_RATE: Final = "packets_per_second"
+ATTR_IOWAIT: Final = "iowait_percent"
+ATTR_LOAD_5M: Final = "load_5m"
+ATTR_LOAD_15M: Final = "load_15m"
+
+# Fired when a step or drift is detected in RX or TX power
+EVENT_OPTICAL_CHANGE: Final = f"{DOMAIN}_optical_change"
 
 # ISP detection from GPON serial prefix
 # Reference: https://pon.wiki and https://hack-gpon.org/vendor/
@@ -62,3 +120,6 @@ PON_STATES: Final = {
     90: "O9 - Upstream tuning state",
 }
 
+# O5.x states are operational
+PON_OPERATIONAL_STATES: Final = frozenset({50, 51, 52})
+
@@ -6,53 +6,137 @@ import base64
 import contextlib
 import logging
 import math
-from datetime import timedelta
+import time
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
 from typing import Any
 
 import asyncssh
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_PORT, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .anomaly import ANOMALY_METRICS, ChangeDetector
+from .clock import ClockEstimator, parse_clock
+from .commands import (
+    EEPROM50_OFFSET,
+    EEPROM51_OFFSET,
+    FAST_SAMPLE_COMMAND,
+    MODULE_SECTIONS,
+    CommandSection,
+    build_command,
+    due_sections,
+    plan_sections,
+)
 from .const import (
+    CONF_FAST_SCAN_INTERVAL,
     CONF_SCAN_INTERVAL,
+    CONF_SSH_PROFILE,
+    DEFAULT_FAST_SCAN_INTERVAL,
     DEFAULT_PORT,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SSH_PROFILE,
     DOMAIN,
+    EVENT_OPTICAL_CHANGE,
     ISP_PREFIXES,
+    PON_OPERATIONAL_STATES,
     PON_STATES,
+    SSH_KEEPALIVE_COUNT_MAX,
+    SSH_KEEPALIVE_INTERVAL,
+    SSH_PROFILES,
 )
+from .cpu import CpuMeter, parse_cpu_stat
+from .history import LaserAging, WAS110History
+from .latency import StageLatency
+from .pool import SSHConnectionPool
+from .shell import RemoteShell
+from .thresholds import (
+    Calibration,
+    Thresholds,
+    evaluate,
+    is_externally_calibrated,
+    parse_calibration,
+    parse_thresholds,
+)
+from .throughput import ThroughputMeter, parse_net_dev
+from .transitions import PonTransitionTracker
 
 _LOGGER = logging.getLogger(__name__)
 
 
 class WAS110Coordinator(DataUpdateCoordinator[dict[str, Any]]):
-    """Coordinator to manage 8311 ONU data fetching."""
+    """Coordinator to manage 8311 ONU data fetching.
+
+    A hub creates one per ONU with `host` and its shared `pool`; those are
+    refreshed by the hub's scheduler instead of their own timer.
+    """
 
     config_entry: ConfigEntry
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        host: str | None = None,
+        pool: SSHConnectionPool | None = None,
+        decode_in_executor: bool = False,
+    ) -> None:
         """Initialize the coordinator."""
-        self.host = entry.data[CONF_HOST]
+        self.host = host or entry.data[CONF_HOST]
         self.username = entry.data.get(CONF_USERNAME, "root")
         self.password = entry.data.get(CONF_PASSWORD, "")
         self.port = entry.data.get(CONF_PORT, DEFAULT_PORT)
+        self.ssh_profile: str = entry.options.get(CONF_SSH_PROFILE, DEFAULT_SSH_PROFILE)
         self._connection: asyncssh.SSHClientConnection | None = None
+        self._shell: RemoteShell | None = None
+        # The poll and the fast sampler may both find the shell closed
+        self._shell_lock = asyncio.Lock()
+        self._pool = pool
+        self._decode_in_executor = decode_in_executor
         self._device_info: dict[str, Any] = {}
+        self._thresholds: Thresholds | None = None
+        self._calibration: Calibration | None = None
+        self._change_detectors = {name: ChangeDetector() for name in ANOMALY_METRICS}
+        self._last_changes: dict[str, tuple[datetime, float]] = {}
         self._consecutive_errors = 0
+        self.pon_transitions = PonTransitionTracker()
+        self.throughput = ThroughputMeter()
+        self.cpu = CpuMeter()
+        self.clock = ClockEstimator()
+        self.latency = StageLatency()
+        self.last_profile: dict[str, Any] | None = None
+        self._fast_sample_running = False
+        self._plan: tuple[CommandSection, ...] | None = None
+        self._plan_keys: frozenset[str] = frozenset()
+        # Data keys consumed outside this ONU's entities, always planned
+        self.required_keys: frozenset[str] = frozenset()
+        self._commands: dict[tuple[str, ...], str] = {}
+        self._last_fetched: dict[str, float] = {}
 
         scan_interval = entry.options.get(
             CONF_SCAN_INTERVAL,
             entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
         )
+        self.scan_interval: int = scan_interval
+        self.fast_scan_interval: int = entry.options.get(
+            CONF_FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL
+        )
+        history_id = entry.entry_id if host is None else f"{entry.entry_id}_{slugify(host)}"
+        self.history = WAS110History(
+            hass, history_id, self.host, self.fast_scan_interval or scan_interval
+        )
+        self.aging = LaserAging(hass, history_id)
 
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=scan_interval),
+            update_interval=None if pool else timedelta(seconds=scan_interval),
         )
 
     @property
@@ -60,6 +144,11 @@ class WAS110Coordinator(DataUpdateCoordinator[dict[str, Any]]):
         """Return device information."""
         return self._device_info
 
+    @property
+    def thresholds(self) -> Thresholds | None:
+        """Return the module's alarm and warning thresholds, once read."""
+        return self._thresholds
+
     async def _async_connect(self) -> asyncssh.SSHClientConnection:
         """Establish SSH connection to the ONU."""
         try:
@@ -70,6 +159,9 @@ class WAS110Coordinator(DataUpdateCoordinator[dict[str, Any]]):
                 password=self.password,
                 known_hosts=None,
                 connect_timeout=10,
+                keepalive_interval=SSH_KEEPALIVE_INTERVAL,
+                keepalive_count_max=SSH_KEEPALIVE_COUNT_MAX,
+                **SSH_PROFILES.get(self.ssh_profile, {}),
             )
             _LOGGER.debug("SSH connection established to %s", self.host)
             return conn
@@ -80,167 +172,382 @@ class WAS110Coordinator(DataUpdateCoordinator[dict[str, Any]]):
         except (OSError, asyncssh.Error) as err:
             raise UpdateFailed(f"Unable to connect to {self.host}: {err}") from err
 
-    async def _async_run_command(self, command: str) -> str | None:
-        """Run a command on the ONU."""
-        try:
-            if self._connection is None or self._connection.is_closed:
-                self._connection = await self._async_connect()
+    async def _async_timed_connect(self) -> asyncssh.SSHClientConnection:
+        """Connect to the ONU, timing it as `ssh_connect`.
 
-            result = await asyncio.wait_for(
-                self._connection.run(command, check=True),
-                timeout=10,
-            )
-            return result.stdout.strip()
+        A new connection may mean a new module (swapped or rebooted), so
+        its identity and limits are read again on the next poll.
+        """
+        with self.latency.measure("ssh_connect"):
+            connection = await self._async_connect()
+        for name in MODULE_SECTIONS:
+            self._last_fetched.pop(name, None)
+        return connection
+
+    @contextlib.asynccontextmanager
+    async def _async_session(self) -> AsyncIterator[asyncssh.SSHClientConnection]:
+        """Yield a connection, from the hub's pool when there is one."""
+        if self._pool is not None:
+            async with self._pool.acquire(
+                self.host, self._async_timed_connect
+            ) as connection:
+                yield connection
+            return
+
+        if self._connection is None or self._connection.is_closed:
+            self._connection = await self._async_timed_connect()
+        yield self._connection
+
+    async def _async_shell(
+        self, connection: asyncssh.SSHClientConnection
+    ) -> RemoteShell:
+        """Return the persistent shell, (re)starting it on a new connection."""
+        async with self._shell_lock:
+            shell = self._shell
+            if shell is None or shell.connection is not connection or shell.closed:
+                self._close_shell()
+                shell = RemoteShell(connection)
+                with self.latency.measure("shell_start"):
+                    await shell.async_start()
+                self._shell = shell
+            return shell
+
+    def _close_shell(self) -> None:
+        """Close the persistent shell so the next command starts a new one."""
+        if self._shell is not None:
+            self._shell.close()
+            self._shell = None
+
+    def _drop_connection(self) -> None:
+        """Forget the connection so the next command reconnects."""
+        self._close_shell()
+        if self._pool is not None:
+            self._pool.discard(self.host)
+        self._connection = None
+
+    async def _async_run_command(
+        self, command: str, stage: str = "remote_exec"
+    ) -> tuple[str, float, float] | None:
+        """Run a command in the ONU's persistent shell, timing it as `stage`.
+
+        Returns the output with the monotonic times the command was sent
+        and its output received, which bracket the ONU's clock read.
+        """
+        try:
+            async with self._async_session() as connection:
+                shell = await self._async_shell(connection)
+                with self.latency.measure(stage):
+                    sent = time.monotonic()
+                    output = await asyncio.wait_for(
+                        shell.async_run(command), timeout=10
+                    )
+                    received = time.monotonic()
+            if stage == "remote_exec":
+                self.latency.last_response_bytes = len(output)
+            return output.strip(), sent, received
         except TimeoutError:
             _LOGGER.warning("Command timed out: %s", command)
-            self._connection = None
+            self._drop_connection()
             return None
-        except asyncssh.ProcessError as err:
-            _LOGGER.warning("Command failed: %s - %s", command, err)
+        except EOFError:
+            # The shell exited; the connection may still be fine
+            _LOGGER.warning("Remote shell on %s exited", self.host)
+            self._close_shell()
             return None
         except (OSError, asyncssh.Error) as err:
             _LOGGER.warning("SSH error: %s", err)
-            self._connection = None
+            self._drop_connection()
             return None
 
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all listeners, timing the state writes."""
+        with self.latency.measure("state_write"):
+            super().async_update_listeners()
+
     async def _async_update_data(self) -> dict[str, Any]:
         """Fetch data from the ONU."""
+        poll_started = time.perf_counter()
         data: dict[str, Any] = {
             "ssh_connected": False,
             "pon_link": False,
         }
 
         try:
-            # Combined command to minimize SSH sessions
-            # Note: active_fwbank requires sourcing /lib/8311.sh first
-            # PON mode is at gpon.ponip.pon_mode (not gpon.onu.pon_mode)
-            combined_cmd = (
-                "echo '---EEPROM50---' && "
-                "cat /sys/class/pon_mbox/pon_mbox0/device/eeprom50 2>/dev/null | base64 && "
-                "echo '---EEPROM51---' && "
-                "cat /sys/class/pon_mbox/pon_mbox0/device/eeprom51 2>/dev/null | base64 && "
-                "echo '---PON_STATUS---' && "
-                "pon psg 2>/dev/null && "
-                "echo '---CPU_TEMPS---' && "
-                "cat /sys/class/thermal/thermal_zone*/temp 2>/dev/null && "
-                "echo '---ETH_SPEED---' && "
-                "cat /sys/class/net/eth0_0/speed 2>/dev/null && "
-                "echo '---FW_BANK---' && "
-                ". /lib/8311.sh 2>/dev/null && active_fwbank 2>/dev/null || echo unknown && "
-                "echo '---PON_MODE---' && "
-                "uci get gpon.ponip.pon_mode 2>/dev/null || echo unknown && "
-                "echo '---GPON_SERIAL---' && "
-                "uci get gpon.ploam.nSerial 2>/dev/null || echo unknown && "
-                "echo '---MODULE_TYPE---' && "
-                ". /lib/8311.sh 2>/dev/null && get_8311_module_type 2>/dev/null || echo unknown && "
-                "echo '---VENDOR_ID---' && "
-                ". /lib/8311.sh 2>/dev/null && get_8311_vendor_id 2>/dev/null || echo unknown && "
-                "echo '---SYSTEM_INFO---' && "
-                "cat /proc/uptime 2>/dev/null && free 2>/dev/null | grep Mem && "
-                "echo '---GTC_COUNTERS---' && "
-                "pon gtc_counters_get 2>/dev/null && "
-                "echo '---END---'"
-            )
-
-            output = await self._async_run_command(combined_cmd)
-            if output is None:
+            # Combined command to minimize SSH sessions, covering only the
+            # sources enabled entities consume that are due this tick
+            due, command = self._get_command()
+            result = await self._async_run_command(command)
+            if result is None:
                 self._consecutive_errors += 1
                 raise UpdateFailed(
                     f"Failed to communicate with ONU at {self.host}"
                 )
+            output, sent, received = result
 
             data["ssh_connected"] = True
             self._consecutive_errors = 0
 
-            # Parse the combined output
+            # Merge slower tiers from the previous snapshot
+            fetched_at = time.monotonic()
+            for section in due:
+                self._last_fetched[section.name] = fetched_at
+            if self.data and self._plan:
+                for section in self._plan:
+                    if section in due:
+                        continue
+                    for key in section.keys & self.data.keys():
+                        data[key] = self.data[key]
+
+            # Parse the combined output (off the event loop for large hubs)
+            if self._decode_in_executor:
+                parsed, device_info, module = await self.hass.async_add_executor_job(
+                    self._parse_output, output
+                )
+            else:
+                parsed, device_info, module = self._parse_output(output)
+            data.update(parsed)
+            if device_info:
+                if device_info.get("serial_number") != self._device_info.get(
+                    "serial_number"
+                ):
+                    # Another module: its predecessor's limits no longer apply
+                    self._thresholds = self._calibration = None
+                self._device_info = device_info
+                self.aging.set_module(device_info.get("serial_number"))
+            if module is not None:
+                self._thresholds, self._calibration = module
+
+            # Time the sample by the ONU's own clock rather than by when
+            # the output arrived
+            now, timestamp = self._sample_time(parsed, sent, received)
+            data.update(self.clock.as_data())
+
+            # Check the readings against the module's own limits and for
+            # steps or drifts
+            if self._thresholds is not None:
+                data.update(evaluate(self._thresholds, data))
+            data.update(self._detect_changes(parsed, timestamp))
+
+            # Track transitions, including ones hidden between polls
+            if "pon_state_code" in parsed:
+                self.pon_transitions.update(
+                    parsed["pon_state_code"],
+                    parsed.get("pon_time_in_state"),
+                    parsed.get("pon_previous_state_code"),
+                    now,
+                )
+                data.update(self.pon_transitions.as_data(now))
+
+            # Traffic rates between this read of the counters and the last
+            if "counters_uptime" in parsed:
+                data.update(
+                    self.throughput.update(parsed, data.get("ethernet_speed"))
+                )
+
+            # CPU usage and the monitor's overhead since the last poll
+            if "cpu_jiffies_total" in parsed:
+                data.update(self.cpu.update(parsed))
+
+            data["consecutive_errors"] = self._consecutive_errors
+
+            # Keep a persisted ring of samples for long-term statistics
+            if self.history.record(timestamp, data):
+                self.hass.async_create_task(
+                    self.history.async_import_statistics(timestamp)
+                )
+
+            # Laser aging, with the module's own bias warning as end of life
+            self.aging.record(timestamp, parsed)
+            data.update(self.aging.as_data(timestamp, self._bias_limit()))
+
+            self.latency.observe("poll", (time.perf_counter() - poll_started) * 1000)
+            data.update(self.latency.as_data())
+            return data
+
+        except ConfigEntryAuthFailed:
+            raise
+        except UpdateFailed:
+            raise
+        except Exception as err:
+            self._consecutive_errors += 1
+            raise UpdateFailed(f"Error fetching ONU data: {err}") from err
+
+    def _get_command(self) -> tuple[tuple[CommandSection, ...], str]:
+        """Return the due sections and combined command for this tick.
+
+        Entities subscribe with their data key as context, and disabled
+        entities never subscribe, so the plan only changes when the set of
+        enabled entities does. Each section then declares its own polling
+        period, and commands are cached per combination of due sections.
+        """
+        enabled_keys = frozenset(self.async_contexts())
+        if enabled_keys:
+            # Keys read outside this ONU's entities (e.g. by the hub's fleet)
+            enabled_keys |= self.required_keys
+        if self._plan is None or enabled_keys != self._plan_keys:
+            self._plan = plan_sections(enabled_keys)
+            self._plan_keys = enabled_keys
+            self._commands.clear()
+            _LOGGER.debug(
+                "Remote command plan for %s: %s",
+                self.host,
+                ", ".join(section.name for section in self._plan),
+            )
+
+        slack = self.scan_interval / 2
+        due = due_sections(self._plan, self._last_fetched, time.monotonic(), slack)
+        names = tuple(section.name for section in due)
+        if (command := self._commands.get(names)) is None:
+            # The persistent shell has already sourced the helper library
+            command = self._commands[names] = build_command(due, source_lib=False)
+        return due, command
+
+    def _parse_output(
+        self, output: str
+    ) -> tuple[
+        dict[str, Any],
+        dict[str, Any] | None,
+        tuple[Thresholds, Calibration | None] | None,
+    ]:
+        """Parse the combined command output.
+
+        Returns the parsed data, the EEPROM50 device info and the module's
+        thresholds and calibration, each if it was read. Only the latency
+        histograms are touched, so this can run in the executor.
+        """
+        data: dict[str, Any] = {}
+        device_info: dict[str, Any] | None = None
+        module: tuple[Thresholds, Calibration | None] | None = None
+        calibration = self._calibration
+
+        with self.latency.measure("parse"):
             sections = self._parse_sections(output)
 
+            # Parse the ONU's clocks
+            if "CLOCK" in sections:
+                data.update(parse_clock(sections["CLOCK"]))
+
             # Parse EEPROM50 (device info)
             if "EEPROM50" in sections:
-                eeprom50_data = self._decode_eeprom(sections["EEPROM50"])
-                if eeprom50_data:
-                    device_info = self._parse_eeprom50(eeprom50_data)
-                    data.update(device_info)
-                    self._device_info = device_info
+                with self.latency.measure("parse_eeprom50"):
+                    eeprom50_data = self._decode_eeprom(
+                        sections["EEPROM50"], EEPROM50_OFFSET
+                    )
+                    if eeprom50_data:
+                        device_info = self._parse_eeprom50(eeprom50_data)
+                        data.update(device_info)
+
+            # Parse EEPROM51 thresholds (and calibration, if external)
+            if "EEPROM51_THRESHOLDS" in sections:
+                with self.latency.measure("parse_eeprom51_thresholds"):
+                    page = self._decode_eeprom(sections["EEPROM51_THRESHOLDS"])
+                    external = (device_info or self._device_info).get(
+                        "externally_calibrated", False
+                    )
+                    if page:
+                        calibration = parse_calibration(page) if external else None
+                        if (thresholds := parse_thresholds(page, calibration)):
+                            module = (thresholds, calibration)
 
             # Parse EEPROM51 (optical diagnostics)
             if "EEPROM51" in sections:
-                eeprom51_data = self._decode_eeprom(sections["EEPROM51"])
-                if eeprom51_data:
-                    optical_data = self._parse_eeprom51(eeprom51_data)
-                    data.update(optical_data)
+                with self.latency.measure("parse_eeprom51"):
+                    eeprom51_data = self._decode_eeprom(
+                        sections["EEPROM51"], EEPROM51_OFFSET
+                    )
+                    if eeprom51_data:
+                        optical_data = self._parse_eeprom51(eeprom51_data, calibration)
+                        data.update(optical_data)
 
             # Parse PON status
             if "PON_STATUS" in sections:
-                pon_data = self._parse_pon_status(sections["PON_STATUS"])
-                data.update(pon_data)
+                with self.latency.measure("parse_pon_status"):
+                    data.update(self._parse_pon_status(sections["PON_STATUS"]))
 
             # Parse CPU temperatures
             if "CPU_TEMPS" in sections:
-                cpu_temps = self._parse_cpu_temps(sections["CPU_TEMPS"])
-                data.update(cpu_temps)
+                with self.latency.measure("parse_cpu_temps"):
+                    cpu_temps = self._parse_cpu_temps(sections["CPU_TEMPS"])
+                    data.update(cpu_temps)
 
             # Parse Ethernet speed
             if "ETH_SPEED" in sections:
-                with contextlib.suppress(ValueError):
+                with (
+                    self.latency.measure("parse_eth_speed"),
+                    contextlib.suppress(ValueError),
+                ):
                     data["ethernet_speed"] = int(sections["ETH_SPEED"])
 
+            # Parse interface counters (with the ONU's uptime as timestamp)
+            if "NET_DEV" in sections:
+                with self.latency.measure("parse_net_dev"):
+                    data.update(parse_net_dev(sections["NET_DEV"]))
+
+            # Parse CPU load and our own session's CPU time
+            if "CPU_STAT" in sections:
+                with self.latency.measure("parse_cpu_stat"):
+                    data.update(
+                        parse_cpu_stat(sections["CPU_STAT"], data.get("clock_uptime"))
+                    )
+
             # Parse firmware bank
             if "FW_BANK" in sections:
-                fw_bank = sections["FW_BANK"].strip()
-                if fw_bank and fw_bank.lower() != "unknown":
-                    data["firmware_bank"] = fw_bank
+                with self.latency.measure("parse_fw_bank"):
+                    fw_bank = sections["FW_BANK"].strip()
+                    if fw_bank and fw_bank.lower() != "unknown":
+                        data["firmware_bank"] = fw_bank
 
             # Parse PON mode
             if "PON_MODE" in sections:
-                pon_mode = sections["PON_MODE"].strip().upper()
-                if pon_mode and pon_mode != "UNKNOWN":
-                    # Format PON mode (e.g., "XGSPON" -> "XGS-PON")
-                    if "PON" in pon_mode and "-PON" not in pon_mode:
-                        pon_mode = pon_mode.replace("PON", "-PON")
-                    data["pon_mode"] = pon_mode
+                with self.latency.measure("parse_pon_mode"):
+                    pon_mode = sections["PON_MODE"].strip().upper()
+                    if pon_mode and pon_mode != "UNKNOWN":
+                        # Format PON mode (e.g., "XGSPON" -> "XGS-PON")
+                        if "PON" in pon_mode and "-PON" not in pon_mode:
+                            pon_mode = pon_mode.replace("PON", "-PON")
+                        data["pon_mode"] = pon_mode
 
             # Parse GPON serial and detect ISP
             if "GPON_SERIAL" in sections:
-                gpon_serial = sections["GPON_SERIAL"].strip()
-                if gpon_serial and gpon_serial.lower() != "unknown":
-                    data["gpon_serial"] = gpon_serial
-                    # Detect ISP from serial prefix (first 4 chars)
-                    prefix = gpon_serial[:4].upper()
-                    data["isp"] = ISP_PREFIXES.get(prefix, "Unknown")
+                with self.latency.measure("parse_gpon_serial"):
+                    gpon_serial = sections["GPON_SERIAL"].strip()
+                    if gpon_serial and gpon_serial.lower() != "unknown":
+                        data["gpon_serial"] = gpon_serial
+                        # Detect ISP from serial prefix (first 4 chars)
+                        prefix = gpon_serial[:4].upper()
+                        data["isp"] = ISP_PREFIXES.get(prefix, "Unknown")
 
             # Parse module type
             if "MODULE_TYPE" in sections:
-                module_type = sections["MODULE_TYPE"].strip()
-                if module_type and module_type.lower() != "unknown":
-                    data["module_type"] = module_type
+                with self.latency.measure("parse_module_type"):
+                    module_type = sections["MODULE_TYPE"].strip()
+                    if module_type and module_type.lower() != "unknown":
+                        data["module_type"] = module_type
 
             # Parse vendor ID
             if "VENDOR_ID" in sections:
-                vendor_id = sections["VENDOR_ID"].strip()
-                if vendor_id and vendor_id.lower() != "unknown":
-                    data["pon_vendor_id"] = vendor_id
+                with self.latency.measure("parse_vendor_id"):
+                    vendor_id = sections["VENDOR_ID"].strip()
+                    if vendor_id and vendor_id.lower() != "unknown":
+                        data["pon_vendor_id"] = vendor_id
 
             # Parse system info (uptime and memory)
-            if "SYSTEM_INFO" in sections:
-                sys_info = self._parse_system_info(sections["SYSTEM_INFO"])
-                data.update(sys_info)
+            if "UPTIME" in sections:
+                with self.latency.measure("parse_uptime"):
+                    data.update(self._parse_uptime(sections["UPTIME"]))
+
+            if "MEMORY" in sections:
+                with self.latency.measure("parse_memory"):
+                    data.update(self._parse_memory(sections["MEMORY"]))
 
             # Parse GTC counters
             if "GTC_COUNTERS" in sections:
-                gtc_data = self._parse_gtc_counters(sections["GTC_COUNTERS"])
-                data.update(gtc_data)
+                with self.latency.measure("parse_gtc_counters"):
+                    gtc_data = self._parse_gtc_counters(sections["GTC_COUNTERS"])
+                    data.update(gtc_data)
 
-            data["consecutive_errors"] = self._consecutive_errors
-            return data
-
-        except ConfigEntryAuthFailed:
-            raise
-        except UpdateFailed:
-            raise
-        except Exception as err:
-            self._consecutive_errors += 1
-            raise UpdateFailed(f"Error fetching ONU data: {err}") from err
+        return data, device_info, module
 
     def _parse_sections(self, output: str) -> dict[str, str]:
         """Parse the combined command output into sections."""
@@ -266,12 +573,19 @@ class WAS110Coordinator(DataUpdateCoordinator[dict[str, Any]]):
 
         return sections
 
-    def _decode_eeprom(self, base64_data: str) -> bytes | None:
-        """Decode base64 EEPROM data."""
+    def _decode_eeprom(self, base64_data: str, offset: int = 0) -> bytes | None:
+        """Decode base64 EEPROM data read from `offset` onwards.
+
+        The result is zero-padded back to absolute EEPROM addresses so the
+        parsers can keep using datasheet byte offsets.
+        """
         try:
-            return base64.b64decode(base64_data.strip())
+            raw_bytes = base64.b64decode(base64_data.strip())
         except Exception:
             return None
+        if not raw_bytes:
+            return None
+        return bytes(offset) + raw_bytes
 
     def _parse_eeprom50(self, raw_bytes: bytes) -> dict[str, Any]:
         """Parse EEPROM50 for device information."""
@@ -299,43 +613,56 @@ class WAS110Coordinator(DataUpdateCoordinator[dict[str, Any]]):
                 raw_bytes[56:60].decode("ascii", errors="ignore").strip()
             )
 
+            # Diagnostic Monitoring Type (byte 92)
+            data["externally_calibrated"] = is_externally_calibrated(raw_bytes)
+
         except Exception as err:
             _LOGGER.debug("Error parsing EEPROM50: %s", err)
 
         return data
 
-    def _parse_eeprom51(self, raw_bytes: bytes) -> dict[str, Any]:
-        """Parse EEPROM51 for real-time optical diagnostics."""
+    def _parse_eeprom51(
+        self, raw_bytes: bytes, calibration: Calibration | None = None
+    ) -> dict[str, Any]:
+        """Parse EEPROM51 for real-time optical diagnostics.
+
+        Externally calibrated modules report raw A/D values, which are
+        converted with the module's `calibration` constants first.
+        """
         data: dict[str, Any] = {}
 
         if len(raw_bytes) < 106:
             return data
 
         try:
-            # Optic Temperature (Bytes 96-97)
-            data["optic_temperature"] = round(
-                raw_bytes[96] + (raw_bytes[97] / 256.0), 2
-            )
+            words = {
+                "temperature": int.from_bytes(raw_bytes[96:98], "big", signed=True),
+                "voltage": (raw_bytes[98] << 8) + raw_bytes[99],
+                "tx_bias": (raw_bytes[100] << 8) + raw_bytes[101],
+                "tx_power": (raw_bytes[102] << 8) + raw_bytes[103],
+                "rx_power": (raw_bytes[104] << 8) + raw_bytes[105],
+            }
+            if calibration is not None:
+                words = {
+                    name: calibration.apply(name, word) for name, word in words.items()
+                }
+
+            # Optic Temperature (Bytes 96-97, signed 1/256 degC)
+            data["optic_temperature"] = round(words["temperature"] / 256.0, 2)
 
             # Voltage (Bytes 98-99)
-            data["voltage"] = round(
-                ((raw_bytes[98] << 8) + raw_bytes[99]) / 10000.0, 3
-            )
+            data["voltage"] = round(words["voltage"] / 10000.0, 3)
 
             # TX Bias (Bytes 100-101)
-            data["tx_bias_current"] = round(
-                ((raw_bytes[100] << 8) + raw_bytes[101]) / 500.0, 2
-            )
+            data["tx_bias_current"] = round(words["tx_bias"] / 500.0, 2)
 
             # TX Power (Bytes 102-103)
-            tx_power_raw = (raw_bytes[102] << 8) + raw_bytes[103]
-            tx_power_mw = tx_power_raw / 10000.0
+            tx_power_mw = words["tx_power"] / 10000.0
             data["tx_power_mw"] = round(tx_power_mw, 4)
             data["tx_power_dbm"] = self._watts_to_dbm(tx_power_mw)
 
             # RX Power (Bytes 104-105)
-            rx_power_raw = (raw_bytes[104] << 8) + raw_bytes[105]
-            rx_power_mw = rx_power_raw / 10000.0
+            rx_power_mw = words["rx_power"] / 10000.0
             data["rx_power_mw"] = round(rx_power_mw, 4)
             data["rx_power_dbm"] = self._watts_to_dbm(rx_power_mw)
 
@@ -365,11 +692,11 @@ class WAS110Coordinator(DataUpdateCoordinator[dict[str, Any]]):
                         data["pon_state_name"] = PON_STATES.get(
                             state_code, f"Unknown ({state_code})"
                         )
-                        # O5.x states are operational
-                        data["pon_link"] = state_code in [50, 51, 52]
+                        data["pon_link"] = state_code in PON_OPERATIONAL_STATES
                 elif key == "previous":
                     with contextlib.suppress(ValueError):
                         prev_code = int(value)
+                        data["pon_previous_state_code"] = prev_code
                         data["pon_previous_state"] = PON_STATES.get(
                             prev_code, f"Unknown ({prev_code})"
                         )
@@ -379,21 +706,26 @@ class WAS110Coordinator(DataUpdateCoordinator[dict[str, Any]]):
 
         return data
 
-    def _parse_system_info(self, output: str) -> dict[str, Any]:
-        """Parse system uptime and memory info."""
+    def _parse_uptime(self, output: str) -> dict[str, Any]:
+        """Parse system uptime."""
         data: dict[str, Any] = {}
-        lines = output.strip().split("\n")
 
-        # First line is uptime: "299633.80 285601.51"
-        if lines:
-            uptime_parts = lines[0].split()
-            if uptime_parts:
-                with contextlib.suppress(ValueError):
-                    data["onu_uptime"] = int(float(uptime_parts[0]))
+        # Format: "299633.80 285601.51"
+        uptime_parts = output.split()
+        if uptime_parts:
+            with contextlib.suppress(ValueError):
+                data["onu_uptime"] = int(float(uptime_parts[0]))
+
+        return data
+
+    def _parse_memory(self, output: str) -> dict[str, Any]:
+        """Parse memory info."""
+        data: dict[str, Any] = {}
 
-        # Second line is memory: "Mem: total used free shared buff/cache available"
-        if len(lines) > 1:
-            mem_parts = lines[1].split()
+        # Format: "Mem: total used free shared buff/cache available"
+        lines = output.strip().split("\n")
+        if lines:
+            mem_parts = lines[0].split()
             if len(mem_parts) >= 4:
                 with contextlib.suppress(ValueError):
                     data["memory_total"] = int(mem_parts[1])
@@ -454,8 +786,150 @@ class WAS110Coordinator(DataUpdateCoordinator[dict[str, Any]]):
             return -100.0
         return round(10 * math.log10(mw), 2)
 
+    def async_start_fast_sampling(self) -> None:
+        """Start high-rate sampling of optics and GTC counters, if enabled.
+
+        Fast samples only feed the snapshot ring and are written as
+        pre-aggregated long-term statistics; entity states keep updating at
+        the regular scan interval so the recorder cost doesn't grow, unless
+        a sample changes the alarm state or detects a step.
+        """
+        if not self.fast_scan_interval:
+            return
+
+        self.config_entry.async_on_unload(
+            async_track_time_interval(
+                self.hass,
+                self._async_fast_sample,
+                timedelta(seconds=self.fast_scan_interval),
+            )
+        )
+
+    async def _async_fast_sample(self, _now: datetime) -> None:
+        """Take a single high-rate sample."""
+        if self._fast_sample_running:
+            return
+
+        self._fast_sample_running = True
+        try:
+            result = await self._async_run_command(
+                FAST_SAMPLE_COMMAND, stage="fast_sample"
+            )
+        finally:
+            self._fast_sample_running = False
+
+        if result is None:
+            return
+
+        output, sent, received = result
+        sections = self._parse_sections(output)
+        sample: dict[str, Any] = {}
+        if "CLOCK" in sections:
+            sample.update(parse_clock(sections["CLOCK"]))
+
+        if "EEPROM51" in sections:
+            eeprom51_data = self._decode_eeprom(sections["EEPROM51"], EEPROM51_OFFSET)
+            if eeprom51_data:
+                sample.update(self._parse_eeprom51(eeprom51_data, self._calibration))
+
+        if "GTC_COUNTERS" in sections:
+            sample.update(self._parse_gtc_counters(sections["GTC_COUNTERS"]))
+
+        _, timestamp = self._sample_time(sample, sent, received)
+        if self.history.record(timestamp, sample):
+            self.hass.async_create_task(
+                self.history.async_import_statistics(timestamp)
+            )
+        self.aging.record(timestamp, sample)
+
+        # Alarms and change points respond at the sampling rate; other
+        # states (including the anomaly scores) wait for the poll
+        events = self._detect_changes(sample, timestamp)
+        if self._thresholds is not None:
+            events.update(evaluate(self._thresholds, sample))
+        if self.data is not None and any(
+            self.data.get(key) != value
+            for key, value in events.items()
+            if not key.endswith("_anomaly_score")
+        ):
+            self.async_set_updated_data({**self.data, **sample, **events})
+
+    def _bias_limit(self) -> float | None:
+        """Return the module's TX bias high warning level, if known."""
+        if self._thresholds is None:
+            return None
+        if (limits := self._thresholds.limits.get("tx_bias")) is None:
+            return None
+        return limits[2]
+
+    def _sample_time(
+        self, sample: dict[str, Any], sent: float, received: float
+    ) -> tuple[float, float]:
+        """Return the monotonic and wall time a sample was taken at.
+
+        With the ONU's clock read, the sample is timed by its uptime mapped
+        onto the local clock, so SSH latency and its jitter don't distort
+        rates or intervals; otherwise by when the output arrived.
+        """
+        wall_base = time.time() - time.monotonic()
+        if (uptime := sample.get("clock_uptime")) is None:
+            return received, received + wall_base
+        now = self.clock.update(
+            sent,
+            received,
+            uptime,
+            end_uptime=sample.get("cpu_stat_uptime"),
+            wall_time=sample.get("clock_time"),
+            wall_base=wall_base,
+        )
+        return now, now + wall_base
+
+    @callback
+    def _detect_changes(
+        self, sample: dict[str, Any], timestamp: float
+    ) -> dict[str, Any]:
+        """Feed the change detectors and fire an event per detected change.
+
+        `timestamp` is the sample's wall time.
+        """
+        data: dict[str, Any] = {}
+        for name, key in ANOMALY_METRICS.items():
+            if (value := sample.get(key)) is not None:
+                detector = self._change_detectors[name]
+                if (step := detector.update(value)) is not None:
+                    self._last_changes[name] = (
+                        dt_util.utc_from_timestamp(timestamp),
+                        round(step, 2),
+                    )
+                    self.hass.bus.async_fire(
+                        EVENT_OPTICAL_CHANGE,
+                        {
+                            "host": self.host,
+                            "metric": key,
+                            "value": value,
+                            "step_db": round(step, 2),
+                        },
+                    )
+                data[f"{name}_anomaly_score"] = round(detector.score, 3)
+
+            if (change := self._last_changes.get(name)) is not None:
+                data[f"{name}_last_change"], data[f"{name}_change_step"] = change
+        return data
+
+    async def async_restore_history(self) -> None:
+        """Load the persisted snapshots and trends, backfill long-term statistics."""
+        await self.history.async_load()
+        await self.history.async_import_statistics(time.time())
+        await self.aging.async_load()
+
     async def async_close(self) -> None:
-        """Close the SSH connection."""
+        """Close the SSH connection and flush the snapshot ring.
+
+        Pooled connections are closed by the hub that owns the pool.
+        """
+        await self.history.async_save()
+        await self.aging.async_save()
+        self._close_shell()
         if self._connection and not self._connection.is_closed:
             self._connection.close()
             await self._connection.wait_closed()
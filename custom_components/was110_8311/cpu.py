@@ -0,0 +1,139 @@
+"""ONU CPU load and the monitor's own overhead for 8311 ONU Monitor."""
+from __future__ import annotations
+
+from typing import Any, Final
+
+# Read last, so the shell's children (every other section) are accounted.
+# $$ is the shell running our commands, $PPID the Dropbear session behind it.
+CPU_STAT_COMMAND: Final = (
+    "cut -d' ' -f1 /proc/uptime; cat /proc/loadavg; head -n1 /proc/stat; "
+    "cat /proc/$$/stat /proc/$PPID/stat 2>/dev/null"
+)
+
+# USER_HZ, fixed at 100 in the kernel ABI whatever the kernel's HZ
+CLOCK_TICKS: Final = 100
+
+# Coordinator data keys served by the CPU sections
+CPU_KEYS: Final = frozenset(
+    {
+        "cpu_usage",
+        "cpu_iowait",
+        "load_1m",
+        "load_5m",
+        "load_15m",
+        "monitor_cpu_time",
+        "monitor_wall_time",
+        "monitor_cpu_share",
+    }
+)
+
+# Process roles whose CPU time is the monitor's overhead
+_PROCESSES: Final = ("shell", "session")
+
+
+def _parse_process(line: str) -> tuple[int, int, int] | None:
+    """Return (pid, CPU ticks, start tick) from a /proc/<pid>/stat line.
+
+    The shell's ticks include its finished children (cutime, cstime),
+    which is where every command of the poll runs.
+    """
+    # The command name is in parentheses and may contain spaces
+    pid, _, rest = line.partition(" (")
+    fields = rest.rpartition(") ")[2].split()
+    if len(fields) < 20:
+        return None
+    try:
+        utime, stime, cutime, cstime = (int(field) for field in fields[11:15])
+        return int(pid), utime + stime + cutime + cstime, int(fields[19])
+    except ValueError:
+        return None
+
+
+def parse_cpu_stat(output: str, poll_start: float | None = None) -> dict[str, Any]:
+    """Parse the CPU section; `poll_start` is the ONU's uptime at the poll's start."""
+    data: dict[str, Any] = {}
+    lines = output.strip().splitlines()
+    if len(lines) < 3:
+        return data
+
+    try:
+        data["cpu_stat_uptime"] = float(lines[0])
+        load = lines[1].split()
+        data["load_1m"], data["load_5m"], data["load_15m"] = (
+            float(value) for value in load[:3]
+        )
+        # cpu user nice system idle iowait irq softirq steal ...
+        jiffies = [int(value) for value in lines[2].split()[1:9]]
+    except (ValueError, IndexError):
+        return data
+    data["cpu_jiffies_total"] = sum(jiffies)
+    data["cpu_jiffies_idle"] = jiffies[3] + jiffies[4]
+    data["cpu_jiffies_iowait"] = jiffies[4]
+
+    for role, line in zip(_PROCESSES, lines[3:5], strict=False):
+        if (process := _parse_process(line)) is not None:
+            data[f"{role}_process"] = process
+
+    if poll_start is not None:
+        data["poll_start_uptime"] = poll_start
+    return data
+
+
+class CpuMeter:
+    """ONU CPU usage and the monitor's share of it, between polls.
+
+    CPU time is cumulative per process, so the monitor's cost since the
+    last poll is the increase for processes already seen. A process with
+    a new pid (a fresh SSH session or shell) started for this poll, and
+    everything it used - key exchange included - is this poll's cost.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the meter."""
+        self._jiffies: tuple[int, int, int] | None = None
+        self._processes: dict[str, tuple[int, int]] = {}
+
+    def update(self, sample: dict[str, Any]) -> dict[str, Any]:
+        """Add a sample of the CPU section; return the derived readings."""
+        if "cpu_jiffies_total" not in sample:
+            return {}
+        data: dict[str, Any] = {
+            key: sample[key] for key in ("load_1m", "load_5m", "load_15m")
+        }
+
+        jiffies = (
+            sample["cpu_jiffies_total"],
+            sample["cpu_jiffies_idle"],
+            sample["cpu_jiffies_iowait"],
+        )
+        elapsed = None
+        if self._jiffies is not None and jiffies[0] > self._jiffies[0]:
+            elapsed = jiffies[0] - self._jiffies[0]
+            idle = jiffies[1] - self._jiffies[1]
+            data["cpu_usage"] = round(100 * (1 - idle / elapsed), 1)
+            data["cpu_iowait"] = round(100 * (jiffies[2] - self._jiffies[2]) / elapsed, 1)
+        self._jiffies = jiffies
+
+        uptime = sample["cpu_stat_uptime"]
+        ticks = 0
+        started: float | None = sample.get("poll_start_uptime")
+        for role in _PROCESSES:
+            if (process := sample.get(f"{role}_process")) is None:
+                return data
+            pid, total, start_tick = process
+            previous = self._processes.get(role)
+            if previous is not None and previous[0] == pid and total >= previous[1]:
+                ticks += total - previous[1]
+            else:
+                ticks += total
+                # The whole life of a new session belongs to this poll
+                if role == "session":
+                    started = start_tick / CLOCK_TICKS
+            self._processes[role] = (pid, total)
+
+        data["monitor_cpu_time"] = ticks * 1000 // CLOCK_TICKS
+        if started is not None and uptime >= started:
+            data["monitor_wall_time"] = round((uptime - started) * 1000)
+        if elapsed:
+            data["monitor_cpu_share"] = round(100 * ticks / elapsed, 2)
+        return data
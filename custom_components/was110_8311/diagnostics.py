@@ -1,6 +1,7 @@
 """Diagnostics support for 8311 ONU Monitor."""
 from __future__ import annotations
 
+import time
 from typing import Any
 
 from homeassistant.components.diagnostics import async_redact_data
@@ -9,6 +10,7 @@ from homeassistant.const import CONF_PASSWORD
 from homeassistant.core import HomeAssistant
 
 from .coordinator import WAS110Coordinator
+from .hub import WAS110Hub
 
 # Sensitive data to redact from diagnostics
 # gpon_serial is the spoofed ISP serial - highly sensitive for authentication
@@ -20,22 +22,47 @@ async def async_get_config_entry_diagnostics(
     entry: ConfigEntry,
 ) -> dict[str, Any]:
     """Return diagnostics for a config entry."""
+    entry_data = {
+        "data": async_redact_data(entry.data, TO_REDACT),
+        "options": dict(entry.options),
+    }
+
+    if isinstance(entry.runtime_data, WAS110Hub):
+        hub: WAS110Hub = entry.runtime_data
+        return {
+            "entry": entry_data,
+            "onus": [
+                _coordinator_diagnostics(coordinator)
+                for coordinator in hub.coordinators
+            ],
+            "fleet": hub.fleet.data,
+            "last_profile": hub.last_profile,
+        }
+
     coordinator: WAS110Coordinator = entry.runtime_data
+    return {
+        "entry": entry_data,
+        **_coordinator_diagnostics(coordinator),
+        "last_profile": coordinator.last_profile,
+    }
+
 
+def _coordinator_diagnostics(coordinator: WAS110Coordinator) -> dict[str, Any]:
+    """Return diagnostics for one ONU."""
     return {
-        "entry": {
-            "data": async_redact_data(entry.data, TO_REDACT),
-            "options": dict(entry.options),
-        },
         "coordinator": {
             "host": coordinator.host,
             "port": coordinator.port,
             "username": coordinator.username,
-            "update_interval": coordinator.update_interval.total_seconds()
-            if coordinator.update_interval
-            else None,
+            "update_interval": coordinator.scan_interval,
             "last_update_success": coordinator.last_update_success,
+            "history_snapshots": len(coordinator.history),
         },
         "data": async_redact_data(coordinator.data or {}, TO_REDACT),
         "device_info": async_redact_data(coordinator.device_info, TO_REDACT),
+        "thresholds": (
+            coordinator.thresholds.as_dict() if coordinator.thresholds else None
+        ),
+        "pon_transitions": coordinator.pon_transitions.history(time.monotonic()),
+        "latency": coordinator.latency.as_dict(),
     }
@@ -0,0 +1,109 @@
+"""Fleet-wide aggregates across the ONUs of a hub for 8311 ONU Monitor."""
+from __future__ import annotations
+
+import warnings
+from collections import Counter
+from typing import Any, Final
+
+import numpy as np
+
+# Matrix columns, as coordinator data key -> robust spread floor. Readings
+# are quantized and a healthy fleet can agree to the last digit; the floor
+# keeps a 0.1 dB difference from making an ONU an outlier.
+FLEET_METRICS: Final = {
+    "rx_power_dbm": 0.5,
+    "tx_power_dbm": 0.5,
+    "optic_temperature": 2.0,
+    "tx_bias_current": 1.0,
+}
+# Per-ONU data keys the fleet reads, kept in every ONU's command plan
+FLEET_KEYS: Final = frozenset(
+    {*FLEET_METRICS, "pon_state_name", "pon_link", "isp"}
+)
+
+# Modified z-score (Iglewicz and Hoaglin) beyond which an ONU is an outlier
+OUTLIER_Z: Final = 3.5
+# ONUs reporting a metric before its outliers mean anything
+OUTLIER_MIN_ONUS: Final = 5
+# Scales the median absolute deviation to a standard deviation
+MAD_SCALE: Final = 1.4826
+
+_COLUMNS: Final = tuple(FLEET_METRICS)
+_FLOORS: Final = np.array(tuple(FLEET_METRICS.values()))
+
+
+class FleetMatrix:
+    """Latest readings of every ONU as an ONU x metric matrix.
+
+    Each ONU update overwrites its own row in place, so nothing is
+    allocated per poll; the aggregates are computed column-wise over the
+    whole fleet at once. Missing readings (and ONUs that are down) are NaN
+    and drop out of every statistic.
+    """
+
+    def __init__(self, hosts: list[str]) -> None:
+        """Initialize an empty matrix."""
+        self.hosts = hosts
+        self.values = np.full((len(hosts), len(_COLUMNS)), np.nan)
+        self.links = np.zeros(len(hosts), dtype=bool)
+        self.pon_states: list[str | None] = [None] * len(hosts)
+        self.isps: list[str | None] = [None] * len(hosts)
+
+    def update(self, index: int, data: dict[str, Any]) -> None:
+        """Overwrite an ONU's row with its latest data."""
+        row = self.values[index]
+        for column, key in enumerate(_COLUMNS):
+            value = data.get(key)
+            row[column] = np.nan if value is None else value
+        self.links[index] = bool(data.get("pon_link"))
+        self.pon_states[index] = data.get("pon_state_name")
+        self.isps[index] = data.get("isp")
+
+    def clear(self, index: int) -> None:
+        """Drop an unreachable ONU's readings from the aggregates."""
+        self.values[index] = np.nan
+        self.links[index] = False
+        self.pon_states[index] = None
+
+    def aggregates(self) -> dict[str, Any]:
+        """Return the fleet statistics, outliers and counts."""
+        reporting = ~np.isnan(self.values)
+        counts = reporting.sum(axis=0)
+        data: dict[str, Any] = {
+            "fleet_onus": len(self.hosts),
+            "fleet_onus_reporting": int(reporting.any(axis=1).sum()),
+            "fleet_onus_linked": int(self.links.sum()),
+            "fleet_pon_states": dict(Counter(filter(None, self.pon_states))),
+            "fleet_isps": dict(Counter(filter(None, self.isps))),
+            "fleet_outliers": {},
+        }
+        if not counts.any():
+            return data
+
+        with warnings.catch_warnings():
+            # Columns no ONU reports are all NaN; their statistics stay NaN
+            warnings.simplefilter("ignore", RuntimeWarning)
+            low, median, high = np.nanpercentile(self.values, (10, 50, 90), axis=0)
+            deviation = np.abs(self.values - median)
+            spread = np.maximum(MAD_SCALE * np.nanmedian(deviation, axis=0), _FLOORS)
+            minimum = np.nanmin(self.values, axis=0)
+            maximum = np.nanmax(self.values, axis=0)
+
+        # NaN compares false, so ONUs without a reading are never outliers
+        outliers = (deviation / spread > OUTLIER_Z) & (counts >= OUTLIER_MIN_ONUS)
+
+        for column, key in enumerate(_COLUMNS):
+            if not counts[column]:
+                continue
+            data[f"fleet_{key}_median"] = round(float(median[column]), 2)
+            data[f"fleet_{key}_p10"] = round(float(low[column]), 2)
+            data[f"fleet_{key}_p90"] = round(float(high[column]), 2)
+            data[f"fleet_{key}_min"] = round(float(minimum[column]), 2)
+            data[f"fleet_{key}_max"] = round(float(maximum[column]), 2)
+            data[f"fleet_{key}_reporting"] = int(counts[column])
+
+        for index in np.flatnonzero(outliers.any(axis=1)):
+            data["fleet_outliers"][self.hosts[index]] = [
+                _COLUMNS[column] for column in np.flatnonzero(outliers[index])
+            ]
+        return data
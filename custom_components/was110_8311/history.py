@@ -0,0 +1,342 @@
+"""Snapshot history, long-term statistics and laser trends for 8311 ONU Monitor."""
+from __future__ import annotations
+
+import logging
+import math
+import statistics
+from collections import deque
+from datetime import UTC, datetime
+from typing import Any, Final
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import (
+    UnitOfElectricCurrent,
+    UnitOfElectricPotential,
+    UnitOfTemperature,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+
+from .const import DOMAIN
+from .trend import DEFAULT_BIAS_LIMIT_MA, TrendRegression, aging_data
+
+try:
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:
+    # Home Assistant before 2025.4 only knows has_mean
+    StatisticMeanType = None
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION: Final = 1
+SAVE_DELAY: Final = 60
+# Trends change slowly; losing a few minutes of them on a crash is harmless
+TREND_SAVE_DELAY: Final = 300
+
+# Snapshots kept on disk (24h at the default 60s scan interval)
+HISTORY_SIZE: Final = 1440
+
+# Numeric keys kept in the ring and imported as long-term statistics
+STATISTIC_UNITS: Final = {
+    "rx_power_dbm": "dBm",
+    "tx_power_dbm": "dBm",
+    "optic_temperature": UnitOfTemperature.CELSIUS,
+    "voltage": UnitOfElectricPotential.VOLT,
+    "tx_bias_current": UnitOfElectricCurrent.MILLIAMPERE,
+    "cpu0_temperature": UnitOfTemperature.CELSIUS,
+    "cpu1_temperature": UnitOfTemperature.CELSIUS,
+    # Cumulative counters, imported as a running sum of their increases
+    "gtc_bip_errors": None,
+    "gtc_fec_corrected": None,
+    "gtc_fec_uncorrected": None,
+    "gtc_lods_events": None,
+}
+STATISTIC_KEYS: Final = tuple(STATISTIC_UNITS)
+COUNTER_KEYS: Final = frozenset(
+    {"gtc_bip_errors", "gtc_fec_corrected", "gtc_fec_uncorrected", "gtc_lods_events"}
+)
+
+HOUR: Final = 3600
+
+
+class WAS110History:
+    """Persisted ring of compact snapshots, backfilled into long-term statistics.
+
+    Each snapshot is stored as ``[timestamp, value, ...]`` in STATISTIC_KEYS
+    order. The ring is only read from disk after setup has finished, and
+    every completed hour it covers is imported as external statistics
+    (``was110_8311:<host>_<key>``) so HA restarts don't leave gaps.
+    Gauges get an hourly mean/min/max; counters, like ``total_increasing``
+    sensors, the last value and a sum of increases that survives resets.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        host: str,
+        sample_interval: float | None = None,
+    ) -> None:
+        """Initialize the history.
+
+        High-rate sampling grows the ring to hold at least two full hours, so
+        every hour is still complete when it is imported.
+        """
+        self.hass = hass
+        self._host = host
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.history"
+        )
+        maxlen = HISTORY_SIZE
+        if sample_interval:
+            maxlen = max(maxlen, math.ceil(2 * HOUR / sample_interval))
+        self._samples: deque[list[float | None]] = deque(maxlen=maxlen)
+        self._last_imported_hour: float | None = None
+        # Counter key -> [sum of increases, last value] as of the last import
+        self._totals: dict[str, list[float | None]] = {}
+        self._loaded = False
+        self._save_pending = False
+
+    def __len__(self) -> int:
+        """Return the number of snapshots in the ring."""
+        return len(self._samples)
+
+    def statistic_id(self, key: str) -> str:
+        """Return the external statistic id for a data key."""
+        return f"{DOMAIN}:{slugify(f'{self._host}_{key}')}"
+
+    def record(self, timestamp: float, data: dict[str, Any]) -> bool:
+        """Append a snapshot; return True when an hour boundary was crossed."""
+        values = [data.get(key) for key in STATISTIC_KEYS]
+        if all(value is None for value in values):
+            return False
+
+        crossed = bool(self._samples) and (
+            timestamp // HOUR > (self._samples[-1][0] or 0) // HOUR
+        )
+        self._samples.append([round(timestamp, 3), *values])
+        # Saving before the stored ring is merged would overwrite it
+        if self._loaded:
+            self._schedule_save()
+        return crossed
+
+    async def async_load(self) -> None:
+        """Load the persisted ring, keeping anything recorded since startup."""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        stored = await self._store.async_load()
+        if not stored:
+            return
+
+        self._last_imported_hour = stored.get("last_imported_hour")
+        self._totals = stored.get("totals", {})
+        first = self._samples[0][0] if self._samples else None
+        restored = [
+            sample
+            for sample in stored.get("samples", [])
+            if len(sample) == len(STATISTIC_KEYS) + 1
+            and (first is None or sample[0] < first)
+        ]
+        self._samples.extendleft(reversed(restored))
+        self._schedule_save()
+        _LOGGER.debug("Restored %d snapshots for %s", len(restored), self._host)
+
+    async def async_import_statistics(self, now: float) -> None:
+        """Import every completed hour not yet imported as external statistics."""
+        if "recorder" not in self.hass.config.components or not self._loaded:
+            return
+
+        current_hour = now // HOUR
+        hours: dict[float, list[list[float | None]]] = {}
+        for sample in self._samples:
+            hour = sample[0] // HOUR
+            if hour >= current_hour:
+                break
+            if self._last_imported_hour is None or hour > self._last_imported_hour:
+                hours.setdefault(hour, []).append(sample)
+
+        if not hours:
+            return
+
+        for index, key in enumerate(STATISTIC_KEYS, start=1):
+            stats: list[StatisticData] = []
+            for hour, samples in hours.items():
+                values = [s[index] for s in samples if s[index] is not None]
+                if not values:
+                    continue
+                start = datetime.fromtimestamp(hour * HOUR, tz=UTC)
+                if key in COUNTER_KEYS:
+                    stats.append(
+                        StatisticData(
+                            start=start, state=values[-1], sum=self._add_increases(key, values)
+                        )
+                    )
+                else:
+                    stats.append(
+                        StatisticData(
+                            start=start,
+                            mean=round(statistics.fmean(values), 4),
+                            min=min(values),
+                            max=max(values),
+                        )
+                    )
+            if not stats:
+                continue
+
+            async_add_external_statistics(self.hass, self._metadata(key), stats)
+
+        self._last_imported_hour = max(hours)
+        self._schedule_save()
+        _LOGGER.debug("Imported %d hours of statistics for %s", len(hours), self._host)
+
+    def _metadata(self, key: str) -> StatisticMetaData:
+        """Return the statistic metadata for a data key."""
+        counter = key in COUNTER_KEYS
+        metadata = StatisticMetaData(
+            has_sum=counter,
+            name=f"8311 ONU {self._host} {key}",
+            source=DOMAIN,
+            statistic_id=self.statistic_id(key),
+            unit_of_measurement=STATISTIC_UNITS[key],
+        )
+        if StatisticMeanType is None:
+            metadata["has_mean"] = not counter
+        else:
+            metadata["mean_type"] = (
+                StatisticMeanType.NONE if counter else StatisticMeanType.ARITHMETIC
+            )
+        return metadata
+
+    def _add_increases(self, key: str, values: list[float]) -> float:
+        """Add a counter's increases over `values` to its sum; return the sum.
+
+        A drop is a reset (reboot or counter clear): the new value is all
+        increase since, as for ``total_increasing`` sensors.
+        """
+        total, last = self._totals.get(key, [0.0, None])
+        for value in values:
+            if last is not None:
+                total += value - last if value >= last else value
+            last = value
+        self._totals[key] = [total, last]
+        return total
+
+    def _schedule_save(self) -> None:
+        """Save within SAVE_DELAY of the first unsaved snapshot.
+
+        Only one delayed save is scheduled at a time: Store restarts the
+        delay on every call, which would keep postponing the write while
+        snapshots arrive more often than SAVE_DELAY.
+        """
+        if not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_save(self) -> None:
+        """Write the ring to disk immediately."""
+        if self._loaded:
+            await self._store.async_save(self._data_to_save())
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        self._save_pending = False
+        return {
+            "last_imported_hour": self._last_imported_hour,
+            "totals": self._totals,
+            "samples": list(self._samples),
+        }
+
+
+class LaserAging:
+    """Laser aging trends of one ONU, persisted across restarts.
+
+    TX bias and TX power are fitted against optic temperature and time;
+    the time term is the aging trend with the daily and seasonal
+    temperature swings taken out. A new module starts from scratch.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the trends."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.trend"
+        )
+        self.serial: str | None = None
+        self.bias = TrendRegression()
+        self.power = TrendRegression()
+        self._loaded = False
+        self._save_pending = False
+
+    def set_module(self, serial: str | None) -> None:
+        """Restart the trends when the module is replaced."""
+        if serial and self.serial and serial != self.serial:
+            _LOGGER.info("Module changed to %s, restarting laser trends", serial)
+            self.bias = TrendRegression()
+            self.power = TrendRegression()
+        if serial:
+            self.serial = serial
+
+    def record(self, timestamp: float, data: dict[str, Any]) -> None:
+        """Add a sample, if the laser is running."""
+        temperature = data.get("optic_temperature")
+        bias = data.get("tx_bias_current")
+        power = data.get("tx_power_dbm")
+        if temperature is None or not bias or power is None:
+            return
+
+        self.bias.add(timestamp, temperature, bias)
+        self.power.add(timestamp, temperature, power)
+        # Saving before the stored trends are merged would overwrite them
+        if self._loaded:
+            self._schedule_save()
+
+    def as_data(self, now: float, bias_limit: float | None) -> dict[str, Any]:
+        """Return the trend sensors' data."""
+        return aging_data(
+            self.bias, self.power, now, bias_limit or DEFAULT_BIAS_LIMIT_MA
+        )
+
+    async def async_load(self) -> None:
+        """Load the persisted trends unless the module has changed since."""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        stored = await self._store.async_load()
+        if not stored or (
+            self.serial and stored.get("serial") not in (None, self.serial)
+        ):
+            return
+        # Months of stored trend outweigh the samples taken since startup
+        self.serial = self.serial or stored.get("serial")
+        self.bias = TrendRegression.from_dict(stored.get("bias", {}))
+        self.power = TrendRegression.from_dict(stored.get("power", {}))
+        self._schedule_save()
+
+    def _schedule_save(self) -> None:
+        """Save within TREND_SAVE_DELAY of the first unsaved change.
+
+        Store's delayed save restarts its delay on every call, so calling it
+        for each sample would postpone the write for as long as samples keep
+        arriving more often than the delay.
+        """
+        if not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_save, TREND_SAVE_DELAY)
+
+    async def async_save(self) -> None:
+        """Write the trends to disk immediately."""
+        if self._loaded:
+            await self._store.async_save(self._data_to_save())
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        self._save_pending = False
+        return {
+            "serial": self.serial,
+            "bias": self.bias.as_dict(),
+            "power": self.power.as_dict(),
+        }
@@ -0,0 +1,225 @@
+"""Hub mode for 8311 ONU Monitor: many ONUs behind one config entry."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import random
+from datetime import timedelta
+from functools import partial
+from typing import Any, Final
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import (
+    CONF_HOSTS,
+    CONF_MAX_SESSIONS,
+    CONF_SCAN_INTERVAL,
+    DEFAULT_MAX_SESSIONS,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+)
+from .coordinator import WAS110Coordinator
+from .fleet import FLEET_KEYS, FleetMatrix
+from .pool import SSHConnectionPool
+
+_LOGGER = logging.getLogger(__name__)
+
+# Random offset applied to every poll, as a fraction of the ONU's slot width
+HUB_JITTER: Final = 0.25
+
+# From this many ONUs on, command output is parsed in the executor
+EXECUTOR_DECODE_MIN_ONUS: Final = 8
+
+
+def stagger_offsets(count: int, interval: float) -> list[float]:
+    """Return each ONU's phase within the scan interval.
+
+    ONUs get evenly spaced slots, so polls (and their SSH sessions) are
+    spread over the whole interval instead of firing in lockstep. The
+    last ONU is polled one full interval after the initial refresh.
+    """
+    slot = interval / count
+    return [slot * (index + 1) for index in range(count)]
+
+
+def jitter(count: int, interval: float, rng: random.Random) -> float:
+    """Return a random offset that keeps a poll within its own slot."""
+    half_width = HUB_JITTER * interval / count / 2
+    return rng.uniform(-half_width, half_width)
+
+
+class WAS110Fleet(DataUpdateCoordinator[dict[str, Any]]):
+    """Fleet aggregates over the ONUs of a hub.
+
+    ONU updates only overwrite their row of the matrix; the aggregates (and
+    the fleet entities' states) are computed once per scan interval, and
+    only while a fleet entity is enabled.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        coordinators: list[WAS110Coordinator],
+        scan_interval: int,
+    ) -> None:
+        """Initialize the fleet and subscribe to every ONU."""
+        self.entry_id = entry.entry_id
+        self.matrix = FleetMatrix([coordinator.host for coordinator in coordinators])
+        self._coordinators = coordinators
+        self._unsubscribe = [
+            coordinator.async_add_listener(partial(self._async_update_row, index))
+            for index, coordinator in enumerate(coordinators)
+        ]
+        for coordinator in coordinators:
+            coordinator.required_keys = FLEET_KEYS
+
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_fleet",
+            update_interval=timedelta(seconds=scan_interval),
+        )
+
+    @callback
+    def _async_update_row(self, index: int) -> None:
+        """Copy an ONU's latest data into its row."""
+        coordinator = self._coordinators[index]
+        if coordinator.last_update_success and coordinator.data is not None:
+            self.matrix.update(index, coordinator.data)
+        else:
+            self.matrix.clear(index)
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Compute the aggregates from the current matrix."""
+        return self.matrix.aggregates()
+
+    @callback
+    def async_close(self) -> None:
+        """Stop following the ONUs."""
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe.clear()
+
+
+class WAS110Hub:
+    """Polls a list of ONUs from one config entry.
+
+    Every ONU gets its own coordinator, so its entities update (and go
+    unavailable) independently, while the hub owns the shared SSH pool and
+    a single scheduler that staggers the polls over the scan interval.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self.entry = entry
+        self.last_profile: dict[str, Any] | None = None
+        self.pool = SSHConnectionPool(
+            entry.data.get(CONF_MAX_SESSIONS, DEFAULT_MAX_SESSIONS)
+        )
+
+        hosts: list[str] = entry.data[CONF_HOSTS]
+        decode_in_executor = len(hosts) >= EXECUTOR_DECODE_MIN_ONUS
+        self.coordinators = [
+            WAS110Coordinator(
+                hass,
+                entry,
+                host=host,
+                pool=self.pool,
+                decode_in_executor=decode_in_executor,
+            )
+            for host in hosts
+        ]
+        self.scan_interval: int = entry.options.get(
+            CONF_SCAN_INTERVAL,
+            entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+        )
+        self.fleet = WAS110Fleet(hass, entry, self.coordinators, self.scan_interval)
+        self._rng = random.Random()
+        self._refreshing: set[int] = set()
+
+    async def async_config_entry_first_refresh(self) -> None:
+        """Refresh every ONU once; fail setup only if none answered."""
+        await asyncio.gather(
+            *(coordinator.async_refresh() for coordinator in self.coordinators)
+        )
+        if not any(
+            coordinator.last_update_success for coordinator in self.coordinators
+        ):
+            raise ConfigEntryNotReady(
+                f"None of the {len(self.coordinators)} ONUs could be reached"
+            )
+        await self.fleet.async_refresh()
+
+    def async_start(self) -> None:
+        """Start the shared scheduler; it is cancelled when the entry unloads."""
+        self.entry.async_create_background_task(
+            self.hass, self._async_schedule(), f"{DOMAIN}_hub_scheduler"
+        )
+
+    async def _async_schedule(self) -> None:
+        """Refresh each ONU in its own jittered slot of the scan interval."""
+        loop = self.hass.loop
+        count = len(self.coordinators)
+        interval = self.scan_interval
+        start = loop.time()
+
+        # (fire time, slot time, index); slot times advance by exactly one
+        # interval so the jitter never accumulates into drift
+        schedule = []
+        for index, offset in enumerate(stagger_offsets(count, interval)):
+            slot_at = start + offset
+            fire_at = slot_at + jitter(count, interval, self._rng)
+            schedule.append((fire_at, slot_at, index))
+        heapq.heapify(schedule)
+
+        while True:
+            fire_at, slot_at, index = heapq.heappop(schedule)
+            if (delay := fire_at - loop.time()) > 0:
+                await asyncio.sleep(delay)
+
+            if index in self._refreshing:
+                _LOGGER.debug(
+                    "Skipping poll of %s, previous poll still running",
+                    self.coordinators[index].host,
+                )
+            else:
+                self._refreshing.add(index)
+                self.entry.async_create_background_task(
+                    self.hass,
+                    self._async_refresh(index),
+                    f"{DOMAIN}_hub_refresh_{index}",
+                )
+
+            slot_at += interval
+            heapq.heappush(
+                schedule,
+                (slot_at + jitter(count, interval, self._rng), slot_at, index),
+            )
+
+    async def _async_refresh(self, index: int) -> None:
+        """Refresh one ONU."""
+        try:
+            await self.coordinators[index].async_refresh()
+        finally:
+            self._refreshing.discard(index)
+
+    async def async_close(self) -> None:
+        """Close every ONU and the shared pool."""
+        self.fleet.async_close()
+        await asyncio.gather(
+            *(coordinator.async_close() for coordinator in self.coordinators)
+        )
+        await self.pool.async_close()
+
+
+def entry_coordinators(entry: ConfigEntry) -> list[WAS110Coordinator]:
+    """Return the coordinators of a single-ONU or hub config entry."""
+    if isinstance(entry.runtime_data, WAS110Hub):
+        return entry.runtime_data.coordinators
+    return [entry.runtime_data]
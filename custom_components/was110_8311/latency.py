@@ -0,0 +1,132 @@
+"""Per-stage latency histograms for 8311 ONU Monitor."""
+from __future__ import annotations
+
+import bisect
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Final
+
+# Upper bucket bounds in milliseconds; the last bucket catches everything above
+LATENCY_BUCKETS_MS: Final = (
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+    5000,
+    10000,
+)
+
+# Stages exposed as sensors, as coordinator data keys `latency_<stage>_ms`
+SENSOR_STAGES: Final = ("poll", "ssh_connect", "remote_exec", "parse", "state_write")
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram.
+
+    Recording is a bisect and a few additions, so it can stay on the hot
+    path; quantiles are estimated as the upper bound of the bucket they
+    fall in (capped at the observed maximum).
+    """
+
+    __slots__ = ("counts", "count", "total", "maximum", "last")
+
+    def __init__(self) -> None:
+        """Initialize the histogram."""
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.last = 0.0
+
+    def observe(self, ms: float) -> None:
+        """Record a duration in milliseconds."""
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.last = ms
+        if ms > self.maximum:
+            self.maximum = ms
+
+    def quantile(self, q: float) -> float | None:
+        """Return the estimated `q` quantile in milliseconds."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                if index < len(LATENCY_BUCKETS_MS):
+                    return min(LATENCY_BUCKETS_MS[index], self.maximum)
+                break
+        return self.maximum
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary with the raw bucket counts."""
+        return {
+            "count": self.count,
+            "last_ms": round(self.last, 3),
+            "mean_ms": round(self.total / self.count, 3) if self.count else None,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "max_ms": round(self.maximum, 3),
+            "buckets": dict(
+                zip(
+                    (*(str(bound) for bound in LATENCY_BUCKETS_MS), "inf"),
+                    self.counts,
+                    strict=True,
+                )
+            ),
+        }
+
+
+class StageLatency:
+    """Latency histograms keyed by pipeline stage."""
+
+    def __init__(self) -> None:
+        """Initialize the stages."""
+        self._stages: dict[str, LatencyHistogram] = {}
+        self.last_response_bytes: int | None = None
+
+    def observe(self, stage: str, ms: float) -> None:
+        """Record a duration in milliseconds for a stage."""
+        if (histogram := self._stages.get(stage)) is None:
+            histogram = self._stages[stage] = LatencyHistogram()
+        histogram.observe(ms)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block as a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, (time.perf_counter() - start) * 1000)
+
+    def as_data(self) -> dict[str, Any]:
+        """Return the p95 of each sensor stage as coordinator data keys."""
+        data: dict[str, Any] = {"response_bytes": self.last_response_bytes}
+        for stage in SENSOR_STAGES:
+            histogram = self._stages.get(stage)
+            data[f"latency_{stage}_ms"] = (
+                histogram.quantile(0.95) if histogram else None
+            )
+        return data
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return every stage's histogram for diagnostics."""
+        return {
+            stage: histogram.as_dict()
+            for stage, histogram in sorted(self._stages.items())
+        }
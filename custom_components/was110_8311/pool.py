@@ -0,0 +1,51 @@
+"""Shared SSH connection pool for 8311 ONU Monitor hubs."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+import asyncssh
+
+
+class SSHConnectionPool:
+    """SSH connections of a hub's ONUs, with a cap on concurrent sessions.
+
+    Each ONU keeps one long-lived connection in the pool; the session cap
+    bounds how many commands (and reconnects) run at the same time across
+    the whole fleet, whatever the polling schedule looks like.
+    """
+
+    def __init__(self, max_sessions: int) -> None:
+        """Initialize the pool."""
+        self._sessions = asyncio.Semaphore(max_sessions)
+        self._connections: dict[str, asyncssh.SSHClientConnection] = {}
+
+    @contextlib.asynccontextmanager
+    async def acquire(
+        self,
+        host: str,
+        connect: Callable[[], Awaitable[asyncssh.SSHClientConnection]],
+    ) -> AsyncIterator[asyncssh.SSHClientConnection]:
+        """Hold a session slot and yield the host's connection, connecting if needed."""
+        async with self._sessions:
+            connection = self._connections.get(host)
+            if connection is None or connection.is_closed:
+                connection = self._connections[host] = await connect()
+            yield connection
+
+    def discard(self, host: str) -> None:
+        """Drop a host's connection so the next session reconnects."""
+        if (connection := self._connections.pop(host, None)) is not None:
+            connection.close()
+
+    async def async_close(self) -> None:
+        """Close every pooled connection."""
+        connections = list(self._connections.values())
+        self._connections.clear()
+        for connection in connections:
+            connection.close()
+        await asyncio.gather(
+            *(connection.wait_closed() for connection in connections),
+            return_exceptions=True,
+        )
@@ -0,0 +1,130 @@
+"""On-demand profiling for 8311 ONU Monitor."""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import time
+import tracemalloc
+from typing import Any, Final
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_PROFILE: Final = "profile"
+ATTR_DURATION: Final = "duration"
+ATTR_TOP_N: Final = "top_n"
+
+DEFAULT_PROFILE_DURATION: Final = 30
+DEFAULT_PROFILE_TOP_N: Final = 25
+
+# Frames kept per allocation trace while tracemalloc is running
+TRACEMALLOC_FRAMES: Final = 5
+
+_PROFILE_LOCK = asyncio.Lock()
+
+
+async def async_capture_profile(
+    hass: HomeAssistant, duration: float, top_n: int
+) -> dict[str, Any]:
+    """Profile the event loop thread and allocations for `duration` seconds.
+
+    Nothing is hooked until this is called, and cProfile and tracemalloc
+    (unless something else already started it) are switched off again
+    afterwards. The full report is written next to the HA configuration;
+    a summary is returned for the service response and diagnostics.
+    """
+    if _PROFILE_LOCK.locked():
+        raise HomeAssistantError("A profile is already being captured")
+
+    async with _PROFILE_LOCK:
+        owns_tracemalloc = not tracemalloc.is_tracing()
+        if owns_tracemalloc:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as err:
+            # Another profiler (e.g. the HA profiler integration) is active
+            if owns_tracemalloc:
+                tracemalloc.stop()
+            raise HomeAssistantError(f"Unable to start profiler: {err}") from err
+
+        try:
+            try:
+                await asyncio.sleep(duration)
+            finally:
+                profiler.disable()
+
+            path = hass.config.path(f"{DOMAIN}_profile_{int(time.time())}.txt")
+            return await hass.async_add_executor_job(
+                _write_report, path, profiler, duration, top_n, owns_tracemalloc
+            )
+        finally:
+            # The report stops it after its snapshot; this covers a cancelled
+            # capture (unload, shutdown, caller timeout) or a failed report
+            if owns_tracemalloc:
+                tracemalloc.stop()
+
+
+def _write_report(
+    path: str,
+    profiler: cProfile.Profile,
+    duration: float,
+    top_n: int,
+    owns_tracemalloc: bool,
+) -> dict[str, Any]:
+    """Snapshot allocations, write the report and return its summary."""
+    try:
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        if owns_tracemalloc:
+            tracemalloc.stop()
+    allocations = snapshot.statistics("lineno")[:top_n]
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream).sort_stats("cumulative")
+    stats.print_stats(top_n)
+
+    functions = [
+        {
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "total_time": round(total_time, 6),
+            "cumulative_time": round(cumulative_time, 6),
+        }
+        for (filename, line, name), (_, calls, total_time, cumulative_time, _) in (
+            sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[
+                :top_n
+            ]
+        )
+    ]
+    top_allocations = [
+        {
+            "location": str(stat.traceback[0]),
+            "size_kib": round(stat.size / 1024, 1),
+            "count": stat.count,
+        }
+        for stat in allocations
+    ]
+
+    with open(path, "w", encoding="utf-8") as report:
+        report.write(f"cProfile ({duration}s, event loop thread)\n\n")
+        report.write(stream.getvalue())
+        report.write(f"\ntracemalloc top {top_n}\n\n")
+        report.writelines(f"{stat}\n" for stat in allocations)
+
+    _LOGGER.info("Profile written to %s", path)
+    return {
+        "file": path,
+        "duration": duration,
+        "functions": functions,
+        "allocations": top_allocations,
+    }
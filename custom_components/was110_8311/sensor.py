@@ -1,6 +1,9 @@
 """Sensor platform for 8311 ONU Monitor."""
 from __future__ import annotations
 
+from datetime import datetime
+from typing import Any
+
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
@@ -10,6 +13,7 @@ from homeassistant.components.sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     PERCENTAGE,
+    UnitOfDataRate,
     UnitOfElectricCurrent,
     UnitOfElectricPotential,
     UnitOfInformation,
@@ -18,13 +22,25 @@ from homeassistant.const import (
     UnitOfTime,
 )
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, MANUFACTURER, MODEL
+from .const import (
+    ATTR_BIAS_LIMIT,
+    ATTR_IOWAIT,
+    ATTR_LOAD_5M,
+    ATTR_LOAD_15M,
+    ATTR_ONUS,
+    ATTR_PACKET_RATE,
+    ATTR_STEP,
+    DOMAIN,
+    MANUFACTURER,
+    MODEL,
+)
 from .coordinator import WAS110Coordinator
+from .hub import WAS110Fleet, WAS110Hub, entry_coordinators
 
 SENSOR_DESCRIPTIONS: tuple[SensorEntityDescription, ...] = (
     SensorEntityDescription(
@@ -106,6 +122,82 @@ SENSOR_DESCRIPTIONS: tuple[SensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:ethernet",
     ),
+    # Traffic from interface counter deltas (RX/TX as seen by the ONU: LAN RX
+    # is upstream traffic from the router), packet rates as attributes
+    SensorEntityDescription(
+        key="lan_rx_throughput",
+        name="LAN RX Throughput",
+        native_unit_of_measurement=UnitOfDataRate.MEGABITS_PER_SECOND,
+        device_class=SensorDeviceClass.DATA_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:download-network",
+    ),
+    SensorEntityDescription(
+        key="lan_tx_throughput",
+        name="LAN TX Throughput",
+        native_unit_of_measurement=UnitOfDataRate.MEGABITS_PER_SECOND,
+        device_class=SensorDeviceClass.DATA_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:upload-network",
+    ),
+    SensorEntityDescription(
+        key="pon_rx_throughput",
+        name="PON RX Throughput",
+        native_unit_of_measurement=UnitOfDataRate.MEGABITS_PER_SECOND,
+        device_class=SensorDeviceClass.DATA_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:download-network",
+    ),
+    SensorEntityDescription(
+        key="pon_tx_throughput",
+        name="PON TX Throughput",
+        native_unit_of_measurement=UnitOfDataRate.MEGABITS_PER_SECOND,
+        device_class=SensorDeviceClass.DATA_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:upload-network",
+    ),
+    SensorEntityDescription(
+        key="lan_rx_utilization",
+        name="LAN RX Utilization",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:gauge",
+    ),
+    SensorEntityDescription(
+        key="lan_tx_utilization",
+        name="LAN TX Utilization",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:gauge",
+    ),
+    SensorEntityDescription(
+        key="lan_errors",
+        name="LAN Errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:alert-circle-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    SensorEntityDescription(
+        key="lan_drops",
+        name="LAN Drops",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:package-variant-remove",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    SensorEntityDescription(
+        key="pon_errors",
+        name="PON Errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:alert-circle-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    SensorEntityDescription(
+        key="pon_drops",
+        name="PON Drops",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:package-variant-remove",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
     SensorEntityDescription(
         key="vendor",
         name="Vendor",
@@ -187,6 +279,69 @@ SENSOR_DESCRIPTIONS: tuple[SensorEntityDescription, ...] = (
         icon="mdi:memory",
         entity_category=EntityCategory.DIAGNOSTIC,
     ),
+    SensorEntityDescription(
+        key="cpu_usage",
+        name="CPU Usage",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:cpu-32-bit",
+    ),
+    SensorEntityDescription(
+        key="load_1m",
+        name="Load Average",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:gauge",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    # The monitor's own cost on the ONU: CPU time of our shell (with every
+    # command it ran) and SSH session since the last poll, its share of the
+    # ONU's total CPU capacity, and the poll's wall time on the ONU
+    SensorEntityDescription(
+        key="monitor_cpu_time",
+        name="Monitor CPU Time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:cpu-32-bit",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    SensorEntityDescription(
+        key="monitor_cpu_share",
+        name="Monitor CPU Share",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:chart-pie",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    SensorEntityDescription(
+        key="monitor_wall_time",
+        name="Monitor Wall Time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:timer-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    # The ONU's wall clock against Home Assistant's (positive when ahead),
+    # and the network round trip of the last poll without remote execution
+    SensorEntityDescription(
+        key="clock_offset",
+        name="Clock Offset",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:clock-alert-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    SensorEntityDescription(
+        key="clock_rtt",
+        name="Round-Trip Time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:timer-sync-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
     # PON state details
     SensorEntityDescription(
         key="pon_state_name",
@@ -209,6 +364,29 @@ SENSOR_DESCRIPTIONS: tuple[SensorEntityDescription, ...] = (
         icon="mdi:timer",
         entity_category=EntityCategory.DIAGNOSTIC,
     ),
+    # PON transition history derived from time in state
+    SensorEntityDescription(
+        key="pon_flaps_last_hour",
+        name="PON Flaps (Last Hour)",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:swap-vertical",
+    ),
+    SensorEntityDescription(
+        key="pon_link_failures",
+        name="PON Link Failures",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:lan-disconnect",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    SensorEntityDescription(
+        key="pon_mtbf",
+        name="PON Mean Time Between Failures",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:timer-sand",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
     # GTC error counters (diagnostic)
     SensorEntityDescription(
         key="gtc_bip_errors",
@@ -238,8 +416,227 @@ SENSOR_DESCRIPTIONS: tuple[SensorEntityDescription, ...] = (
         icon="mdi:signal-off",
         entity_category=EntityCategory.DIAGNOSTIC,
     ),
+    # Change-point detection on optical power (CUSUM as a fraction of the
+    # detection threshold; 1 means a step or drift is reported)
+    SensorEntityDescription(
+        key="rx_power_anomaly_score",
+        name="RX Power Anomaly Score",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:chart-bell-curve",
+    ),
+    SensorEntityDescription(
+        key="rx_power_last_change",
+        name="RX Power Last Change",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        icon="mdi:chart-timeline-variant-shimmer",
+    ),
+    SensorEntityDescription(
+        key="tx_power_anomaly_score",
+        name="TX Power Anomaly Score",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:chart-bell-curve",
+    ),
+    SensorEntityDescription(
+        key="tx_power_last_change",
+        name="TX Power Last Change",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        icon="mdi:chart-timeline-variant-shimmer",
+    ),
+    # Laser aging: TX bias at the reference temperature, yearly trends and
+    # the projected days until the bias reaches the module's warning level
+    SensorEntityDescription(
+        key="tx_bias_normalized",
+        name="TX Bias Normalized",
+        native_unit_of_measurement=UnitOfElectricCurrent.MILLIAMPERE,
+        device_class=SensorDeviceClass.CURRENT,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:current-dc",
+    ),
+    SensorEntityDescription(
+        key="tx_bias_trend",
+        name="TX Bias Trend",
+        native_unit_of_measurement="mA/yr",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:trending-up",
+    ),
+    SensorEntityDescription(
+        key="tx_power_trend",
+        name="TX Power Trend",
+        native_unit_of_measurement="dB/yr",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:trending-down",
+    ),
+    SensorEntityDescription(
+        key="laser_days_to_threshold",
+        name="Laser Days to Threshold",
+        native_unit_of_measurement=UnitOfTime.DAYS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:calendar-clock",
+    ),
+    # SFF-8472 alarm and warning flags (bytes 112-113 and 116-117 layout)
+    SensorEntityDescription(
+        key="alarm_flags",
+        name="Alarm Flags",
+        icon="mdi:alert-octagon-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    SensorEntityDescription(
+        key="warning_flags",
+        name="Warning Flags",
+        icon="mdi:alert-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    # Per-stage latency (p95 of the stage histogram)
+    SensorEntityDescription(
+        key="latency_poll_ms",
+        name="Poll Latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:timer-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="latency_ssh_connect_ms",
+        name="SSH Connect Latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:lan-connect",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="latency_remote_exec_ms",
+        name="Remote Execution Latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:console",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="latency_parse_ms",
+        name="Parse Latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:code-braces",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="latency_state_write_ms",
+        name="State Write Latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:database-clock",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="response_bytes",
+        name="Response Size",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:download-network-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
 )
 
+# Hub-wide aggregates on a synthetic fleet device; spread statistics are
+# attributes of the median sensors, counts per category of the count sensors
+FLEET_SENSOR_DESCRIPTIONS: tuple[SensorEntityDescription, ...] = (
+    SensorEntityDescription(
+        key="fleet_rx_power_dbm_median",
+        name="RX Power Median",
+        native_unit_of_measurement="dBm",
+        device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:access-point",
+    ),
+    SensorEntityDescription(
+        key="fleet_rx_power_dbm_p10",
+        name="RX Power P10",
+        native_unit_of_measurement="dBm",
+        device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:access-point-minus",
+    ),
+    SensorEntityDescription(
+        key="fleet_tx_power_dbm_median",
+        name="TX Power Median",
+        native_unit_of_measurement="dBm",
+        device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:access-point",
+    ),
+    SensorEntityDescription(
+        key="fleet_optic_temperature_median",
+        name="Optic Temperature Median",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:thermometer-laser",
+    ),
+    SensorEntityDescription(
+        key="fleet_tx_bias_current_median",
+        name="TX Bias Current Median",
+        native_unit_of_measurement=UnitOfElectricCurrent.MILLIAMPERE,
+        device_class=SensorDeviceClass.CURRENT,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:current-dc",
+    ),
+    SensorEntityDescription(
+        key="fleet_onus_reporting",
+        name="ONUs Reporting",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:router-network",
+    ),
+    SensorEntityDescription(
+        key="fleet_onus_linked",
+        name="ONUs Linked",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:fiber-optic",
+    ),
+    SensorEntityDescription(
+        key="fleet_outliers",
+        name="Outlier ONUs",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:chart-scatter-plot",
+    ),
+    SensorEntityDescription(
+        key="fleet_isps",
+        name="ISPs",
+        icon="mdi:web",
+    ),
+)
+
+
+# Data keys published as attributes, as sensor key -> {attribute: data key}
+SENSOR_ATTRIBUTES: dict[str, dict[str, str]] = {
+    "laser_days_to_threshold": {ATTR_BIAS_LIMIT: "laser_bias_limit"},
+    "cpu_usage": {ATTR_IOWAIT: "cpu_iowait"},
+    "load_1m": {ATTR_LOAD_5M: "load_5m", ATTR_LOAD_15M: "load_15m"},
+    **{
+        f"{name}_last_change": {ATTR_STEP: f"{name}_change_step"}
+        for name in ("rx_power", "tx_power")
+    },
+    **{
+        f"{name}_{direction}_throughput": {
+            ATTR_PACKET_RATE: f"{name}_{direction}_packet_rate"
+        }
+        for name in ("lan", "pon")
+        for direction in ("rx", "tx")
+    },
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,  # noqa: ARG001
@@ -247,12 +644,16 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up 8311 ONU sensors based on a config entry."""
-    coordinator: WAS110Coordinator = entry.runtime_data
-
     async_add_entities(
         WAS110Sensor(coordinator, description)
+        for coordinator in entry_coordinators(entry)
         for description in SENSOR_DESCRIPTIONS
     )
+    if isinstance(entry.runtime_data, WAS110Hub):
+        async_add_entities(
+            WAS110FleetSensor(entry.runtime_data.fleet, description)
+            for description in FLEET_SENSOR_DESCRIPTIONS
+        )
 
 
 class WAS110Sensor(CoordinatorEntity[WAS110Coordinator], SensorEntity):
@@ -266,7 +667,7 @@ class WAS110Sensor(CoordinatorEntity[WAS110Coordinator], SensorEntity):
         description: SensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=description.key)
         self.entity_description = description
         self._attr_unique_id = f"{coordinator.host}_{description.key}"
 
@@ -286,8 +687,70 @@ class WAS110Sensor(CoordinatorEntity[WAS110Coordinator], SensorEntity):
         )
 
     @property
-    def native_value(self) -> float | str | None:
+    def native_value(self) -> float | str | datetime | None:
         """Return the state of the sensor."""
         if self.coordinator.data is None:
             return None
         return self.coordinator.data.get(self.entity_description.key)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, float | None] | None:
+        """Return the readings that qualify the state (see SENSOR_ATTRIBUTES)."""
+        attributes = SENSOR_ATTRIBUTES.get(self.entity_description.key)
+        if self.coordinator.data is None or attributes is None:
+            return None
+        return {
+            attribute: self.coordinator.data.get(key)
+            for attribute, key in attributes.items()
+        }
+
+
+class WAS110FleetSensor(CoordinatorEntity[WAS110Fleet], SensorEntity):
+    """Representation of an aggregate over the ONUs of a hub."""
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: WAS110Fleet,
+        description: SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{coordinator.entry_id}_fleet")},
+            name="8311 ONU Fleet",
+            manufacturer=MANUFACTURER,
+            model="Fleet",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the state of the sensor (the size of a breakdown)."""
+        if self.coordinator.data is None:
+            return None
+        value = self.coordinator.data.get(self.entity_description.key)
+        return len(value) if isinstance(value, dict) else value
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the fleet spread or the breakdown behind a count."""
+        key = self.entity_description.key
+        data = self.coordinator.data
+        if data is None:
+            return None
+        if key.endswith(("_median", "_p10")):
+            metric = key.rsplit("_", 1)[0]
+            return {
+                statistic: data.get(f"{metric}_{statistic}")
+                for statistic in ("p10", "p90", "min", "max", "reporting")
+            }
+        if key == "fleet_onus_reporting":
+            return {ATTR_ONUS: data.get("fleet_onus")}
+        if key == "fleet_onus_linked":
+            return data.get("fleet_pon_states")
+        value = data.get(key)
+        return value if isinstance(value, dict) else None
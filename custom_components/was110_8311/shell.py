@@ -0,0 +1,74 @@
+"""Persistent remote shell for 8311 ONU Monitor."""
+from __future__ import annotations
+
+import asyncio
+import secrets
+from typing import Final
+
+import asyncssh
+
+from .commands import HELPER_LIBRARY
+
+# Run once when the shell starts instead of on every poll; a missing
+# library must not abort the shell (`.` failing is fatal in sh)
+SHELL_INIT: Final = f"[ -r {HELPER_LIBRARY} ] && . {HELPER_LIBRARY}"
+
+
+class RemoteShell:
+    """Long-lived `sh` on the ONU that poll requests are written into.
+
+    `connection.run()` opens a channel and spawns a shell per poll; this
+    keeps one open instead. Each request runs in a brace group (no fork)
+    with stderr discarded, since nothing reads it and unread stderr would
+    eventually stall the channel. It is followed by a frame marker with a
+    per-shell nonce and sequence number, and the response is everything
+    read up to that marker.
+    """
+
+    def __init__(self, connection: asyncssh.SSHClientConnection) -> None:
+        """Initialize the shell."""
+        self.connection = connection
+        self._process: asyncssh.SSHClientProcess[str] | None = None
+        self._lock = asyncio.Lock()
+        self._nonce = secrets.token_hex(4)
+        self._sequence = 0
+
+    @property
+    def closed(self) -> bool:
+        """Return True once the shell has exited or was closed."""
+        return self._process is None or self._process.exit_status is not None
+
+    async def async_start(self) -> None:
+        """Start the shell and source the helper library."""
+        self._process = await self.connection.create_process("sh")
+        await self.async_run(SHELL_INIT)
+
+    async def async_run(self, command: str) -> str:
+        """Run `command` in the shell and return its output.
+
+        Raises EOFError if the shell exits before the response is complete;
+        a cancelled or failed request leaves the stream mid-frame, so the
+        caller must close the shell then.
+        """
+        if self._process is None:
+            raise EOFError("Shell is not running")
+
+        async with self._lock:
+            # A request that held the lock may have failed and closed the shell
+            if self._process is None:
+                raise EOFError("Shell is not running")
+            self._sequence += 1
+            marker = f"---FRAME {self._nonce} {self._sequence}---"
+            # The bare echo ends unterminated output so the marker starts a line
+            self._process.stdin.write(
+                f"{{ {command}\n}} 2>/dev/null; echo; echo '{marker}'\n"
+            )
+            separator = f"\n{marker}\n"
+            response = await self._process.stdout.readuntil(separator)
+            return response[: -len(separator)]
+
+    def close(self) -> None:
+        """Close the shell; the connection itself stays open."""
+        if self._process is not None:
+            self._process.close()
+            self._process = None
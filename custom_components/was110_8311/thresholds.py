@@ -0,0 +1,205 @@
+"""SFF-8472 alarm and warning thresholds for 8311 ONU Monitor.
+
+The EEPROM51 (A2h) page carries the module's own limits for every
+diagnostic quantity, plus calibration constants for externally calibrated
+modules. Both are read once per module and every sample is then checked
+against them locally.
+"""
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from typing import Any, Final
+
+# EEPROM50 (A0h) Diagnostic Monitoring Type byte
+DIAGNOSTIC_MONITORING_TYPE: Final = 92
+EXTERNALLY_CALIBRATED: Final = 0x10
+
+# EEPROM51 bytes needed: thresholds (0-39) through external calibration (56-91)
+THRESHOLDS_LENGTH: Final = 92
+
+# Rx_PWR(4) .. Rx_PWR(0) as big-endian IEEE 754 floats
+RX_POWER_CALIBRATION_OFFSET: Final = 56
+
+LEVEL_OK: Final = "ok"
+LEVEL_WARNING: Final = "warning"
+LEVEL_ALARM: Final = "alarm"
+
+
+@dataclass(frozen=True, slots=True)
+class Measurement:
+    """A diagnostic quantity with module-defined limits."""
+
+    name: str
+    # Coordinator data key of the live value
+    key: str
+    # Start of the high alarm/low alarm/high warning/low warning block
+    threshold_offset: int
+    # Engineering units per LSB
+    scale: float
+    signed: bool = False
+    # Start of the slope/offset pair (unused for RX power)
+    calibration_offset: int | None = None
+    # High flag bit in the byte 112-113 (alarm) and 116-117 (warning) word;
+    # the low flag is the next bit down
+    flag_bit: int = 0
+
+
+MEASUREMENTS: Final[tuple[Measurement, ...]] = (
+    Measurement("temperature", "optic_temperature", 0, 1 / 256, True, 84, 15),
+    Measurement("voltage", "voltage", 8, 1e-4, False, 88, 13),
+    Measurement("tx_bias", "tx_bias_current", 16, 0.002, False, 76, 11),
+    Measurement("tx_power", "tx_power_mw", 24, 1e-4, False, 80, 9),
+    Measurement("rx_power", "rx_power_mw", 32, 1e-4, False, None, 7),
+)
+
+# Coordinator data keys derived from the thresholds
+ALARM_KEYS: Final = frozenset(
+    {
+        "alarm_flags",
+        "warning_flags",
+        *(f"{measurement.name}_problem" for measurement in MEASUREMENTS),
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Calibration:
+    """External calibration constants (SFF-8472 section 9.3)."""
+
+    # Rx_PWR(0) .. Rx_PWR(4), lowest order first
+    rx_power: tuple[float, ...]
+    # Measurement name -> (slope, offset)
+    linear: dict[str, tuple[float, int]]
+
+    def apply(self, name: str, raw: int) -> float:
+        """Return a calibrated raw A/D value, still in the quantity's LSBs."""
+        if name == "rx_power":
+            return sum(
+                coefficient * raw**power
+                for power, coefficient in enumerate(self.rx_power)
+            )
+        slope, offset = self.linear[name]
+        return slope * raw + offset
+
+
+@dataclass(frozen=True, slots=True)
+class Thresholds:
+    """Module limits in engineering units, keyed by measurement name."""
+
+    # (high alarm, low alarm, high warning, low warning)
+    limits: dict[str, tuple[float, float, float, float]]
+    externally_calibrated: bool
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the limits for diagnostics and entity attributes."""
+        return {
+            name: dict(
+                zip(
+                    ("high_alarm", "low_alarm", "high_warning", "low_warning"),
+                    limits,
+                    strict=True,
+                )
+            )
+            for name, limits in self.limits.items()
+        }
+
+
+def is_externally_calibrated(eeprom50: bytes) -> bool:
+    """Return whether the A0h page declares external calibration."""
+    return (
+        len(eeprom50) > DIAGNOSTIC_MONITORING_TYPE
+        and bool(eeprom50[DIAGNOSTIC_MONITORING_TYPE] & EXTERNALLY_CALIBRATED)
+    )
+
+
+def parse_calibration(raw_bytes: bytes) -> Calibration | None:
+    """Parse the external calibration constants from an A2h page."""
+    if len(raw_bytes) < THRESHOLDS_LENGTH:
+        return None
+
+    rx_power = struct.unpack_from(">5f", raw_bytes, RX_POWER_CALIBRATION_OFFSET)
+    linear: dict[str, tuple[float, int]] = {}
+    for measurement in MEASUREMENTS:
+        if measurement.calibration_offset is None:
+            continue
+        # Unsigned 8.8 fixed-point slope, signed 16-bit offset
+        slope, offset = struct.unpack_from(
+            ">Hh", raw_bytes, measurement.calibration_offset
+        )
+        linear[measurement.name] = (slope / 256, offset)
+
+    return Calibration(rx_power=tuple(reversed(rx_power)), linear=linear)
+
+
+def parse_thresholds(
+    raw_bytes: bytes, calibration: Calibration | None = None
+) -> Thresholds | None:
+    """Parse the alarm and warning thresholds from an A2h page.
+
+    With external calibration the thresholds are raw A/D values too, so
+    they are calibrated the same way as the live readings.
+    """
+    if len(raw_bytes) < THRESHOLDS_LENGTH:
+        return None
+
+    limits: dict[str, tuple[float, float, float, float]] = {}
+    for measurement in MEASUREMENTS:
+        words = struct.unpack_from(
+            ">4h" if measurement.signed else ">4H",
+            raw_bytes,
+            measurement.threshold_offset,
+        )
+        if calibration is not None:
+            words = tuple(calibration.apply(measurement.name, word) for word in words)
+        limits[measurement.name] = tuple(
+            round(word * measurement.scale, 4) for word in words
+        )
+
+    return Thresholds(limits=limits, externally_calibrated=calibration is not None)
+
+
+def evaluate(thresholds: Thresholds, data: dict[str, Any]) -> dict[str, Any]:
+    """Check live values against the module's limits.
+
+    Returns a `<name>_problem` flag (set from the warning level up) and a
+    `<name>_level` for every measurement present in `data`, plus the
+    `alarm_flags`/`warning_flags` words in the SFF-8472 byte 112-113 and
+    116-117 layout; nothing if no measurement was present.
+    """
+    result: dict[str, Any] = {}
+    alarm_flags = 0
+    warning_flags = 0
+
+    for measurement in MEASUREMENTS:
+        value = data.get(measurement.key)
+        limits = thresholds.limits.get(measurement.name)
+        if value is None or limits is None:
+            continue
+
+        high_alarm, low_alarm, high_warning, low_warning = limits
+        high_bit = 1 << measurement.flag_bit
+        low_bit = high_bit >> 1
+        level = LEVEL_OK
+
+        if value > high_warning:
+            warning_flags |= high_bit
+            level = LEVEL_WARNING
+        elif value < low_warning:
+            warning_flags |= low_bit
+            level = LEVEL_WARNING
+
+        if value > high_alarm:
+            alarm_flags |= high_bit
+            level = LEVEL_ALARM
+        elif value < low_alarm:
+            alarm_flags |= low_bit
+            level = LEVEL_ALARM
+
+        result[f"{measurement.name}_problem"] = level != LEVEL_OK
+        result[f"{measurement.name}_level"] = level
+
+    if result:
+        result["alarm_flags"] = alarm_flags
+        result["warning_flags"] = warning_flags
+    return result
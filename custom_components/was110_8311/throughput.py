@@ -0,0 +1,156 @@
+"""Interface throughput from kernel counters for 8311 ONU Monitor."""
+from __future__ import annotations
+
+from typing import Any, Final
+
+# Netdevs whose counters are read, as name -> interface
+INTERFACES: Final = {"lan": "eth0_0", "pon": "pon0"}
+
+# The ONU's uptime comes first, so rates use the ONU's own clock and SSH
+# latency or poll jitter can't skew them
+NET_DEV_COMMAND: Final = (
+    "cut -d' ' -f1 /proc/uptime; "
+    f"grep -E '^ *({'|'.join(INTERFACES.values())}):' /proc/net/dev 2>/dev/null"
+)
+
+# /proc/net/dev columns (after the interface name) that are kept
+COUNTER_FIELDS: Final = {
+    "rx_bytes": 0,
+    "rx_packets": 1,
+    "rx_errors": 2,
+    "rx_dropped": 3,
+    "tx_bytes": 8,
+    "tx_packets": 9,
+    "tx_errors": 10,
+    "tx_dropped": 11,
+}
+
+# Drivers with 32-bit counters wrap here even though the kernel prints 64 bits
+COUNTER_WRAP: Final = 2**32
+# Upper bound for the PON side (XGS-PON line rate) and for a LAN of unknown speed
+MAX_LINE_RATE_MBPS: Final = 10000
+# A rate this far above the line rate is a counter reset, not traffic
+LINE_RATE_MARGIN: Final = 1.05
+
+# Coordinator data keys derived from the counters
+THROUGHPUT_KEYS: Final = frozenset(
+    {
+        *(
+            f"{name}_{suffix}"
+            for name in INTERFACES
+            for suffix in (
+                "rx_throughput",
+                "tx_throughput",
+                "rx_packet_rate",
+                "tx_packet_rate",
+                "errors",
+                "drops",
+            )
+        ),
+        "lan_rx_utilization",
+        "lan_tx_utilization",
+    }
+)
+
+_NAMES: Final = {interface: name for name, interface in INTERFACES.items()}
+
+
+def parse_net_dev(output: str) -> dict[str, Any]:
+    """Parse the ONU uptime and the counters of every known interface."""
+    data: dict[str, Any] = {}
+    lines = output.strip().splitlines()
+    if not lines:
+        return data
+
+    try:
+        data["counters_uptime"] = float(lines[0])
+    except ValueError:
+        return data
+
+    for line in lines[1:]:
+        # Large counters can follow the colon without a space
+        interface, _, fields = line.partition(":")
+        values = fields.split()
+        if (name := _NAMES.get(interface.strip())) is None or len(values) < 16:
+            continue
+        try:
+            for field, column in COUNTER_FIELDS.items():
+                data[f"{name}_{field}"] = int(values[column])
+        except ValueError:
+            continue
+        data[f"{name}_errors"] = data[f"{name}_rx_errors"] + data[f"{name}_tx_errors"]
+        data[f"{name}_drops"] = data[f"{name}_rx_dropped"] + data[f"{name}_tx_dropped"]
+
+    return data
+
+
+def counter_delta(previous: int, current: int) -> int | None:
+    """Return the increase of a counter, or None if it was reset."""
+    if current >= previous:
+        return current - previous
+    if previous < COUNTER_WRAP:
+        return current + COUNTER_WRAP - previous
+    return None
+
+
+class ThroughputMeter:
+    """Traffic rates between successive counter reads of one ONU.
+
+    Only the previous read is kept. A reboot (the ONU's uptime going
+    backwards) or a counter reset skips one interval instead of reporting
+    a bogus rate.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the meter."""
+        self._previous: dict[str, Any] = {}
+
+    def update(
+        self, counters: dict[str, Any], link_speed: int | None
+    ) -> dict[str, Any]:
+        """Add a counter read; return the rates since the previous one.
+
+        `link_speed` is the negotiated LAN speed in Mbit/s, the reference
+        for the LAN utilization.
+        """
+        previous, self._previous = self._previous, counters
+        uptime = counters.get("counters_uptime")
+        previous_uptime = previous.get("counters_uptime")
+        if uptime is None or previous_uptime is None or uptime <= previous_uptime:
+            return {}
+
+        elapsed = uptime - previous_uptime
+        if not link_speed or link_speed <= 0:
+            link_speed = None
+        data: dict[str, Any] = {}
+        for name in INTERFACES:
+            line_rate = (link_speed if name == "lan" else None) or MAX_LINE_RATE_MBPS
+            rates: dict[str, Any] = {}
+            for direction in ("rx", "tx"):
+                prefix = f"{name}_{direction}"
+                try:
+                    octets = counter_delta(
+                        previous[f"{prefix}_bytes"], counters[f"{prefix}_bytes"]
+                    )
+                    packets = counter_delta(
+                        previous[f"{prefix}_packets"], counters[f"{prefix}_packets"]
+                    )
+                except KeyError:
+                    # Interface missing from one of the reads
+                    break
+                if octets is None or packets is None:
+                    break
+                mbps = octets * 8 / elapsed / 1e6
+                if mbps > line_rate * LINE_RATE_MARGIN:
+                    break
+                rates[f"{prefix}_throughput"] = round(mbps, 3)
+                rates[f"{prefix}_packet_rate"] = round(packets / elapsed, 1)
+            else:
+                data.update(rates)
+
+        if link_speed and "lan_rx_throughput" in data:
+            for direction in ("rx", "tx"):
+                data[f"lan_{direction}_utilization"] = round(
+                    data[f"lan_{direction}_throughput"] / link_speed * 100, 2
+                )
+        return data
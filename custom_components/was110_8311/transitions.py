@@ -0,0 +1,120 @@
+"""PON state transition tracking for 8311 ONU Monitor."""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from .const import PON_OPERATIONAL_STATES, PON_STATES
+
+# Transitions kept for flap counting and diagnostics
+TRANSITION_HISTORY_SIZE = 64
+
+# Allowed slack between wall time and time_curr before a poll is treated
+# as having missed a transition (pon psg reports whole seconds)
+TRANSITION_TOLERANCE_SECONDS = 2.0
+
+FLAP_WINDOW_SECONDS = 3600
+
+
+@dataclass(slots=True)
+class PonTransition:
+    """A single observed or inferred PON state transition."""
+
+    timestamp: float
+    from_state: int | None
+    to_state: int
+    hidden: bool
+    link_failure: bool
+
+
+class PonTransitionTracker:
+    """Infer PON state transitions from consecutive `pon psg` samples.
+
+    `time_curr` only ever grows while the ONU stays in one state, so if it is
+    smaller than the wall time elapsed since the previous poll the state was
+    (re)entered in between, even when the current state matches the last one.
+    """
+
+    def __init__(self, maxlen: int = TRANSITION_HISTORY_SIZE) -> None:
+        """Initialize the tracker."""
+        self._transitions: deque[PonTransition] = deque(maxlen=maxlen)
+        self._last_state: int | None = None
+        self._last_sample: float | None = None
+        self._first_sample: float | None = None
+        self._link_failures = 0
+
+    def update(
+        self,
+        state_code: int,
+        time_in_state: int | None,
+        previous_code: int | None,
+        now: float,
+    ) -> None:
+        """Record a PON status sample taken at monotonic time `now`."""
+        if self._first_sample is None:
+            self._first_sample = now
+
+        if self._last_sample is not None and self._last_state is not None:
+            elapsed = now - self._last_sample
+            changed = state_code != self._last_state
+            reentered = (
+                time_in_state is not None
+                and time_in_state + TRANSITION_TOLERANCE_SECONDS < elapsed
+            )
+
+            if changed or reentered:
+                entered_at = now - time_in_state if reentered else now
+                was_up = self._last_state in PON_OPERATIONAL_STATES
+                is_up = state_code in PON_OPERATIONAL_STATES
+                hidden = not changed
+                # A hidden re-entry of an operational state means the link
+                # dropped and recovered between polls
+                link_failure = was_up and (not is_up or hidden)
+
+                self._transitions.append(
+                    PonTransition(
+                        timestamp=entered_at,
+                        from_state=self._last_state if changed else previous_code,
+                        to_state=state_code,
+                        hidden=hidden,
+                        link_failure=link_failure,
+                    )
+                )
+                if link_failure:
+                    self._link_failures += 1
+
+        self._last_state = state_code
+        self._last_sample = now
+
+    def flaps(self, now: float, window: float = FLAP_WINDOW_SECONDS) -> int:
+        """Return the number of link failures within `window` seconds."""
+        return sum(
+            1
+            for transition in self._transitions
+            if transition.link_failure and now - transition.timestamp <= window
+        )
+
+    def mtbf(self, now: float) -> float | None:
+        """Return mean time between link failures over the observed period."""
+        if not self._link_failures or self._first_sample is None:
+            return None
+        return round((now - self._first_sample) / self._link_failures, 1)
+
+    def as_data(self, now: float) -> dict[str, Any]:
+        """Return the coordinator data keys derived from the transition history."""
+        return {
+            "pon_flaps_last_hour": self.flaps(now),
+            "pon_link_failures": self._link_failures,
+            "pon_mtbf": self.mtbf(now),
+        }
+
+    def history(self, now: float) -> list[dict[str, Any]]:
+        """Return the transition ring for diagnostics, newest first."""
+        history = []
+        for transition in reversed(self._transitions):
+            entry = asdict(transition)
+            entry["seconds_ago"] = round(now - entry.pop("timestamp"), 1)
+            entry["to_state_name"] = PON_STATES.get(transition.to_state)
+            history.append(entry)
+        return history
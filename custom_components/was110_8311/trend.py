@@ -0,0 +1,190 @@
+"""Laser aging trends for 8311 ONU Monitor."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Final
+
+DAY: Final = 86400
+DAYS_PER_YEAR: Final = 365.25
+
+# Samples lose half their weight in the fit after this many days
+TREND_HALF_LIFE_DAYS: Final = 30
+# Time a module must be observed before a trend is reported
+TREND_MIN_SPAN_DAYS: Final = 3
+# Temperature spread (degC^2 variance) below which the temperature term is
+# dropped instead of fitted
+MIN_TEMPERATURE_VARIANCE: Final = 0.25
+# Normalized bias is reported at this optic temperature
+REFERENCE_TEMPERATURE: Final = 40.0
+# TX bias warning level from the KPI reference, for modules without limits
+DEFAULT_BIAS_LIMIT_MA: Final = 20.0
+# Projections further out than this are reported as none in sight
+MAX_PROJECTION_DAYS: Final = 3650
+
+# Coordinator data keys derived from the trends
+TREND_KEYS: Final = frozenset(
+    {
+        "tx_bias_normalized",
+        "tx_bias_trend",
+        "tx_power_trend",
+        "laser_days_to_threshold",
+        "laser_bias_limit",
+    }
+)
+
+# Running sum slots: weight, T, t, y, T*T, t*t, T*t, T*y, t*y
+_W, _T, _X, _Y, _TT, _XX, _TX, _TY, _XY = range(9)
+
+
+@dataclass(frozen=True, slots=True)
+class TrendFit:
+    """Least-squares fit of a reading on optic temperature and time."""
+
+    intercept: float
+    # Per degC and per day
+    temperature_slope: float
+    time_slope: float
+
+    def predict(self, temperature: float, day: float) -> float:
+        """Return the fitted value at a temperature and day."""
+        return (
+            self.intercept
+            + self.temperature_slope * temperature
+            + self.time_slope * day
+        )
+
+
+class TrendRegression:
+    """Exponentially weighted least squares of a reading on temperature and time.
+
+    Only nine running sums are kept, so each sample is O(1) in time and
+    memory however long the module is watched. Older samples fade with a
+    half-life in days (not samples), so high-rate sampling doesn't shorten
+    the window.
+    """
+
+    __slots__ = ("origin", "first", "last", "sums")
+
+    def __init__(self) -> None:
+        """Initialize an empty regression."""
+        self.origin: float | None = None
+        self.first: float | None = None
+        self.last: float | None = None
+        self.sums = [0.0] * 9
+
+    def add(self, timestamp: float, temperature: float, value: float) -> None:
+        """Add a sample taken at a unix timestamp."""
+        if self.origin is None:
+            self.origin = self.first = self.last = timestamp
+        elif timestamp > self.last:
+            decay = 0.5 ** ((timestamp - self.last) / (TREND_HALF_LIFE_DAYS * DAY))
+            self.sums = [total * decay for total in self.sums]
+            self.last = timestamp
+
+        day = (timestamp - self.origin) / DAY
+        sums = self.sums
+        sums[_W] += 1
+        sums[_T] += temperature
+        sums[_X] += day
+        sums[_Y] += value
+        sums[_TT] += temperature * temperature
+        sums[_XX] += day * day
+        sums[_TX] += temperature * day
+        sums[_TY] += temperature * value
+        sums[_XY] += day * value
+
+    def day(self, timestamp: float) -> float:
+        """Return a timestamp as days since the first sample."""
+        if self.origin is None:
+            return 0.0
+        return (timestamp - self.origin) / DAY
+
+    def fit(self) -> TrendFit | None:
+        """Solve the weighted normal equations, once enough time is covered."""
+        weight = self.sums[_W]
+        if (
+            weight <= 0
+            or self.first is None
+            or self.last - self.first < TREND_MIN_SPAN_DAYS * DAY
+        ):
+            return None
+
+        mean = [total / weight for total in self.sums]
+        var_t = mean[_TT] - mean[_T] ** 2
+        var_x = mean[_XX] - mean[_X] ** 2
+        cov_tx = mean[_TX] - mean[_T] * mean[_X]
+        cov_ty = mean[_TY] - mean[_T] * mean[_Y]
+        cov_xy = mean[_XY] - mean[_X] * mean[_Y]
+        if var_x <= 0:
+            return None
+
+        determinant = var_t * var_x - cov_tx * cov_tx
+        if var_t >= MIN_TEMPERATURE_VARIANCE and determinant > 1e-6 * var_t * var_x:
+            temperature_slope = (cov_ty * var_x - cov_xy * cov_tx) / determinant
+            time_slope = (cov_xy * var_t - cov_ty * cov_tx) / determinant
+        else:
+            # Temperature barely moved (or moved in lockstep with time)
+            temperature_slope = 0.0
+            time_slope = cov_xy / var_x
+
+        return TrendFit(
+            intercept=mean[_Y] - temperature_slope * mean[_T] - time_slope * mean[_X],
+            temperature_slope=temperature_slope,
+            time_slope=time_slope,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state to persist."""
+        return {
+            "origin": self.origin,
+            "first": self.first,
+            "last": self.last,
+            "sums": self.sums,
+        }
+
+    @classmethod
+    def from_dict(cls, stored: dict[str, Any]) -> TrendRegression:
+        """Restore a persisted regression."""
+        regression = cls()
+        regression.origin = stored.get("origin")
+        regression.first = stored.get("first")
+        regression.last = stored.get("last")
+        sums = stored.get("sums")
+        if regression.origin is not None and isinstance(sums, list) and len(sums) == 9:
+            regression.sums = [float(total) for total in sums]
+        else:
+            regression.origin = regression.first = regression.last = None
+        return regression
+
+
+def aging_data(
+    bias: TrendRegression,
+    power: TrendRegression,
+    now: float,
+    bias_limit: float,
+) -> dict[str, Any]:
+    """Return the temperature-normalized bias and laser aging projections.
+
+    The days to threshold project the normalized bias along its trend to
+    `bias_limit`; none is reported for a flat or falling bias.
+    """
+    data: dict[str, Any] = {}
+
+    if (bias_fit := bias.fit()) is not None:
+        normalized = bias_fit.predict(REFERENCE_TEMPERATURE, bias.day(now))
+        data["tx_bias_normalized"] = round(normalized, 2)
+        data["tx_bias_trend"] = round(bias_fit.time_slope * DAYS_PER_YEAR, 3)
+        data["laser_bias_limit"] = bias_limit
+        days = None
+        if normalized >= bias_limit:
+            days = 0
+        elif bias_fit.time_slope > 0:
+            days = (bias_limit - normalized) / bias_fit.time_slope
+        data["laser_days_to_threshold"] = (
+            round(days) if days is not None and days <= MAX_PROJECTION_DAYS else None
+        )
+
+    if (power_fit := power.fit()) is not None:
+        data["tx_power_trend"] = round(power_fit.time_slope * DAYS_PER_YEAR, 3)
+
+    return data
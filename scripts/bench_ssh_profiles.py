@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Benchmark SSH transport profiles (connect and exec latency).
+
+Runs each profile in SSH_PROFILES (custom_components/was110_8311/const.py)
+against an SSH server and reports connect and exec latency percentiles:
+
+- asyncssh, as used by the HACS integration: connect and `run()` timed apart
+- optionally the OpenSSH client with the same algorithm lists, as used by the
+  Docker bridge (`SSH_PROFILE`): one process per command, handshake included
+
+Without --host a local asyncssh server (Ed25519, ECDSA and RSA host keys,
+no authentication) stands in for the ONU. Pass --host to measure a real
+ONU or a local Dropbear instead; latency on a desktop CPU only shows the
+relative cost of each profile, the ONU is what the profile is tuned for.
+
+    python scripts/bench_ssh_profiles.py --iterations 50 --openssh
+    python scripts/bench_ssh_profiles.py --host 192.168.11.1 --password ...
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import shutil
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+import asyncssh
+
+CONST_PATH = (
+    Path(__file__).resolve().parent.parent
+    / "custom_components"
+    / "was110_8311"
+    / "const.py"
+)
+
+# OpenSSH options carrying each asyncssh algorithm list
+OPENSSH_OPTIONS = {
+    "kex_algs": "KexAlgorithms",
+    "server_host_key_algs": "HostKeyAlgorithms",
+    "encryption_algs": "Ciphers",
+    "mac_algs": "MACs",
+}
+
+
+def load_profiles() -> dict[str, dict[str, list[str]]]:
+    """Load SSH_PROFILES without importing the integration (and Home Assistant)."""
+    spec = importlib.util.spec_from_file_location("was110_const", CONST_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.SSH_PROFILES
+
+
+def openssh_options(profile: dict[str, list[str]]) -> list[str]:
+    """Return the `ssh -o` arguments for an asyncssh profile."""
+    options: list[str] = []
+    for key, option in OPENSSH_OPTIONS.items():
+        if key in profile:
+            options += ["-o", f"{option}={','.join(profile[key])}"]
+    if profile.get("compression_algs") == ["none"]:
+        options += ["-o", "Compression=no"]
+    return options
+
+
+def percentiles(samples: list[float]) -> str:
+    """Format p50/p95 of millisecond samples."""
+    if not samples:
+        return "-"
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))]
+    return f"{statistics.median(ordered):8.2f} {p95:8.2f}"
+
+
+class _NoAuthServer(asyncssh.SSHServer):
+    """Local stand-in server accepting any user without authentication."""
+
+    def begin_auth(self, username: str) -> bool:  # noqa: ARG002
+        return False
+
+
+async def _handle_process(process: asyncssh.SSHServerProcess) -> None:
+    """Run the requested command in a local shell."""
+    proc = await asyncio.create_subprocess_shell(
+        process.command or "true",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    stdout, _ = await proc.communicate()
+    process.stdout.write(stdout.decode())
+    process.exit(proc.returncode or 0)
+
+
+async def start_local_server() -> tuple[asyncssh.SSHAcceptor, int]:
+    """Start the stand-in server on a free localhost port."""
+    host_keys = [
+        asyncssh.generate_private_key("ssh-rsa", key_size=2048),
+        asyncssh.generate_private_key("ecdsa-sha2-nistp256"),
+        asyncssh.generate_private_key("ssh-ed25519"),
+    ]
+    server = await asyncssh.create_server(
+        _NoAuthServer,
+        "127.0.0.1",
+        0,
+        server_host_keys=host_keys,
+        process_factory=_handle_process,
+    )
+    return server, server.sockets[0].getsockname()[1]
+
+
+async def bench_asyncssh(
+    args: argparse.Namespace, port: int, profile: dict[str, list[str]]
+) -> tuple[list[float], list[float], str]:
+    """Time connect and a single exec per iteration with asyncssh."""
+    connects: list[float] = []
+    execs: list[float] = []
+    negotiated = ""
+
+    for _ in range(args.iterations):
+        started = time.perf_counter()
+        conn = await asyncssh.connect(
+            args.host or "127.0.0.1",
+            port=port,
+            username=args.username,
+            password=args.password or None,
+            known_hosts=None,
+            connect_timeout=10,
+            **profile,
+        )
+        connects.append((time.perf_counter() - started) * 1000)
+        try:
+            started = time.perf_counter()
+            await conn.run(args.command, check=True)
+            execs.append((time.perf_counter() - started) * 1000)
+            negotiated = "/".join(
+                str(conn.get_extra_info(key))
+                for key in ("send_cipher", "send_mac", "send_compression")
+            )
+        finally:
+            conn.close()
+            await conn.wait_closed()
+
+    return connects, execs, negotiated
+
+
+def bench_openssh(
+    args: argparse.Namespace, port: int, profile: dict[str, list[str]]
+) -> list[float]:
+    """Time one `ssh` process per iteration, as the bridge runs them."""
+    argv = [
+        "ssh",
+        "-o", "StrictHostKeyChecking=no",
+        "-o", "UserKnownHostsFile=/dev/null",
+        "-o", "BatchMode=yes",
+        "-o", "LogLevel=ERROR",
+        "-p", str(port),
+        *openssh_options(profile),
+        f"{args.username}@{args.host or '127.0.0.1'}",
+        args.command,
+    ]
+    totals: list[float] = []
+    for _ in range(args.iterations):
+        started = time.perf_counter()
+        subprocess.run(argv, capture_output=True, timeout=30, check=True)
+        totals.append((time.perf_counter() - started) * 1000)
+    return totals
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", help="SSH server to measure (default: local stand-in)")
+    parser.add_argument("--port", type=int, default=22)
+    parser.add_argument("--username", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--command", default="cat /proc/uptime")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument(
+        "--openssh", action="store_true", help="also time the OpenSSH client"
+    )
+    args = parser.parse_args()
+
+    profiles = load_profiles()
+    server = None
+    port = args.port
+    if not args.host:
+        server, port = await start_local_server()
+
+    if args.openssh and not shutil.which("ssh"):
+        parser.error("--openssh needs the ssh client on PATH")
+
+    print(f"{args.iterations} iterations of '{args.command}' against "
+          f"{args.host or 'local asyncssh server'}:{port}\n")
+    print(f"{'client':9} {'profile':9} {'stage':8} {'p50 ms':>8} {'p95 ms':>8}  negotiated")
+    try:
+        for name, profile in profiles.items():
+            connects, execs, negotiated = await bench_asyncssh(args, port, profile)
+            print(f"{'asyncssh':9} {name:9} {'connect':8} {percentiles(connects)}  {negotiated}")
+            print(f"{'asyncssh':9} {name:9} {'exec':8} {percentiles(execs)}")
+            if args.openssh:
+                totals = await asyncio.to_thread(bench_openssh, args, port, profile)
+                print(f"{'openssh':9} {name:9} {'total':8} {percentiles(totals)}")
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
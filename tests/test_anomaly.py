@@ -0,0 +1,65 @@
+"""Tests for 8311 ONU optical change-point detection."""
+from __future__ import annotations
+
+import random
+
+from custom_components.was110_8311.anomaly import WARMUP_SAMPLES, ChangeDetector
+
+
+def _feed(detector: ChangeDetector, values: list[float]) -> list[float]:
+    """Feed samples and return the detected steps."""
+    return [step for value in values if (step := detector.update(value)) is not None]
+
+
+def test_noise_is_not_a_change() -> None:
+    """Test that a noisy but stable link reports nothing."""
+    rng = random.Random(8311)
+    detector = ChangeDetector()
+
+    assert _feed(detector, [-15 + rng.gauss(0, 0.03) for _ in range(2000)]) == []
+    assert detector.score < 1
+
+
+def test_step_detected_once() -> None:
+    """Test that a sudden drop (e.g. a bent fiber) is reported once."""
+    detector = ChangeDetector()
+    _feed(detector, [-15.0] * 50)
+
+    steps = _feed(detector, [-17.0] * 50)
+
+    assert len(steps) == 1
+    assert round(steps[0], 2) == -2.0
+    assert detector.score == 0
+
+
+def test_small_step_accumulates() -> None:
+    """Test that a step below a single sample's threshold is still caught."""
+    detector = ChangeDetector()
+    _feed(detector, [-15.0] * 50)
+
+    steps = []
+    for count in range(1, 20):
+        if (step := detector.update(-15.3)) is not None:
+            steps.append((count, step))
+
+    assert len(steps) == 1
+    assert 1 < steps[0][0] < 10
+    assert steps[0][1] < 0
+
+
+def test_slow_drift_detected() -> None:
+    """Test that a dirty connector's slow decline trips the detector."""
+    detector = ChangeDetector()
+    _feed(detector, [-15.0] * 50)
+
+    steps = _feed(detector, [-15.0 - 0.02 * index for index in range(200)])
+
+    assert steps
+    assert all(step < 0 for step in steps)
+
+
+def test_warmup_reports_nothing() -> None:
+    """Test that the baseline is learnt before anything is reported."""
+    detector = ChangeDetector()
+
+    assert _feed(detector, [-15.0, -20.0, -10.0] * (WARMUP_SAMPLES // 3)) == []
@@ -0,0 +1,147 @@
+"""Tests for the Docker MQTT bridge script."""
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+BRIDGE_PATH = Path(__file__).parent.parent / "8311-ha-bridge.py"
+
+
+@pytest.fixture
+def bridge() -> ModuleType:
+    """Load a fresh copy of the bridge script (its state lives in module globals)."""
+    spec = importlib.util.spec_from_file_location("ha_bridge", BRIDGE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeMqttClient:
+    """Records publishes, always connected."""
+
+    def __init__(self) -> None:
+        """Initialize the client."""
+        self.published: list[tuple[str, str | bytes]] = []
+
+    def is_connected(self) -> bool:
+        """Return the connection state."""
+        return True
+
+    def publish(self, topic: str, payload: str | bytes, **kwargs) -> SimpleNamespace:
+        """Record a publish."""
+        self.published.append((topic, payload))
+        return SimpleNamespace(rc=0, mid=len(self.published))
+
+
+@pytest.fixture
+def spooling_bridge(bridge: ModuleType, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> ModuleType:
+    """Return the bridge with a spool in a temporary directory and a fake client."""
+    monkeypatch.setattr(bridge, "SPOOL_DIR", str(tmp_path))
+    monkeypatch.setattr(bridge, "SPOOL_DOWNSAMPLE_THRESHOLD", 3)
+    bridge.load_mqtt()
+    bridge.spool_init()
+    bridge.ha_mqtt_client = FakeMqttClient()
+    return bridge
+
+
+def test_missing_time_curr_is_not_a_flap(bridge: ModuleType) -> None:
+    """Test that firmware without time_curr doesn't report a steady link as flapping."""
+    status = bridge.parse_pon_status("errorcode=0 current=51 previous=50")
+    assert status["time_in_state_seconds"] is None
+    assert status["time_in_state_formatted"] is None
+
+    for now in (0.0, 60.0, 120.0, 180.0):
+        bridge.track_pon_transition(status, now)
+
+    stats = bridge.get_pon_flap_stats(180.0)
+    assert stats["flaps_last_hour"] == 0
+    assert stats["link_failures"] == 0
+    assert stats["mtbf_seconds"] is None
+
+
+def test_hidden_reentry_with_time_curr(bridge: ModuleType) -> None:
+    """Test that a reset time_curr is still detected as a link flap."""
+    bridge.track_pon_transition(bridge.parse_pon_status("current=51 previous=50 time_curr=1000"), 0.0)
+    bridge.track_pon_transition(bridge.parse_pon_status("current=51 previous=50 time_curr=15"), 60.0)
+
+    stats = bridge.get_pon_flap_stats(60.0)
+    assert stats["flaps_last_hour"] == 1
+    assert stats["link_failures"] == 1
+
+
+def test_paused_replay_is_thinned_once(spooling_bridge: ModuleType) -> None:
+    """Test that a backlog is downsampled once, even when its replay pauses."""
+    bridge = spooling_bridge
+    for i in range(20):
+        bridge.spool_message("onu/rx", str(i), 1)
+        bridge.spool_message("onu/tx", str(i), 1)
+
+    # 40 messages over a threshold of 3: every 14th per topic, plus the newest
+    bridge.replay_spool(1)
+    assert bridge.spool["pending"] == 5
+    bridge.replay_spool(None)
+
+    assert bridge.spool["pending"] == 0
+    assert bridge.spool["downsample"] is None
+    assert bridge.ha_mqtt_client.published == [
+        ("onu/rx", "0"),
+        ("onu/tx", "0"),
+        ("onu/rx", "14"),
+        ("onu/tx", "14"),
+        ("onu/rx", "19"),
+        ("onu/tx", "19"),
+    ]
+
+
+def test_binary_payload_round_trip(spooling_bridge: ModuleType) -> None:
+    """Test that binary payloads are spooled and replayed byte for byte."""
+    bridge = spooling_bridge
+    payload = bytes(range(256))
+    assert bridge.spool_message("onu/snapshot", payload, 0)
+    assert bridge.spool_message("onu/rx", "-15.2", 1)
+
+    bridge.replay_spool()
+
+    assert bridge.ha_mqtt_client.published == [("onu/snapshot", payload), ("onu/rx", "-15.2")]
+
+
+def test_influx_without_fields(bridge: ModuleType, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a snapshot without values produces no (invalid) influx line."""
+    monkeypatch.setattr(bridge, "WAS_110_HOST", "192.168.11.1")
+    assert bridge.format_influx({"sample_time": 1760000000.5}) is None
+    assert bridge.format_prometheus({"sample_time": 1760000000.5}) is None
+
+    line = bridge.format_influx({"sample_time": 1760000000.5, "rx_power_dbm": -15.2})
+    assert line == "was110,host=192.168.11.1,serial=unknown rx_power_dbm=-15.2 1760000000500000000"
+
+
+def test_prometheus_label_escaping(bridge: ModuleType, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that label values are escaped."""
+    monkeypatch.setattr(bridge, "WAS_110_HOST", "192.168.11.1")
+    monkeypatch.setattr(bridge, "device_serial", 'A"B\\C\nD')
+
+    output = bridge.format_prometheus({"rx_power_dbm": -15.2})
+
+    assert output.splitlines()[-1] == (
+        'was110_rx_power_dbm{host="192.168.11.1",serial="A\\"B\\\\C\\nD"} -15.2'
+    )
+
+
+def test_device_discovery_clears_entity_configs(
+    bridge: ModuleType, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that device mode clears per-entity configs before publishing the device payload."""
+    monkeypatch.setattr(bridge, "DISCOVERY_MODE", "device")
+    bridge.load_mqtt()
+    bridge.ha_mqtt_client = FakeMqttClient()
+
+    bridge.publish_all_discovery()
+
+    published = bridge.ha_mqtt_client.published
+    cleared = [topic for topic, payload in published if payload == ""]
+    assert len(cleared) == len(bridge.SENSOR_REGISTRY)
+    assert all(topic.endswith("/config") and "/device/" not in topic for topic in cleared)
+    assert published[-1][0] == f"{bridge.HA_DISCOVERY_PREFIX}/device/{bridge.get_device_id()}/config"
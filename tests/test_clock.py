@@ -0,0 +1,40 @@
+"""Tests for 8311 ONU clock offset estimation."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.was110_8311.clock import ClockEstimator, parse_clock
+
+
+def test_parse_clock() -> None:
+    """Test uptime and wall time, with and without nanosecond support."""
+    assert parse_clock("1234.56\n1700000000.250000000\n") == {
+        "clock_uptime": 1234.56,
+        "clock_time": 1700000000.25,
+    }
+    assert parse_clock("1234.56\n1700000000.%N")["clock_time"] == 1700000000
+    assert parse_clock("") == {}
+
+
+def test_lowest_delay_exchange_sets_offset() -> None:
+    """Test that a slow round trip doesn't move the sample times."""
+    clock = ClockEstimator()
+    # Local monotonic = uptime + 500; 20 ms each way, 10 ms of remote
+    # execution, and the ONU's wall clock half a second ahead
+    assert clock.update(
+        600.0, 600.05, 100.02, end_uptime=100.03, wall_time=1100.52, wall_base=500.0
+    ) == pytest.approx(600.02)
+    assert clock.as_data() == {"clock_rtt": 40.0, "clock_offset": 500}
+
+    # A 2 s stall on the way back: the sample keeps the earlier offset
+    assert clock.update(660.0, 662.05, 160.02) == pytest.approx(660.02)
+    assert clock.delay == pytest.approx(2.05)
+
+
+def test_reboot_restarts_estimate() -> None:
+    """Test that exchanges from before an ONU reboot are dropped."""
+    clock = ClockEstimator()
+    clock.update(600.0, 600.01, 100.0)
+
+    # Rebooted: uptime 5 s at local 900 s, through a slower link
+    assert clock.update(900.0, 900.2, 5.0) == pytest.approx(900.1)
@@ -0,0 +1,88 @@
+"""Tests for 8311 ONU remote command planning."""
+from __future__ import annotations
+
+from custom_components.was110_8311.commands import (
+    SECTIONS,
+    build_command,
+    due_sections,
+    plan_sections,
+)
+
+
+def test_plan_without_enabled_keys_fetches_everything() -> None:
+    """Test that the first refresh collects every source."""
+    assert plan_sections(None) == SECTIONS
+    assert plan_sections(()) == SECTIONS
+
+
+def test_plan_only_enabled_sources() -> None:
+    """Test that only consumed sources (plus clock and identity) are planned."""
+    sections = plan_sections({"rx_power_dbm", "ssh_connected"})
+
+    assert [section.name for section in sections] == ["CLOCK", "EEPROM50", "EEPROM51"]
+
+    command = build_command(sections)
+    assert "gtc_counters_get" not in command
+    assert "free" not in command
+    assert "/lib/8311.sh" not in command
+    assert command.endswith("echo '---END---'")
+
+
+def test_helper_library_sourced_once() -> None:
+    """Test that /lib/8311.sh is sourced once for all helper sections."""
+    command = build_command(
+        plan_sections({"firmware_bank", "module_type", "pon_vendor_id"})
+    )
+
+    assert command.count(". /lib/8311.sh") == 1
+    assert command.startswith(". /lib/8311.sh")
+
+
+def test_helper_library_not_sourced_for_shell() -> None:
+    """Test that commands for the persistent shell skip the helper library."""
+    command = build_command(plan_sections({"firmware_bank"}), source_lib=False)
+
+    assert "/lib/8311.sh" not in command
+    assert "active_fwbank" in command
+
+
+def test_due_sections_follow_polling_tiers() -> None:
+    """Test that slower tiers are skipped until their period elapses."""
+    sections = plan_sections({"rx_power_dbm", "gtc_bip_errors", "onu_uptime"})
+    names = [section.name for section in sections]
+
+    # Nothing fetched yet, so everything is due
+    assert due_sections(sections, {}, now=0.0) == sections
+
+    fetched = dict.fromkeys(names, 0.0)
+    due = [section.name for section in due_sections(sections, fetched, now=10.0)]
+    assert due == ["CLOCK", "EEPROM51"]
+
+    # Half a 60s tick of slack catches the 30s tier a tick early
+    due = [
+        section.name
+        for section in due_sections(sections, fetched, now=20.0, slack=30.0)
+    ]
+    assert due == ["CLOCK", "EEPROM51", "GTC_COUNTERS"]
+
+
+def test_alarms_fetch_thresholds_and_readings() -> None:
+    """Test that problem sensors plan the module limits and live readings."""
+    sections = plan_sections({"rx_power_problem"})
+
+    assert [section.name for section in sections] == [
+        "CLOCK",
+        "EEPROM50",
+        "EEPROM51",
+        "EEPROM51_THRESHOLDS",
+    ]
+
+
+def test_laser_trend_fetches_module_limits() -> None:
+    """Test that the aging projection plans the module's own TX bias limit."""
+    for key in ("laser_days_to_threshold", "laser_bias_limit"):
+        names = [section.name for section in plan_sections({key})]
+        assert "EEPROM51_THRESHOLDS" in names
+
+    names = [section.name for section in plan_sections({"tx_bias_trend"})]
+    assert "EEPROM51_THRESHOLDS" not in names
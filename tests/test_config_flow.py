@@ -8,14 +8,29 @@ from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_PORT, CONF_USERNA
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResultType
 
-from custom_components.was110_8311.const import DOMAIN
+from custom_components.was110_8311.config_flow import parse_hosts
+from custom_components.was110_8311.const import (
+    CONF_HOSTS,
+    CONF_MAX_SESSIONS,
+    CONF_SCAN_INTERVAL,
+    DOMAIN,
+)
 
 
-async def test_form_user(hass: HomeAssistant, mock_asyncssh) -> None:
-    """Test we get the user form."""
+async def _async_init_device_flow(hass: HomeAssistant) -> dict:
+    """Start a config flow and pick the single ONU step from the menu."""
     result = await hass.config_entries.flow.async_init(
         DOMAIN, context={"source": config_entries.SOURCE_USER}
     )
+    assert result["type"] is FlowResultType.MENU
+    return await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": "device"}
+    )
+
+
+async def test_form_user(hass: HomeAssistant, mock_asyncssh) -> None:
+    """Test we get the device form."""
+    result = await _async_init_device_flow(hass)
     assert result["type"] is FlowResultType.FORM
     assert result["errors"] == {}
 
@@ -47,9 +62,7 @@ async def test_form_user(hass: HomeAssistant, mock_asyncssh) -> None:
 
 async def test_form_invalid_auth(hass: HomeAssistant) -> None:
     """Test we handle invalid auth."""
-    result = await hass.config_entries.flow.async_init(
-        DOMAIN, context={"source": config_entries.SOURCE_USER}
-    )
+    result = await _async_init_device_flow(hass)
 
     with patch(
         "custom_components.was110_8311.config_flow.asyncssh.connect",
@@ -71,9 +84,7 @@ async def test_form_invalid_auth(hass: HomeAssistant) -> None:
 
 async def test_form_cannot_connect(hass: HomeAssistant) -> None:
     """Test we handle cannot connect error."""
-    result = await hass.config_entries.flow.async_init(
-        DOMAIN, context={"source": config_entries.SOURCE_USER}
-    )
+    result = await _async_init_device_flow(hass)
 
     with patch(
         "custom_components.was110_8311.config_flow.asyncssh.connect",
@@ -91,3 +102,43 @@ async def test_form_cannot_connect(hass: HomeAssistant) -> None:
 
     assert result2["type"] is FlowResultType.FORM
     assert result2["errors"] == {"base": "cannot_connect"}
+
+
+async def test_form_hub(hass: HomeAssistant, mock_asyncssh) -> None:
+    """Test a hub entry is created with the parsed host list."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": "hub"}
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "hub"
+
+    with patch(
+        "custom_components.was110_8311.async_setup_entry",
+        return_value=True,
+    ):
+        result2 = await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            {
+                CONF_HOSTS: "192.168.11.1\n192.168.12.1, 192.168.11.1",
+                CONF_USERNAME: "root",
+                CONF_PASSWORD: "testpass",
+                CONF_PORT: 22,
+                CONF_SCAN_INTERVAL: 60,
+                CONF_MAX_SESSIONS: 2,
+            },
+        )
+        await hass.async_block_till_done()
+
+    assert result2["type"] is FlowResultType.CREATE_ENTRY
+    assert result2["title"] == "8311 ONU Hub (2 ONUs)"
+    assert result2["data"][CONF_HOSTS] == ["192.168.11.1", "192.168.12.1"]
+    assert result2["data"][CONF_MAX_SESSIONS] == 2
+
+
+def test_parse_hosts() -> None:
+    """Test host lists accept newlines and commas and drop duplicates."""
+    assert parse_hosts(" a,b\n\nc  a ") == ["a", "b", "c"]
+    assert parse_hosts("\n") == []
@@ -0,0 +1,83 @@
+"""Tests for 8311 ONU CPU load and monitor overhead."""
+from __future__ import annotations
+
+from custom_components.was110_8311.cpu import CpuMeter, parse_cpu_stat
+
+
+def _process(pid: int, name: str, ticks: tuple[int, int, int, int], start: int) -> str:
+    """Return a /proc/<pid>/stat line with (utime, stime, cutime, cstime)."""
+    utime, stime, cutime, cstime = ticks
+    return (
+        f"{pid} ({name}) S 1 {pid} {pid} 0 -1 4194560 300 1000 0 0 "
+        f"{utime} {stime} {cutime} {cstime} 20 0 1 0 {start} 1744896 90"
+    )
+
+
+def _cpu_stat(
+    uptime: float,
+    busy: int,
+    idle: int,
+    shell: tuple[int, tuple[int, int, int, int], int],
+    session: tuple[int, tuple[int, int, int, int], int],
+) -> str:
+    """Return CPU_STAT output."""
+    return "\n".join(
+        (
+            f"{uptime:.2f}",
+            "0.52 0.31 0.20 1/85 4321",
+            f"cpu  {busy} 0 0 {idle} 10 0 0 0 0 0",
+            _process(shell[0], "sh", *shell[1:]),
+            _process(session[0], "dropbear", *session[1:]),
+        )
+    )
+
+
+def test_parse_cpu_stat() -> None:
+    """Test load, jiffies and both processes, with a spaced command name."""
+    output = _cpu_stat(1000.5, 500, 1500, (42, (1, 2, 3, 4), 99000), (41, (5, 5, 0, 0), 98000))
+    data = parse_cpu_stat(output.replace("(sh)", "(s h)"), 1000.25)
+
+    assert data["cpu_stat_uptime"] == 1000.5
+    assert data["poll_start_uptime"] == 1000.25
+    assert data["load_1m"] == 0.52
+    assert data["cpu_jiffies_total"] == 2010
+    assert data["cpu_jiffies_idle"] == 1510
+    assert data["shell_process"] == (42, 10, 99000)
+    assert data["session_process"] == (41, 10, 98000)
+
+
+def test_persistent_shell_overhead() -> None:
+    """Test that a long-lived shell is charged its increase since the last poll."""
+    meter = CpuMeter()
+    shell, session = (42, (1, 1, 0, 0), 5000), (41, (2, 2, 0, 0), 4900)
+    meter.update(parse_cpu_stat(_cpu_stat(100, 500, 1500, shell, session), 99.9))
+
+    # 60 s later on 2 CPUs: 12000 jiffies, 3000 of them busy
+    shell, session = (42, (1, 1, 2, 1), 5000), (41, (4, 3, 0, 0), 4900)
+    data = meter.update(
+        parse_cpu_stat(_cpu_stat(160, 3500, 10500, shell, session), 159.95)
+    )
+
+    assert data["cpu_usage"] == 25.0
+    assert data["load_5m"] == 0.31
+    assert data["monitor_cpu_time"] == 60
+    assert data["monitor_cpu_share"] == 0.05
+    assert data["monitor_wall_time"] == 50
+
+
+def test_new_session_charged_in_full() -> None:
+    """Test that a fresh SSH session is charged from its start, handshake included."""
+    meter = CpuMeter()
+    meter.update(
+        parse_cpu_stat(_cpu_stat(100, 500, 1500, (42, (1, 1, 0, 0), 9000), (41, (9, 9, 0, 0), 8990)))
+    )
+
+    data = meter.update(
+        parse_cpu_stat(
+            _cpu_stat(160, 3500, 10500, (52, (0, 1, 2, 1), 15990), (51, (8, 4, 0, 0), 15980)),
+            159.95,
+        )
+    )
+
+    assert data["monitor_cpu_time"] == 160
+    assert data["monitor_wall_time"] == 200
@@ -0,0 +1,63 @@
+"""Tests for 8311 ONU fleet aggregates."""
+from __future__ import annotations
+
+from custom_components.was110_8311.fleet import FleetMatrix
+
+
+def _onu(rx_power: float, state: str = "O5.1", isp: str = "AT&T") -> dict:
+    """Return the data of a linked ONU."""
+    return {
+        "rx_power_dbm": rx_power,
+        "tx_power_dbm": 5.0,
+        "optic_temperature": 45.0,
+        "tx_bias_current": 10.0,
+        "pon_state_name": state,
+        "pon_link": state.startswith("O5"),
+        "isp": isp,
+    }
+
+
+def test_aggregates_and_counts() -> None:
+    """Test the RX power spread and the per-state and per-ISP counts."""
+    hosts = [f"10.0.0.{index}" for index in range(10)]
+    fleet = FleetMatrix(hosts)
+    for index in range(10):
+        fleet.update(index, _onu(-15.0 - index, isp="AT&T" if index < 7 else "Bell"))
+    fleet.update(9, {**_onu(-24.0), "pon_state_name": "O1", "pon_link": False})
+
+    data = fleet.aggregates()
+
+    assert data["fleet_onus_reporting"] == 10
+    assert data["fleet_onus_linked"] == 9
+    assert data["fleet_rx_power_dbm_median"] == -19.5
+    assert data["fleet_rx_power_dbm_p10"] == -23.1
+    assert data["fleet_rx_power_dbm_min"] == -24.0
+    assert data["fleet_pon_states"] == {"O5.1": 9, "O1": 1}
+    assert data["fleet_isps"] == {"AT&T": 8, "Bell": 2}
+
+
+def test_outlier_flagged() -> None:
+    """Test that one ONU far below the rest is reported with its metric."""
+    fleet = FleetMatrix([f"onu{index}" for index in range(8)])
+    for index in range(7):
+        fleet.update(index, _onu(-15.0 + 0.1 * index))
+    fleet.update(7, {**_onu(-25.0), "optic_temperature": 46.0})
+
+    assert fleet.aggregates()["fleet_outliers"] == {"onu7": ["rx_power_dbm"]}
+
+
+def test_small_or_empty_fleet() -> None:
+    """Test that too few ONUs flag nothing and down ONUs drop out."""
+    fleet = FleetMatrix(["a", "b", "c"])
+    assert fleet.aggregates()["fleet_onus_reporting"] == 0
+
+    fleet.update(0, _onu(-15.0))
+    fleet.update(1, _onu(-15.0))
+    fleet.update(2, _onu(-30.0))
+    fleet.clear(2)
+    data = fleet.aggregates()
+
+    assert data["fleet_outliers"] == {}
+    assert data["fleet_onus_reporting"] == 2
+    assert data["fleet_rx_power_dbm_median"] == -15.0
+    assert data["fleet_pon_states"] == {"O5.1": 2}
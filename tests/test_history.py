@@ -0,0 +1,111 @@
+"""Tests for 8311 ONU snapshot history."""
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import patch
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.was110_8311.const import DOMAIN
+from custom_components.was110_8311.history import (
+    HOUR,
+    SAVE_DELAY,
+    TREND_SAVE_DELAY,
+    LaserAging,
+    StatisticMeanType,
+    WAS110History,
+)
+
+
+async def test_import_completed_hours(hass: HomeAssistant) -> None:
+    """Test that only completed hours are imported, and only once."""
+    hass.config.components.add("recorder")
+    history = WAS110History(hass, "test_entry", "192.168.11.1")
+    await history.async_load()
+
+    start = HOUR * 100
+    for minute in range(0, 150, 10):
+        history.record(start + minute * 60, {"rx_power_dbm": -15.0 - minute / 100})
+
+    with patch(
+        "custom_components.was110_8311.history.async_add_external_statistics"
+    ) as mock_add:
+        await history.async_import_statistics(start + 150 * 60)
+        await history.async_import_statistics(start + 150 * 60)
+
+    # Only rx_power_dbm had samples, and the third hour is still in progress
+    assert mock_add.call_count == 1
+    metadata, stats = mock_add.call_args[0][1:]
+    assert metadata["statistic_id"] == "was110_8311:192_168_11_1_rx_power_dbm"
+    if StatisticMeanType is None:
+        assert metadata["has_mean"] is True
+    else:
+        assert metadata["mean_type"] is StatisticMeanType.ARITHMETIC
+    assert len(stats) == 2
+    assert stats[0]["max"] == -15.0
+    assert stats[1]["min"] == -16.1
+
+
+async def test_counters_import_as_sums(hass: HomeAssistant) -> None:
+    """Test that cumulative counters are imported as state and sum across a reset."""
+    hass.config.components.add("recorder")
+    history = WAS110History(hass, "test_entry", "192.168.11.1")
+    await history.async_load()
+
+    start = HOUR * 100
+    # +10 then +5 in the first hour; a reset to 3 and +4 in the second
+    for minute, value in ((0, 100), (20, 110), (40, 115), (70, 3), (90, 7)):
+        history.record(start + minute * 60, {"gtc_bip_errors": value})
+
+    with patch(
+        "custom_components.was110_8311.history.async_add_external_statistics"
+    ) as mock_add:
+        await history.async_import_statistics(start + 2 * HOUR)
+
+    metadata, stats = mock_add.call_args[0][1:]
+    assert metadata["has_sum"] is True
+    assert [(s["state"], s["sum"]) for s in stats] == [(115, 15), (7, 22)]
+
+
+async def test_record_ignores_empty_snapshots(hass: HomeAssistant) -> None:
+    """Test that snapshots without numeric keys are not stored."""
+    history = WAS110History(hass, "test_entry", "192.168.11.1")
+
+    assert history.record(HOUR, {"ssh_connected": False}) is False
+    assert len(history) == 0
+
+
+async def test_ring_saved_while_sampling(
+    hass: HomeAssistant, hass_storage: dict[str, Any], freezer: FrozenDateTimeFactory
+) -> None:
+    """Test that high-rate sampling doesn't postpone saving the ring."""
+    history = WAS110History(hass, "test_entry", "192.168.11.1", sample_interval=5)
+    await history.async_load()
+
+    for second in range(0, SAVE_DELAY + 30, 5):
+        history.record(HOUR * 100 + second, {"rx_power_dbm": -15.0})
+        freezer.tick(5)
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+    stored = hass_storage[f"{DOMAIN}.test_entry.history"]["data"]
+    assert len(stored["samples"]) >= SAVE_DELAY // 5
+
+
+async def test_trends_saved_while_sampling(
+    hass: HomeAssistant, hass_storage: dict[str, Any], freezer: FrozenDateTimeFactory
+) -> None:
+    """Test that samples arriving faster than the save delay don't postpone the save."""
+    aging = LaserAging(hass, "test_entry")
+    await aging.async_load()
+
+    sample = {"optic_temperature": 40.0, "tx_bias_current": 11.0, "tx_power_dbm": 2.0}
+    for second in range(0, TREND_SAVE_DELAY + 60, 60):
+        aging.record(HOUR * 100 + second, sample)
+        freezer.tick(60)
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+    assert f"{DOMAIN}.test_entry.trend" in hass_storage
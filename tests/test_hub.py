@@ -0,0 +1,88 @@
+"""Tests for 8311 ONU hub scheduling and the shared SSH pool."""
+from __future__ import annotations
+
+import asyncio
+import random
+from unittest.mock import MagicMock
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.was110_8311.const import DOMAIN
+from custom_components.was110_8311.coordinator import WAS110Coordinator
+from custom_components.was110_8311.hub import HUB_JITTER, jitter, stagger_offsets
+from custom_components.was110_8311.pool import SSHConnectionPool
+
+
+def test_stagger_offsets_spread_over_interval() -> None:
+    """Test that ONUs get evenly spaced slots within the scan interval."""
+    assert stagger_offsets(4, 60) == [15, 30, 45, 60]
+    assert stagger_offsets(1, 60) == [60]
+
+
+def test_jitter_stays_within_slot() -> None:
+    """Test that jitter never moves a poll into a neighbouring slot."""
+    rng = random.Random(8311)
+    half_width = HUB_JITTER * 60 / 4 / 2
+    offsets = [jitter(4, 60, rng) for _ in range(1000)]
+
+    assert all(-half_width <= offset <= half_width for offset in offsets)
+    assert half_width < 60 / 4 / 2
+
+
+async def test_pool_caps_concurrent_sessions() -> None:
+    """Test that the pool bounds sessions and reuses connections per host."""
+    pool = SSHConnectionPool(max_sessions=2)
+    connects: list[str] = []
+    active = 0
+    peak = 0
+
+    async def run(host: str) -> None:
+        nonlocal active, peak
+
+        async def connect() -> MagicMock:
+            connects.append(host)
+            return MagicMock(is_closed=False)
+
+        async with pool.acquire(host, connect):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(run(host) for host in ("a", "b", "c", "a", "b", "c")))
+
+    assert peak == 2
+    assert sorted(connects) == ["a", "b", "c"]
+
+
+async def test_pool_discard_reconnects() -> None:
+    """Test that a discarded connection is closed and replaced."""
+    pool = SSHConnectionPool(max_sessions=1)
+    connections = [MagicMock(is_closed=False), MagicMock(is_closed=False)]
+
+    async def connect() -> MagicMock:
+        return connections.pop(0)
+
+    async with pool.acquire("a", connect) as first:
+        pass
+    pool.discard("a")
+    async with pool.acquire("a", connect) as second:
+        pass
+
+    first.close.assert_called_once()
+    assert second is not first
+
+
+async def test_single_entry_keeps_its_ids(
+    hass: HomeAssistant, mock_config_entry_data: dict
+) -> None:
+    """Test that single-ONU entries keep the host and storage ids of earlier versions."""
+    entry = MockConfigEntry(domain=DOMAIN, data=mock_config_entry_data)
+    entry.add_to_hass(hass)
+
+    coordinator = WAS110Coordinator(hass, entry)
+
+    assert coordinator.host == "192.168.11.1"
+    assert coordinator.history._store.key == f"{DOMAIN}.{entry.entry_id}.history"
+    assert coordinator.aging._store.key == f"{DOMAIN}.{entry.entry_id}.trend"
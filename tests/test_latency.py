@@ -0,0 +1,33 @@
+"""Tests for 8311 ONU latency histograms."""
+from __future__ import annotations
+
+from custom_components.was110_8311.latency import LatencyHistogram, StageLatency
+
+
+def test_histogram_quantiles() -> None:
+    """Test that quantiles resolve to bucket bounds, capped at the maximum."""
+    histogram = LatencyHistogram()
+    assert histogram.quantile(0.95) is None
+
+    for ms in (3.0, 4.0, 4.5, 7.0, 180.0):
+        histogram.observe(ms)
+
+    assert histogram.quantile(0.5) == 5
+    assert histogram.quantile(0.95) == 180.0
+    summary = histogram.as_dict()
+    assert summary["count"] == 5
+    assert summary["buckets"]["5"] == 3
+    assert summary["buckets"]["inf"] == 0
+
+
+def test_stage_data_keys() -> None:
+    """Test that sensor stages map to coordinator data keys."""
+    latency = StageLatency()
+    with latency.measure("parse"):
+        pass
+    latency.observe("parse_eeprom51", 0.05)
+
+    data = latency.as_data()
+    assert data["latency_parse_ms"] is not None
+    assert data["latency_ssh_connect_ms"] is None
+    assert "parse_eeprom51" in latency.as_dict()
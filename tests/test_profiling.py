@@ -0,0 +1,25 @@
+"""Tests for 8311 ONU on-demand profiling."""
+from __future__ import annotations
+
+import asyncio
+import tracemalloc
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.was110_8311.profiling import async_capture_profile
+
+
+async def test_cancelled_capture_stops_tracemalloc() -> None:
+    """Test that cancelling a capture doesn't leave tracemalloc running."""
+    assert not tracemalloc.is_tracing()
+
+    task = asyncio.create_task(async_capture_profile(MagicMock(), 30, 10))
+    await asyncio.sleep(0)
+    assert tracemalloc.is_tracing()
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert not tracemalloc.is_tracing()
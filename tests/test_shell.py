@@ -0,0 +1,92 @@
+"""Tests for the 8311 ONU persistent remote shell."""
+from __future__ import annotations
+
+import asyncio
+import re
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.was110_8311.shell import SHELL_INIT, RemoteShell
+
+
+class FakeShellProcess:
+    """Answers each framed request with canned output and its marker."""
+
+    def __init__(self, outputs: dict[str, str]) -> None:
+        """Initialize the fake process."""
+        self.outputs = outputs
+        self.requests: list[str] = []
+        self.buffer = ""
+        self.exit_status: int | None = None
+        self.stdin = MagicMock()
+        self.stdin.write.side_effect = self._write
+        self.stdout = MagicMock()
+        self.stdout.readuntil = AsyncMock(side_effect=self._readuntil)
+        self.close = MagicMock()
+
+    def _write(self, data: str) -> None:
+        command = re.match(r"\{ (.*)\n\}", data, re.DOTALL).group(1)
+        marker = re.search(r"echo '(---FRAME [^']+---)'", data).group(1)
+        self.requests.append(command)
+        if command in self.outputs:
+            self.buffer += f"{self.outputs[command]}\n{marker}\n"
+
+    async def _readuntil(self, separator: str) -> str:
+        if separator not in self.buffer:
+            raise EOFError
+        end = self.buffer.index(separator) + len(separator)
+        response, self.buffer = self.buffer[:end], self.buffer[end:]
+        return response
+
+
+async def test_shell_frames_responses() -> None:
+    """Test that the helper library is sourced once and responses are framed."""
+    process = FakeShellProcess({SHELL_INIT: "", "uptime": "12.3 4.5"})
+    connection = MagicMock()
+    connection.create_process = AsyncMock(return_value=process)
+
+    shell = RemoteShell(connection)
+    await shell.async_start()
+
+    assert await shell.async_run("uptime") == "12.3 4.5"
+    assert await shell.async_run("uptime") == "12.3 4.5"
+    assert process.requests == [SHELL_INIT, "uptime", "uptime"]
+    assert not shell.closed
+
+
+async def test_shell_exit_raises_eof() -> None:
+    """Test that a shell that stops answering raises EOFError."""
+    process = FakeShellProcess({SHELL_INIT: ""})
+    connection = MagicMock()
+    connection.create_process = AsyncMock(return_value=process)
+
+    shell = RemoteShell(connection)
+    await shell.async_start()
+
+    with pytest.raises(EOFError):
+        await shell.async_run("exit")
+
+    shell.close()
+    assert shell.closed
+    process.close.assert_called_once()
+
+
+async def test_waiting_request_after_close_raises_eof() -> None:
+    """Test that a request queued behind one that closed the shell raises EOFError."""
+    process = FakeShellProcess({SHELL_INIT: "", "uptime": "12.3 4.5"})
+    connection = MagicMock()
+    connection.create_process = AsyncMock(return_value=process)
+
+    shell = RemoteShell(connection)
+    await shell.async_start()
+
+    # The first request fails and closes the shell while the second waits
+    async with shell._lock:
+        waiting = asyncio.create_task(shell.async_run("uptime"))
+        await asyncio.sleep(0)
+        shell.close()
+
+    with pytest.raises(EOFError):
+        await waiting
+    assert process.requests == [SHELL_INIT]
@@ -0,0 +1,120 @@
+"""Tests for 8311 ONU SFF-8472 threshold evaluation."""
+from __future__ import annotations
+
+import struct
+
+from custom_components.was110_8311.thresholds import (
+    THRESHOLDS_LENGTH,
+    evaluate,
+    is_externally_calibrated,
+    parse_calibration,
+    parse_thresholds,
+)
+
+
+def _page(calibration: bytes = b"") -> bytes:
+    """Return an A2h page with typical GPON ONU thresholds."""
+    limits = (
+        # High alarm, low alarm, high warning, low warning (raw LSBs)
+        struct.pack(">4h", 90 * 256, -40 * 256, 85 * 256, -5 * 256)
+        + struct.pack(">4H", 36000, 30000, 35000, 31000)
+        + struct.pack(">4H", 50000, 0, 45000, 500)
+        + struct.pack(">4H", 50119, 6310, 39811, 7943)
+        + struct.pack(">4H", 10000, 10, 7943, 13)
+    )
+    page = limits + bytes(56 - len(limits)) + calibration
+    return page + bytes(THRESHOLDS_LENGTH - len(page))
+
+
+READINGS = {
+    "optic_temperature": 45.5,
+    "voltage": 3.3,
+    "tx_bias_current": 12.0,
+    "tx_power_mw": 2.0,
+    "rx_power_mw": 0.0319,
+}
+
+
+def test_thresholds_in_engineering_units() -> None:
+    """Test that thresholds are scaled like the live readings."""
+    thresholds = parse_thresholds(_page())
+
+    assert thresholds is not None
+    assert thresholds.limits["temperature"] == (90.0, -40.0, 85.0, -5.0)
+    assert thresholds.limits["voltage"] == (3.6, 3.0, 3.5, 3.1)
+    assert thresholds.limits["rx_power"] == (1.0, 0.001, 0.7943, 0.0013)
+    assert not thresholds.externally_calibrated
+    assert parse_thresholds(bytes(40)) is None
+
+
+def test_readings_within_limits() -> None:
+    """Test that nominal readings raise nothing."""
+    result = evaluate(parse_thresholds(_page()), READINGS)
+
+    assert result["alarm_flags"] == 0
+    assert result["warning_flags"] == 0
+    assert not result["rx_power_problem"]
+    assert result["rx_power_level"] == "ok"
+
+
+def test_flags_follow_sff8472_layout() -> None:
+    """Test that warnings and alarms set the byte 112-113 style bits."""
+    thresholds = parse_thresholds(_page())
+
+    # Hot, but only past the warning limit
+    result = evaluate(thresholds, {**READINGS, "optic_temperature": 87.0})
+    assert result["temperature_problem"]
+    assert result["temperature_level"] == "warning"
+    assert result["warning_flags"] == 0x8000
+    assert result["alarm_flags"] == 0
+
+    # Loss of light is below both RX power limits
+    result = evaluate(thresholds, {**READINGS, "rx_power_mw": 0.0})
+    assert result["rx_power_level"] == "alarm"
+    assert result["alarm_flags"] == 0x0040
+    assert result["warning_flags"] == 0x0040
+
+    # TX power high alarm
+    result = evaluate(thresholds, {**READINGS, "tx_power_mw": 5.2})
+    assert result["alarm_flags"] == 0x0200
+
+
+def test_nothing_evaluated_without_readings() -> None:
+    """Test that a failed read doesn't clear the flags."""
+    assert evaluate(parse_thresholds(_page()), {"pon_link": True}) == {}
+
+
+def test_external_calibration() -> None:
+    """Test that raw thresholds are calibrated like the readings."""
+    calibration_bytes = (
+        # Rx_PWR(4) .. Rx_PWR(0): Rx_PWR = 2 * ADC + 1
+        struct.pack(">5f", 0.0, 0.0, 0.0, 2.0, 1.0)
+        # Tx_I, Tx_PWR, T, V: slope (8.8), offset
+        + struct.pack(">Hh", 256, 0)
+        + struct.pack(">Hh", 512, 0)
+        + struct.pack(">Hh", 256, -256)
+        + struct.pack(">Hh", 256, 1000)
+    )
+    page = _page(calibration_bytes)
+    calibration = parse_calibration(page)
+
+    assert calibration is not None
+    assert calibration.apply("rx_power", 100) == 201
+    assert calibration.apply("tx_power", 100) == 200
+    assert calibration.apply("temperature", 256) == 0
+
+    thresholds = parse_thresholds(page, calibration)
+    assert thresholds.externally_calibrated
+    assert thresholds.limits["temperature"] == (89.0, -41.0, 84.0, -6.0)
+    assert thresholds.limits["voltage"] == (3.7, 3.1, 3.6, 3.2)
+    assert thresholds.limits["rx_power"][0] == 2.0001
+
+
+def test_calibration_type() -> None:
+    """Test the A0h Diagnostic Monitoring Type external calibration bit."""
+    eeprom50 = bytearray(96)
+    assert not is_externally_calibrated(bytes(eeprom50))
+
+    eeprom50[92] = 0x58
+    assert is_externally_calibrated(bytes(eeprom50))
+    assert not is_externally_calibrated(bytes(80))
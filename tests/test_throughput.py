@@ -0,0 +1,72 @@
+"""Tests for 8311 ONU interface throughput."""
+from __future__ import annotations
+
+from custom_components.was110_8311.throughput import (
+    COUNTER_WRAP,
+    ThroughputMeter,
+    counter_delta,
+    parse_net_dev,
+)
+
+
+def _net_dev(uptime: float, lan: tuple[int, int], pon: tuple[int, int]) -> str:
+    """Return NET_DEV output with the given (rx, tx) byte counters."""
+    return "\n".join(
+        (
+            f"{uptime:.2f}",
+            f"eth0_0:{lan[0]} {lan[0] // 1000} 1 2 0 0 0 0 {lan[1]} {lan[1] // 1000} 3 4 0 0 0 0",
+            f"  pon0: {pon[0]} {pon[0] // 1000} 0 0 0 0 0 0 {pon[1]} {pon[1] // 1000} 0 5 0 0 0 0",
+        )
+    )
+
+
+def test_parse_net_dev() -> None:
+    """Test counters, errors and drops, including a counter glued to the colon."""
+    data = parse_net_dev(_net_dev(100.5, (123456789, 1000), (2000, 3000)))
+
+    assert data["counters_uptime"] == 100.5
+    assert data["lan_rx_bytes"] == 123456789
+    assert data["lan_tx_packets"] == 1
+    assert data["lan_errors"] == 4
+    assert data["lan_drops"] == 6
+    assert data["pon_drops"] == 5
+    assert parse_net_dev("") == {}
+
+
+def test_rates_and_utilization() -> None:
+    """Test rates over the ONU's own elapsed time against the link speed."""
+    meter = ThroughputMeter()
+    assert meter.update(parse_net_dev(_net_dev(100, (0, 0), (0, 0))), 1000) == {}
+
+    # 10 s: 125 MB in (100 Mbit/s), 12.5 MB out, 250 MB on the PON
+    data = meter.update(
+        parse_net_dev(_net_dev(110, (125_000_000, 12_500_000), (250_000_000, 0))),
+        1000,
+    )
+
+    assert data["lan_rx_throughput"] == 100.0
+    assert data["lan_tx_throughput"] == 10.0
+    assert data["lan_rx_packet_rate"] == 12500.0
+    assert data["lan_rx_utilization"] == 10.0
+    assert data["lan_tx_utilization"] == 1.0
+    assert data["pon_rx_throughput"] == 200.0
+
+
+def test_wrap_and_reset() -> None:
+    """Test that 32-bit wraps are bridged and resets or reboots skipped."""
+    assert counter_delta(COUNTER_WRAP - 10, 5) == 15
+    assert counter_delta(COUNTER_WRAP + 10, 5) is None
+
+    meter = ThroughputMeter()
+    meter.update(parse_net_dev(_net_dev(100, (COUNTER_WRAP - 1000, 0), (0, 0))), 1000)
+    data = meter.update(parse_net_dev(_net_dev(101, (1000, 0), (0, 0))), 1000)
+    assert data["lan_rx_throughput"] == 0.016
+
+    # A reset read as a wrap would be ~34 Gbit/s on a 1 Gbit/s link
+    meter.update(parse_net_dev(_net_dev(102, (COUNTER_WRAP - 1, 0), (0, 0))), 1000)
+    data = meter.update(parse_net_dev(_net_dev(103, (COUNTER_WRAP - 2, 0), (0, 0))), 1000)
+    assert "lan_rx_throughput" not in data
+    assert "pon_rx_throughput" in data
+
+    # The ONU rebooted: no rates for this interval
+    assert meter.update(parse_net_dev(_net_dev(5, (0, 0), (0, 0))), 1000) == {}
@@ -0,0 +1,46 @@
+"""Tests for 8311 ONU PON transition tracking."""
+from __future__ import annotations
+
+from custom_components.was110_8311.transitions import PonTransitionTracker
+
+
+def test_steady_state_has_no_transitions() -> None:
+    """Test that a growing time in state records nothing."""
+    tracker = PonTransitionTracker()
+    tracker.update(51, 1000, 40, now=0.0)
+    tracker.update(51, 1060, 40, now=60.0)
+    tracker.update(51, 1120, 40, now=120.0)
+
+    assert tracker.as_data(120.0) == {
+        "pon_flaps_last_hour": 0,
+        "pon_link_failures": 0,
+        "pon_mtbf": None,
+    }
+
+
+def test_hidden_transition_between_polls() -> None:
+    """Test that a reset time in state is detected as a link flap."""
+    tracker = PonTransitionTracker()
+    tracker.update(51, 1000, 40, now=0.0)
+    # Link dropped and re-associated 15s before this poll
+    tracker.update(51, 15, 40, now=60.0)
+
+    data = tracker.as_data(60.0)
+    assert data["pon_flaps_last_hour"] == 1
+    assert data["pon_link_failures"] == 1
+    assert data["pon_mtbf"] == 60.0
+
+    history = tracker.history(60.0)
+    assert history[0]["hidden"] is True
+    assert history[0]["seconds_ago"] == 15.0
+
+
+def test_visible_transition_and_flap_window() -> None:
+    """Test that link loss counts once and ages out of the hourly window."""
+    tracker = PonTransitionTracker()
+    tracker.update(51, 1000, 40, now=0.0)
+    tracker.update(11, 5, 51, now=60.0)
+    tracker.update(51, 10, 40, now=120.0)
+
+    assert tracker.as_data(120.0)["pon_link_failures"] == 1
+    assert tracker.flaps(now=60.0 + 3601) == 0
@@ -0,0 +1,91 @@
+"""Tests for 8311 ONU laser aging trends."""
+from __future__ import annotations
+
+import math
+
+from custom_components.was110_8311.trend import (
+    DAY,
+    DAYS_PER_YEAR,
+    TrendRegression,
+    aging_data,
+)
+
+
+def _laser(days: int, per_day: int = 24) -> tuple[TrendRegression, TrendRegression]:
+    """Return regressions fed with an aging laser in a daily temperature swing.
+
+    Bias follows 8 mA + 0.1 mA/degC above 40 degC + 2 mA/year, TX power
+    drops 0.5 dB/year.
+    """
+    bias = TrendRegression()
+    power = TrendRegression()
+    for index in range(days * per_day):
+        timestamp = index * DAY / per_day
+        day = timestamp / DAY
+        temperature = 45 + 8 * math.sin(2 * math.pi * day)
+        bias.add(
+            timestamp,
+            temperature,
+            8 + 0.1 * (temperature - 40) + 2 * day / DAYS_PER_YEAR,
+        )
+        power.add(timestamp, temperature, 5 - 0.5 * day / DAYS_PER_YEAR)
+    return bias, power
+
+
+def test_no_trend_before_min_span() -> None:
+    """Test that a day of data is not enough for a trend."""
+    bias, power = _laser(days=1)
+
+    assert bias.fit() is None
+    assert aging_data(bias, power, DAY, 20.0) == {}
+
+
+def test_temperature_is_separated_from_aging() -> None:
+    """Test that the daily temperature swing doesn't leak into the trend."""
+    bias, power = _laser(days=60)
+    fit = bias.fit()
+
+    assert fit is not None
+    assert math.isclose(fit.temperature_slope, 0.1, rel_tol=1e-6)
+    assert math.isclose(fit.time_slope * DAYS_PER_YEAR, 2.0, rel_tol=1e-6)
+
+    now = 60 * DAY
+    data = aging_data(bias, power, now, 20.0)
+    assert data["tx_bias_trend"] == 2.0
+    assert data["tx_power_trend"] == -0.5
+    # 8 mA at 40 degC plus 60 days of aging
+    assert data["tx_bias_normalized"] == round(8 + 2 * 60 / DAYS_PER_YEAR, 2)
+    expected_days = (20 - (8 + 2 * 60 / DAYS_PER_YEAR)) / (2 / DAYS_PER_YEAR)
+    assert abs(data["laser_days_to_threshold"] - expected_days) <= 1
+
+
+def test_constant_temperature_fits_time_only() -> None:
+    """Test that a steady temperature falls back to a fit on time alone."""
+    bias = TrendRegression()
+    for hour in range(10 * 24):
+        bias.add(hour * 3600, 42.0, 10 + 0.01 * hour / 24)
+
+    fit = bias.fit()
+    assert fit is not None
+    assert fit.temperature_slope == 0
+    assert math.isclose(fit.time_slope, 0.01, rel_tol=1e-6)
+
+
+def test_stable_laser_has_no_projection() -> None:
+    """Test that a flat or falling bias projects no end of life."""
+    bias = TrendRegression()
+    for hour in range(10 * 24):
+        bias.add(hour * 3600, 42.0, 10.0)
+
+    data = aging_data(bias, TrendRegression(), 10 * DAY, 20.0)
+    assert data["laser_days_to_threshold"] is None
+    assert "tx_power_trend" not in data
+
+
+def test_persisted_state_round_trips() -> None:
+    """Test that a restored regression continues where it left off."""
+    bias, _ = _laser(days=10)
+    restored = TrendRegression.from_dict(bias.as_dict())
+
+    assert restored.fit() == bias.fit()
+    assert TrendRegression.from_dict({}).fit() is None